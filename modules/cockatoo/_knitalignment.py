@@ -0,0 +1,181 @@
+# PYTHON STANDARD LIBRARY IMPORTS ---------------------------------------------
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from array import array
+from math import ceil
+from math import floor
+from math import sqrt
+
+# DUNDER ----------------------------------------------------------------------
+__all__ = [
+    "default_band_width",
+    "node_coordinates",
+    "align_coordinates",
+    "banded_alignment"
+]
+
+# CONTOUR ALIGNMENT -----------------------------------------------------------
+
+
+def default_band_width(count_a, count_b):
+    """
+    Returns the default band width for aligning two contours with the given
+    numbers of nodes, which is a tenth of the longer contour but at least
+    ``4`` nodes.
+    """
+
+    return max(4, int(ceil(0.1 * max(count_a, count_b))))
+
+
+def node_coordinates(nodes):
+    """
+    Returns the coordinates of the 'geo' attributes of a sequence of nodes as
+    a list of 3-tuples, which can be used as a read-only snapshot for
+    :func:`align_coordinates`.
+    """
+
+    return [(d["geo"].X, d["geo"].Y, d["geo"].Z) for k, d in nodes]
+
+
+def banded_alignment(nodes_a, nodes_b, band_width=None, precise=False):
+    """
+    Aligns two sequences of nodes using a banded, monotone dynamic
+    programming matcher (dynamic time warping) over the coordinates of their
+    'geo' attributes.
+
+    Parameters
+    ----------
+    nodes_a : :obj:`list` of :obj:`tuple`
+        The first sequence of nodes as 2-tuples of (node_identifier,
+        node_data).
+
+    nodes_b : :obj:`list` of :obj:`tuple`
+        The second sequence of nodes as 2-tuples of (node_identifier,
+        node_data).
+
+    band_width : int, optional
+        The maximum deviation, in nodes of the second sequence, of a matched
+        pair from the diagonal between the first and the last pair. Will be
+        widened if needed to make the last pair reachable.
+
+        Defaults to ``None``, which uses :func:`default_band_width`.
+
+    precise : bool, optional
+        If ``True``, the cost of a pair is the distance of both nodes,
+        otherwise the squared distance is used.
+
+        Defaults to ``False``.
+
+    Returns
+    -------
+    path : :obj:`list` of :obj:`tuple`
+        2-tuples of the indices of the matched nodes of both sequences,
+        ordered along both sequences. The first nodes and the last nodes of
+        both sequences are always matched and every node is part of at least
+        one pair.
+
+    Notes
+    -----
+    The runtime is in O(n * band_width) for a first sequence of n nodes.
+    Among steps of equal cost, diagonal steps are preferred over steps that
+    advance only one of the sequences.
+    """
+
+    return align_coordinates(node_coordinates(nodes_a),
+                             node_coordinates(nodes_b),
+                             band_width=band_width,
+                             precise=precise)
+
+
+def align_coordinates(xyz_a, xyz_b, band_width=None, precise=False):
+    """
+    Aligns two sequences of coordinates given as 3-tuples. Works exactly like
+    :func:`banded_alignment` but does not access any network data, so it can
+    safely be run concurrently.
+    """
+
+    n = len(xyz_a)
+    m = len(xyz_b)
+    if n == 0 or m == 0:
+        return []
+
+    # compute the band around the diagonal, wide enough to always connect
+    # the bands of two consecutive rows
+    if band_width is None:
+        band_width = default_band_width(n, m)
+    slope = (m - 1) / (n - 1) if n > 1 else float(m)
+    band_width = max(band_width, 0.5 * (slope + 1.0))
+    lows = []
+    highs = []
+    for i in range(n):
+        center = i * slope if n > 1 else 0.0
+        lows.append(max(0, int(ceil(center - band_width))))
+        highs.append(min(m - 1, int(floor(center + band_width))))
+    if n == 1:
+        highs[0] = m - 1
+
+    # fill the cost matrix row by row, only the previous row of costs is
+    # kept while the steps are stored for the traceback
+    # steps are 0 for diagonal, 1 for advancing a only, 2 for advancing b only
+    inf = float("inf")
+    steps = []
+    prevCosts = None
+    prevLow = prevHigh = 0
+    for i in range(n):
+        ax, ay, az = xyz_a[i]
+        low = lows[i]
+        high = highs[i]
+        costs = []
+        rowSteps = array("b")
+        for j in range(low, high + 1):
+            bx, by, bz = xyz_b[j]
+            cost = ((ax - bx) * (ax - bx) + (ay - by) * (ay - by) +
+                    (az - bz) * (az - bz))
+            if precise:
+                cost = sqrt(cost)
+            if i == 0 and j == 0:
+                costs.append(cost)
+                rowSteps.append(0)
+                continue
+            best = inf
+            step = 0
+            if i > 0 and prevLow <= j - 1 <= prevHigh:
+                best = prevCosts[j - 1 - prevLow]
+            if i > 0 and prevLow <= j <= prevHigh:
+                if prevCosts[j - prevLow] < best:
+                    best = prevCosts[j - prevLow]
+                    step = 1
+            if j > low and costs[-1] < best:
+                best = costs[-1]
+                step = 2
+            costs.append(best + cost)
+            rowSteps.append(step)
+        steps.append(rowSteps)
+        prevCosts = costs
+        prevLow = low
+        prevHigh = high
+
+    # trace the optimal path back from the last pair
+    path = []
+    i = n - 1
+    j = m - 1
+    while True:
+        path.append((i, j))
+        if i == 0 and j == 0:
+            break
+        step = steps[i][j - lows[i]]
+        if step == 0:
+            i -= 1
+            j -= 1
+        elif step == 1:
+            i -= 1
+        else:
+            j -= 1
+    path.reverse()
+    return path
+
+
+# MAIN ------------------------------------------------------------------------
+if __name__ == '__main__':
+    pass
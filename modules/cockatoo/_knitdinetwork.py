@@ -13,9 +13,11 @@ __all__ = [
 
 # LOCAL MODULE IMPORTS --------------------------------------------------------
 from cockatoo._knitnetworkbase import KnitNetworkBase
+from cockatoo._knitscoring import vector_angle
 from cockatoo.environment import RHINOINSIDE
 from cockatoo.exception import KnitNetworkTopologyError
 from cockatoo.utilities import is_ccw_xy
+from cockatoo.utilities import order_by_angle_xy
 from cockatoo.utilities import pairwise
 from cockatoo.utilities import tween_planes
 
@@ -28,15 +30,11 @@ if RHINOINSIDE:
     rhinoinside.load()
     from Rhino.Geometry import Mesh as RhinoMesh
     from Rhino.Geometry import MeshNgon as RhinoMeshNgon
-    from Rhino.Geometry import NurbsSurface as RhinoNurbsSurface
     from Rhino.Geometry import Plane as RhinoPlane
-    from Rhino.Geometry import Vector3d as RhinoVector3d
 else:
     from Rhino.Geometry import Mesh as RhinoMesh
     from Rhino.Geometry import MeshNgon as RhinoMeshNgon
-    from Rhino.Geometry import NurbsSurface as RhinoNurbsSurface
     from Rhino.Geometry import Plane as RhinoPlane
-    from Rhino.Geometry import Vector3d as RhinoVector3d
 
 # CLASS DECLARATION -----------------------------------------------------------
 
@@ -85,6 +83,11 @@ class KnitDiNetwork(nx.DiGraph, KnitNetworkBase):
             Attributes to add to graph as key=value pairs.
         """
 
+        # keep the storage modes of networks this one is copied from
+        if isinstance(data, KnitNetworkBase):
+            self._columnar = data.columnar
+            self._lazy_edge_geometry = data.lazy_edge_geometry
+
         # initialize using original init method
         super(KnitDiNetwork, self).__init__(data=data, **attr)
 
@@ -117,10 +120,10 @@ class KnitDiNetwork(nx.DiGraph, KnitNetworkBase):
         else:
             name = "KnitDiNetwork"
 
-        nn = len(self.nodes())
-        ce = len(self.contour_edges)
-        wee = len(self.weft_edges)
-        wae = len(self.warp_edges)
+        nn = self.number_of_nodes()
+        ce = self.number_of_contour_edges()
+        wee = self.number_of_weft_edges()
+        wae = self.number_of_warp_edges()
         data = ("({} Nodes, {} Segment Contours, {} Weft, {} Warp)")
         data = data.format(nn, ce, wee, wae)
 
@@ -142,6 +145,23 @@ class KnitDiNetwork(nx.DiGraph, KnitNetworkBase):
 
         return repr(self)
 
+    # NODE ATTRIBUTES ---------------------------------------------------------
+
+    def add_node(self, n, attr_dict=None, **attr):
+        """
+        Adds a single node n and updates its attributes. See
+        :meth:`KnitNetworkBase.add_node`.
+        """
+
+        KnitNetworkBase.add_node(self, n, attr_dict, **attr)
+
+    def add_nodes_from(self, nodes, **attr):
+        """
+        Adds multiple nodes. See :meth:`KnitNetworkBase.add_nodes_from`.
+        """
+
+        KnitNetworkBase.add_nodes_from(self, nodes, **attr)
+
     # NODE WEFT EDGE METHODS --------------------------------------------------
 
     def node_weft_edges_out(self, node, data=False):
@@ -430,6 +450,38 @@ class KnitDiNetwork(nx.DiGraph, KnitNetworkBase):
 
     # FIND FACES (CYCLES) OF NETWORK ------------------------------------------
 
+    def _insert_node_neighbors(self, a, nbrs, xyz):
+        """
+        Sort the neighbors of a network node by inserting them one by one
+        into the ordered list of neighbors.
+        """
+
+        # initialize the ordered list of neighbors with the first node
+        ordered_nbrs = nbrs[0:1]
+
+        # loop over all neighbors except the first one
+        for i, nbr in enumerate(nbrs[1:]):
+            c = xyz[nbr]
+            pos = 0
+            b = xyz[ordered_nbrs[pos]]
+            while not is_ccw_xy(a, b, c):
+                pos += 1
+                if pos > i:
+                    break
+                b = xyz[ordered_nbrs[pos]]
+            if pos == 0:
+                pos -= 1
+                b = xyz[ordered_nbrs[pos]]
+                while is_ccw_xy(a, b, c):
+                    pos -= 1
+                    if pos < -len(ordered_nbrs):
+                        break
+                    b = xyz[ordered_nbrs[pos]]
+                pos += 1
+            ordered_nbrs.insert(pos, nbr)
+
+        return ordered_nbrs
+
     def _sort_node_neighbors(self, key, nbrs, xyz, geo,
                              cbp, nrm, mode=-1, ccw=True):
         """
@@ -437,6 +489,11 @@ class KnitDiNetwork(nx.DiGraph, KnitNetworkBase):
 
         Notes
         -----
+        The neighbors are ordered by the angles of their directions in the
+        local plane. This results in the same cyclic order as inserting them
+        one by one, which is only done if some of the neighbors lie in the
+        same direction.
+
         Based on an implementation inside the COMPAS framework.
         For more info see [7]_.
 
@@ -454,9 +511,6 @@ class KnitDiNetwork(nx.DiGraph, KnitNetworkBase):
         if len(nbrs) == 1:
             return nbrs
 
-        # initialize the ordered list of neighbors with the first node
-        ordered_nbrs = nbrs[0:1]
-
         # retrieve coordinates for current node
         a = xyz[key]
 
@@ -539,33 +593,20 @@ class KnitDiNetwork(nx.DiGraph, KnitNetworkBase):
             # reassign coordinate dictionary for neighbor sorting
             xyz = xyz_local
 
-        # loop over all neighbors except the first one
-        for i, nbr in enumerate(nbrs[1:]):
-            c = xyz[nbr]
-            pos = 0
-            b = xyz[ordered_nbrs[pos]]
-            while not is_ccw_xy(a, b, c):
-                pos += 1
-                if pos > i:
-                    break
-                b = xyz[ordered_nbrs[pos]]
-            if pos == 0:
-                pos -= 1
-                b = xyz[ordered_nbrs[pos]]
-                while is_ccw_xy(a, b, c):
-                    pos -= 1
-                    if pos < -len(ordered_nbrs):
-                        break
-                    b = xyz[ordered_nbrs[pos]]
-                pos += 1
-            ordered_nbrs.insert(pos, nbr)
+        # order the neighbors by their angles, if some of them lie in the
+        # same direction the order depends on the order of insertion
+        order = order_by_angle_xy([a], [[xyz[nbr] for nbr in nbrs]])[0]
+        if order is not None:
+            ordered_nbrs = [nbrs[i] for i in order]
+        else:
+            ordered_nbrs = self._insert_node_neighbors(a, nbrs, xyz)
 
         # return the ordered neighbors in cw or ccw order
         if not ccw:
             return ordered_nbrs[::-1]
         return ordered_nbrs
 
-    def _sort_neighbors(self, mode=-1, ccw=True):
+    def _sort_neighbors(self, mode=-1, ccw=True, parallel=False):
         """
         Sort the neighbors of all network nodes.
 
@@ -591,38 +632,51 @@ class KnitDiNetwork(nx.DiGraph, KnitNetworkBase):
         xyz = {k: (d["x"], d["y"], d["z"]) for k, d in self.nodes_iter(True)}
         geo = {k: d["geo"] for k, d in self.nodes_iter(True)}
 
-        # compute local orientation data when reference geometry is present
-        try:
-            reference_geometry = self.graph["reference_geometry"]
-        except KeyError:
-            reference_geometry = None
-
-        if not reference_geometry:
+        # get the (cached) closest points and normals of all nodes on the
+        # reference geometry, if it is present
+        if mode in (0, 1, 2):
+            cbp, nrm = self.reference_projection(parallel=parallel)
+        else:
             cbp = None
             nrm = None
-        elif isinstance(reference_geometry, RhinoMesh):
-            cbp = {k: reference_geometry.ClosestMeshPoint(geo[k], 0)
-                   for k in self.nodes_iter()}
-            nrm = {k: reference_geometry.NormalAt(cbp[k])
-                   for k in self.nodes_iter()}
-        elif isinstance(reference_geometry, RhinoNurbsSurface):
-            cbp = {k: reference_geometry.ClosestPoint(geo[k])[1:]
-                   for k in self.nodes_iter()}
-            nrm = {k: reference_geometry.NormalAt(cbp[k][0], cbp[k][1])
-                   for k in self.nodes_iter()}
-
-        # loop over all nodes in network
-        for key in self.nodes_iter():
-            nbrs = self[key].keys()
-            sorted_neighbors[key] = self._sort_node_neighbors(
-                                                            key,
-                                                            nbrs,
-                                                            xyz,
-                                                            geo,
-                                                            cbp,
-                                                            nrm,
-                                                            mode=mode,
-                                                            ccw=ccw)
+
+        # without local planes, order the neighbors of all nodes in the world
+        # XY plane at once and only sort nodes with ambiguous orders by
+        # inserting their neighbors
+        if not (cbp and nrm):
+            keys = []
+            neighbors = []
+            for key in self.nodes_iter():
+                keys.append(key)
+                neighbors.append(list(self[key].keys()))
+            orders = order_by_angle_xy([xyz[key] for key in keys],
+                                       [[xyz[nbr] for nbr in nbrs]
+                                        for nbrs in neighbors])
+            for key, nbrs, order in zip(keys, neighbors, orders):
+                if len(nbrs) == 1:
+                    ordered_nbrs = nbrs
+                elif order is not None:
+                    ordered_nbrs = [nbrs[i] for i in order]
+                else:
+                    ordered_nbrs = self._insert_node_neighbors(xyz[key],
+                                                               nbrs,
+                                                               xyz)
+                if not ccw:
+                    ordered_nbrs = ordered_nbrs[::-1]
+                sorted_neighbors[key] = ordered_nbrs
+        else:
+            # loop over all nodes in network
+            for key in self.nodes_iter():
+                nbrs = self[key].keys()
+                sorted_neighbors[key] = self._sort_node_neighbors(
+                                                                key,
+                                                                nbrs,
+                                                                xyz,
+                                                                geo,
+                                                                cbp,
+                                                                nrm,
+                                                                mode=mode,
+                                                                ccw=ccw)
 
         # set the sorted neighbors list as an attribute to the nodes
         for key, nbrs in sorted_neighbors.items():
@@ -658,17 +712,15 @@ class KnitDiNetwork(nx.DiGraph, KnitNetworkBase):
         if len(nbrs) == 1:
             return nbrs[0]
 
-        ab = [-1.0, -1.0, 0.0]
-        rhino_ab = RhinoVector3d(*ab)
+        ab = (-1.0, -1.0, 0.0)
         a = self.node_coordinates(key)
         b = [a[0] + ab[0], a[1] + ab[1], 0]
 
         angles = []
         for nbr in nbrs:
             c = self.node_coordinates(nbr)
-            ac = [c[0] - a[0], c[1] - a[1], 0]
-            rhino_ac = RhinoVector3d(*ac)
-            alpha = RhinoVector3d.VectorAngle(rhino_ab, rhino_ac)
+            ac = (c[0] - a[0], c[1] - a[1], 0.0)
+            alpha = vector_angle(ab, ac)
             if is_ccw_xy(a, b, c, True):
                 alpha = (2 * math.pi) - alpha
             angles.append(alpha)
@@ -711,7 +763,7 @@ class KnitDiNetwork(nx.DiGraph, KnitNetworkBase):
                 break
         return cycle
 
-    def find_cycles(self, mode=-1):
+    def find_cycles(self, mode=-1, parallel=False):
         """
         Finds the cycles (faces) of this network by utilizing a wall-follower
         mechanism.
@@ -736,6 +788,14 @@ class KnitDiNetwork(nx.DiGraph, KnitNetworkBase):
 
             Defaults to ``-1``.
 
+        parallel : bool, optional
+            If ``True`` and ``mode`` is ``0``, ``1`` or ``2``, the nodes are
+            projected onto the reference geometry in parallel using a pool of
+            threads. Only use this if the reference geometry can safely be
+            queried from several threads at once.
+
+            Defaults to ``False``.
+
         Warning
         -------
         Modes other than -1 (default) are only possible if this network has an
@@ -773,7 +833,7 @@ class KnitDiNetwork(nx.DiGraph, KnitNetworkBase):
                 self.halfedge[v][u] = None
 
         # sort the all the neighbors for each node of the network
-        self._sort_neighbors(mode=mode)
+        self._sort_neighbors(mode=mode, parallel=parallel)
 
         # find start node
         # sort leaf nodes by y and x coordinates
@@ -836,7 +896,7 @@ class KnitDiNetwork(nx.DiGraph, KnitNetworkBase):
 
     # MESHING -----------------------------------------------------------------
 
-    def create_mesh(self, mode=-1, max_valence=4):
+    def create_mesh(self, mode=-1, max_valence=4, parallel=False):
         """
         Constructs a mesh from this network by finding cycles and using them as
         mesh faces.
@@ -868,6 +928,14 @@ class KnitDiNetwork(nx.DiGraph, KnitNetworkBase):
 
             Defaults to ``4``.
 
+        parallel : bool, optional
+            If ``True`` and ``mode`` is ``0``, ``1`` or ``2``, the nodes are
+            projected onto the reference geometry in parallel using a pool of
+            threads. Only use this if the reference geometry can safely be
+            queried from several threads at once.
+
+            Defaults to ``False``.
+
         Warning
         -------
         Modes other than ``-1`` are only possible if this network has an
@@ -878,7 +946,7 @@ class KnitDiNetwork(nx.DiGraph, KnitNetworkBase):
         """
 
         # get cycles dict of this network
-        cycles = self.find_cycles(mode=mode)
+        cycles = self.find_cycles(mode=mode, parallel=parallel)
 
         # create an empty mesh
         Mesh = RhinoMesh()
@@ -1135,8 +1203,8 @@ class KnitDiNetwork(nx.DiGraph, KnitNetworkBase):
 
         # every 'end' node defines the start of a row
         # loop over all 'end' nodes
-        col_sources = [(n, d) for n, d in self.nodes_iter(data=True)
-                       if d["increase"] or d["leaf"] or d["end"]]
+        col_sources = self.nodes_with_flags(("increase", "leaf", "end"),
+                                            data=True)
         for node, data in col_sources:
             # continue if this node has already been visited
             if node in seencols:
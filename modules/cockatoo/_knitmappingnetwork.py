@@ -2,6 +2,7 @@
 from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
+from collections import Counter
 
 # DUNDER ----------------------------------------------------------------------
 __all__ = [
@@ -58,10 +59,10 @@ class KnitMappingNetwork(nx.MultiGraph, KnitNetworkBase):
         else:
             name = "KnitMappingNetwork"
 
-        nn = len(self.nodes())
-        ce = len(self.contour_edges)
-        wee = len(self.weft_edges)
-        wae = len(self.warp_edges)
+        nn = self.number_of_nodes()
+        ce = self.number_of_contour_edges()
+        wee = self.number_of_weft_edges()
+        wae = self.number_of_warp_edges()
         data = ("({} Nodes, {} Segment Contours, {} Weft, {} Warp)")
         data = data.format(nn, ce, wee, wae)
 
@@ -83,12 +84,89 @@ class KnitMappingNetwork(nx.MultiGraph, KnitNetworkBase):
 
         return repr(self)
 
+    # SUBGRAPHS ---------------------------------------------------------------
+
+    def subgraph(self, nbunch):
+        """
+        Returns the subgraph induced on the given nodes. See
+        :meth:`KnitNetworkBase.subgraph`.
+        """
+
+        return KnitNetworkBase.subgraph(self, nbunch)
+
     # SEGMENT CONTOUR METHODS -------------------------------------------------
 
+    def _next_chain_segment(self, segment, down, by_end):
+        """
+        Returns the segment following the given segment in a chain of
+        'segment' edges or ``None`` if the chain ends at the given segment.
+        """
+
+        # traversal by segment endnode checks the start of the segment,
+        # traversal by segment start node checks the end of the segment
+        if by_end:
+            node = segment[0]
+        else:
+            node = segment[1]
+
+        # check the node for 'warp' edges pointing to the previous or the
+        # next segment
+        warp_edges = self.node_warp_edges(node)
+        if down:
+            filtered_warp_edges = [we for we in warp_edges
+                                   if we[1] == node-1]
+        else:
+            filtered_warp_edges = [we for we in warp_edges
+                                   if we[1] == node+1]
+
+        # if there is such a 'warp' edge, the chain is finished
+        if (len(filtered_warp_edges) != 0 or
+                (len(warp_edges) == 1 and self.node[node]["leaf"])):
+            return None
+
+        # get all connected segments at the last point of the segment
+        if by_end:
+            connected_segments = self.end_node_segments_by_end(node,
+                                                               data=True)
+        else:
+            connected_segments = self.end_node_segments_by_start(node,
+                                                                 data=True)
+
+        # from these, only get the segment with the lowest id
+        if len(connected_segments) > 0:
+            return connected_segments[0][2]["segment"]
+        return None
+
+    def _chain_from_segment(self, segment, down, by_end, cache):
+        """
+        Returns the chain of segments starting at the given segment, in
+        traversal order. Chains are memoized in the given cache, which maps
+        every traversed segment to a (chain, index) 2-tuple, the chain of the
+        segment being chain[index:]. A traversal reaching a memoized segment
+        reuses its chain instead of traversing it again.
+        """
+
+        visited = []
+        tail = []
+        current = segment
+        while current is not None:
+            entry = cache.get((current, down, by_end))
+            if entry is not None:
+                tail = entry[0][entry[1]:]
+                break
+            visited.append(current)
+            current = self._next_chain_segment(current, down, by_end)
+
+        chain = visited + tail
+        for i, visited_segment in enumerate(visited):
+            cache[(visited_segment, down, by_end)] = (chain, i)
+        return chain
+
     def traverse_segments_until_warp(self,
                                      way_segments,
                                      down=False,
-                                     by_end=False):
+                                     by_end=False,
+                                     cache=None):
         """
         Method for traversing a path of 'segment' edges until a 'warp'
         edge is discovered which points to the previous or the next segment.
@@ -113,6 +191,13 @@ class KnitMappingNetwork(nx.MultiGraph, KnitNetworkBase):
 
             Defaults to ``False``.
 
+        cache : dict, optional
+            Dictionary for memoizing the chain of every traversed segment,
+            keyed by (segment, down, by_end). Can be shared between calls as
+            long as the network is not modified.
+
+            Defaults to ``None``.
+
         Returns
         -------
         segments : :obj:`list`
@@ -128,64 +213,12 @@ class KnitMappingNetwork(nx.MultiGraph, KnitNetworkBase):
                      "segment when calling this method!"
             raise ValueError(errMsg)
 
+        if cache is None:
+            cache = {}
+
         segment_list = way_segments
-        flag = False
-        while flag == False:
-            # set the current segment
-            current_segment = segment_list[-1]
-            # traversal by segment endnode
-            if by_end:
-                # check that segment for 'warp' edges at the start
-                warp_edges = self.node_warp_edges(current_segment[0])
-                if down:
-                    filtered_warp_edges = [we for we in warp_edges
-                                           if we[1] == current_segment[0]-1]
-                else:
-                    filtered_warp_edges = [we for we in warp_edges
-                                           if we[1] == current_segment[0]+1]
-
-                # if there is a warp edge at the start, return the segment_list
-                if (len(filtered_warp_edges) != 0
-                        or (len(warp_edges) == 1
-                            and self.node[current_segment[0]]["leaf"])):
-                    flag = True
-                    break
-            # traversal by segment start node
-            else:
-                # check that segment for 'warp' edges at the end
-                warp_edges = self.node_warp_edges(current_segment[1])
-                if down:
-                    filtered_warp_edges = [we for we in warp_edges
-                                           if we[1] == current_segment[1]-1]
-                else:
-                    filtered_warp_edges = [we for we in warp_edges
-                                           if we[1] == current_segment[1]+1]
-
-                # if there is a warp edge at the end, our chain is finished
-                if (len(filtered_warp_edges) != 0 or
-                        (len(warp_edges) == 1 and
-                         self.node[current_segment[1]]["leaf"])):
-                    flag = True
-                    break
-
-            # get all connected segments at the last point of the segment
-            if by_end:
-                connected_segments = self.end_node_segments_by_end(
-                                                  current_segment[0],
-                                                  data=True)
-            else:
-                connected_segments = self.end_node_segments_by_start(
-                                                  current_segment[1],
-                                                  data=True)
-
-            # from these, only get the segment with the lowest id
-            if len(connected_segments) > 0:
-                # define best candidate segment
-                candidate_segment = connected_segments[0]
-                # append the segment to the segment_list
-                segment_list.append(candidate_segment[2]["segment"])
-            else:
-                break
+        chain = self._chain_from_segment(segment_list[-1], down, by_end, cache)
+        segment_list.extend(chain[1:])
 
         # if we are traversing by end, we need to reverse the resulting list
         if by_end:
@@ -226,6 +259,10 @@ class KnitMappingNetwork(nx.MultiGraph, KnitNetworkBase):
         source_chain_dict = dict()
         target_chain_dict = dict()
 
+        # many 'warp' edges start traversals along the same chains, so the
+        # chain of every traversed segment is memoized
+        traversal_cache = dict()
+
         # BUILD SEGMENT CHAINS BY LOOPING THROUGH 'WARP' EDGES ----------------
 
         # loop through all warp edges and build segment chains
@@ -234,6 +271,10 @@ class KnitMappingNetwork(nx.MultiGraph, KnitNetworkBase):
             source_pass_chains = []
             target_pass_chains = []
 
+            # initialize counters for the chains between two 'end' nodes
+            source_pass_counts = Counter()
+            target_pass_counts = Counter()
+
             # START OF 'WARP' EDGE --------------------------------------------
 
             # get the connected segments at the start of the 'warp edge'
@@ -326,11 +367,13 @@ class KnitMappingNetwork(nx.MultiGraph, KnitNetworkBase):
                     # edge until a 'upwards' connection is found and append
                     # it to the source chains of this pass
                     segment_chain = self.traverse_segments_until_warp(
-                                                            [cs[2]["segment"]],
-                                                            down=False)
-                    index = len([c for c in source_pass_chains
-                                 if c[0][0][0] == segment_chain[0][0]
-                                 and c[0][-1][1] == segment_chain[-1][1]])
+                                                    [cs[2]["segment"]],
+                                                    down=False,
+                                                    cache=traversal_cache)
+                    chain_ends = (segment_chain[0][0],
+                                  segment_chain[-1][1])
+                    index = source_pass_counts[chain_ends]
+                    source_pass_counts[chain_ends] += 1
                     chain_value = (segment_chain[0][0],
                                    segment_chain[-1][1],
                                    index)
@@ -343,11 +386,13 @@ class KnitMappingNetwork(nx.MultiGraph, KnitNetworkBase):
                     # target (!) chains of this pass
                     if warpStartLeafFlag:
                         segment_chain = self.traverse_segments_until_warp(
-                                                            [cs[2]["segment"]],
-                                                            down=True)
-                        index = len([c for c in target_pass_chains
-                                     if c[0][0][0] == segment_chain[0][0]
-                                     and c[0][-1][1] == segment_chain[-1][1]])
+                                                    [cs[2]["segment"]],
+                                                    down=True,
+                                                    cache=traversal_cache)
+                        chain_ends = (segment_chain[0][0],
+                                      segment_chain[-1][1])
+                        index = target_pass_counts[chain_ends]
+                        target_pass_counts[chain_ends] += 1
                         chain_value = (segment_chain[0][0],
                                        segment_chain[-1][1],
                                        index)
@@ -370,11 +415,13 @@ class KnitMappingNetwork(nx.MultiGraph, KnitNetworkBase):
                     # source (!) chains of this pass
                     if warpEndLeafFlag:
                         segment_chain = self.traverse_segments_until_warp(
-                                                            [cs[2]["segment"]],
-                                                            down=False)
-                        index = len([c for c in source_pass_chains
-                                     if c[0][0][0] == segment_chain[0][0]
-                                     and c[0][-1][1] == segment_chain[-1][1]])
+                                                    [cs[2]["segment"]],
+                                                    down=False,
+                                                    cache=traversal_cache)
+                        chain_ends = (segment_chain[0][0],
+                                      segment_chain[-1][1])
+                        index = source_pass_counts[chain_ends]
+                        source_pass_counts[chain_ends] += 1
                         chain_value = (segment_chain[0][0],
                                        segment_chain[-1][1],
                                        index)
@@ -384,11 +431,13 @@ class KnitMappingNetwork(nx.MultiGraph, KnitNetworkBase):
                     # travel the connected segments until a 'downwards'
                     # connection is found and append to target pass chains
                     segment_chain = self.traverse_segments_until_warp(
-                                                            [cs[2]["segment"]],
-                                                            down=True)
-                    index = len([c for c in target_pass_chains
-                                 if c[0][0][0] == segment_chain[0][0]
-                                 and c[0][-1][1] == segment_chain[-1][1]])
+                                                    [cs[2]["segment"]],
+                                                    down=True,
+                                                    cache=traversal_cache)
+                    chain_ends = (segment_chain[0][0],
+                                  segment_chain[-1][1])
+                    index = target_pass_counts[chain_ends]
+                    target_pass_counts[chain_ends] += 1
                     chain_value = (segment_chain[0][0],
                                    segment_chain[-1][1],
                                    index)
@@ -2,10 +2,12 @@
 from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
+from bisect import bisect_left
+from bisect import bisect_right
+from collections import Counter
 from collections import deque
 from collections import OrderedDict
 from math import radians
-from math import pi
 from operator import itemgetter
 
 # DUNDER ----------------------------------------------------------------------
@@ -19,7 +21,13 @@ import networkx as nx
 # LOCAL MODULE IMPORTS --------------------------------------------------------
 from cockatoo._knitnetworkbase import KnitNetworkBase
 from cockatoo._knitmappingnetwork import KnitMappingNetwork
+from cockatoo._knitalignment import align_coordinates
+from cockatoo._knitalignment import node_coordinates
 from cockatoo._knitdinetwork import KnitDiNetwork
+from cockatoo._knitscoring import direction
+from cockatoo._knitscoring import least_angle_candidate
+from cockatoo._knitscoring import rank_candidates
+from cockatoo._knitspatial import NodeKDTree
 from cockatoo.environment import RHINOINSIDE
 from cockatoo.exception import KnitNetworkError
 from cockatoo.exception import KnitNetworkGeometryError
@@ -27,6 +35,7 @@ from cockatoo.exception import NoEndNodesError
 from cockatoo.exception import NoWeftEdgesError
 from cockatoo.exception import MappingNetworkError
 from cockatoo.utilities import pairwise
+from cockatoo.utilities import parallel_map
 
 # RHINO IMPORTS ---------------------------------------------------------------
 if RHINOINSIDE:
@@ -34,7 +43,6 @@ if RHINOINSIDE:
     rhinoinside.load()
     from Rhino.Geometry import Brep as RhinoBrep
     from Rhino.Geometry import Curve as RhinoCurve
-    from Rhino.Geometry import Line as RhinoLine
     from Rhino.Geometry import Interval as RhinoInterval
     from Rhino.Geometry import Mesh as RhinoMesh
     from Rhino.Geometry import NurbsSurface as RhinoNurbsSurface
@@ -45,7 +53,6 @@ if RHINOINSIDE:
 else:
     from Rhino.Geometry import Brep as RhinoBrep
     from Rhino.Geometry import Curve as RhinoCurve
-    from Rhino.Geometry import Line as RhinoLine
     from Rhino.Geometry import Interval as RhinoInterval
     from Rhino.Geometry import Mesh as RhinoMesh
     from Rhino.Geometry import NurbsSurface as RhinoNurbsSurface
@@ -140,6 +147,11 @@ class KnitNetwork(KnitNetworkBase):
             Attributes to add to graph as key=value pairs.
         """
 
+        # keep the storage modes of networks this one is copied from
+        if isinstance(data, KnitNetworkBase):
+            self._columnar = data.columnar
+            self._lazy_edge_geometry = data.lazy_edge_geometry
+
         # initialize using original init method
         super(KnitNetwork, self).__init__(data=data, **attr)
 
@@ -151,7 +163,8 @@ class KnitNetwork(KnitNetworkBase):
 
     @classmethod
     def create_from_contours(cls, contours, course_height,
-                             reference_geometry=None):
+                             reference_geometry=None, columnar=False,
+                             lazy_edge_geometry=False, parallel=False):
         """
         Create and initialize a KnitNetwork based on a set of contours, a
         given course height and an optional reference geometry.
@@ -173,6 +186,27 @@ class KnitNetwork(KnitNetworkBase):
                              or :class:`Rhino.Geometry.Surface`
             Optional underlying geometry that this network is based on.
 
+        columnar : bool, optional
+            If ``True``, the node attributes of the network are stored in
+            columns instead of one dictionary per node, which greatly reduces
+            the memory footprint of large networks.
+
+            Defaults to ``False``.
+
+        lazy_edge_geometry : bool, optional
+            If ``True``, the 'geo' attribute of the edges of the network is
+            only created on first access instead of when the edge is created.
+
+            Defaults to ``False``.
+
+        parallel : bool, optional
+            If ``True``, the contours are divided in parallel using a pool of
+            threads. The nodes are added afterwards in the order of the
+            contours, so the resulting network is identical to the serial
+            division.
+
+            Defaults to ``False``.
+
         Returns
         -------
         KnitNetwork : KnitNetwork
@@ -192,6 +226,8 @@ class KnitNetwork(KnitNetworkBase):
 
         # create network
         network = cls(reference_geometry=reference_geometry)
+        network.columnar = columnar
+        network.lazy_edge_geometry = lazy_edge_geometry
 
         # assign reference_geometry if present and valid
         if reference_geometry:
@@ -206,10 +242,9 @@ class KnitNetwork(KnitNetworkBase):
         else:
             network.graph["reference_geometry"] = None
 
-        # divide the contours and fill network with nodes
-        nodenum = 0
+        # check input
+        curves = []
         for i, crv in enumerate(contours):
-            # check input
             if not isinstance(crv, RhinoCurve):
                 if isinstance(crv, RhinoPolyline):
                     crv = crv.ToPolylineCurve()
@@ -217,39 +252,42 @@ class KnitNetwork(KnitNetworkBase):
                     errMsg = ("Contour at index {} is not ".format(i) +
                               "a valid Curve or Polyline!")
                     raise KnitNetworkGeometryError(errMsg)
+            curves.append(crv)
 
+        def divide(crv):
             # compute divisioncount and divide contour
             dc = round(crv.GetLength() / course_height)
             tcrv = crv.DivideByCount(dc, True)
             if not tcrv:
-                dpts = [crv.PointAtStart, crv.PointAtEnd]
-            else:
-                dpts = [crv.PointAt(t) for t in tcrv]
-
-            # loop over all nodes on the current contour
-            for j, point in enumerate(dpts):
-                # declare node attributes
-                vpos = i
-                vnum = j
-                if j == 0 or j == len(dpts) - 1:
-                    vleaf = True
-                else:
-                    vleaf = False
-                # create network node from rhino point
-                network.node_from_point3d(nodenum,
-                                          point,
-                                          position=vpos,
-                                          num=vnum,
-                                          leaf=vleaf,
-                                          start=False,
-                                          end=False,
-                                          segment=None,
-                                          increase=False,
-                                          decrease=False,
-                                          color=None)
+                return [crv.PointAtStart, crv.PointAtEnd]
+            return [crv.PointAt(t) for t in tcrv]
 
-                # increment counter
-                nodenum += 1
+        # divide all contours
+        if parallel:
+            contour_points = parallel_map(divide, curves)
+        else:
+            contour_points = [divide(crv) for crv in curves]
+
+        # collect the nodes of the network in the order of the contours
+        nodePoints = []
+        nodePositions = []
+        nodeNums = []
+        nodeLeaves = []
+        for i, dpts in enumerate(contour_points):
+            # declare node attributes of all nodes on the current contour,
+            # the first and the last node are 'leaf' nodes
+            last = len(dpts) - 1
+            nodePoints.extend(dpts)
+            nodePositions.extend([i] * len(dpts))
+            nodeNums.extend(range(len(dpts)))
+            nodeLeaves.extend([j == 0 or j == last for j in range(len(dpts))])
+
+        # create all network nodes from rhino points
+        network.nodes_from_point3d(range(len(nodePoints)),
+                                   nodePoints,
+                                   {"position": nodePositions,
+                                    "num": nodeNums,
+                                    "leaf": nodeLeaves})
 
         # call position contour initialization
         network.initialize_position_contour_edges()
@@ -273,10 +311,10 @@ class KnitNetwork(KnitNetworkBase):
         else:
             name = "KnitNetwork"
 
-        nn = len(self.nodes())
-        ce = len(self.contour_edges)
-        wee = len(self.weft_edges)
-        wae = len(self.warp_edges)
+        nn = self.number_of_nodes()
+        ce = self.number_of_contour_edges()
+        wee = self.number_of_weft_edges()
+        wae = self.number_of_warp_edges()
         data = ("({} Nodes, {} Position Contours, {} Weft, {} Warp)")
         data = data.format(nn, ce, wee, wae)
 
@@ -318,13 +356,12 @@ class KnitNetwork(KnitNetworkBase):
         """
 
         # get all nodes by position
-        posList = self.all_nodes_by_position(data=True)
+        posList = self.all_nodes_by_position()
 
-        for i, pos in enumerate(posList):
-            for j, node in enumerate(pos):
-                k = j + 1
-                if k < len(pos):
-                    self.create_contour_edge(node, pos[k])
+        # connect all consecutive nodes of every position contour
+        self.create_contour_edges([(pos[j], pos[j + 1])
+                                   for pos in posList
+                                   for j in range(len(pos) - 1)])
 
     # INITIALIZATION OF 'WEFT' EDGES BETWEEN 'LEAF' NODES ---------------------
 
@@ -494,6 +531,10 @@ class KnitNetwork(KnitNetworkBase):
                 if len(initial_nodes) == 0 or len(target_nodes) == 0:
                     continue
 
+                # build a spatial index of the target nodes
+                target_tree = NodeKDTree(target_nodes)
+                target_keys = [tn[0] for tn in target_nodes]
+
                 # define forbidden node index
                 forbidden_node = -1
 
@@ -507,28 +548,19 @@ class KnitNetwork(KnitNetworkBase):
                     thisPt = node[1]["geo"]
 
                     # filtering according to forbidden nodes
-                    target_nodes = [tn for tn in target_nodes
-                                    if tn[0] >= forbidden_node]
-
-                    if len(target_nodes) == 0:
-                        continue
-
-                    # get four closest nodes on adjacent contour
-                    if precise:
-                        allDists = [thisPt.DistanceTo(tv[1]["geo"])
-                                    for tv in target_nodes]
+                    if forbidden_node == -1:
+                        eligible = None
                     else:
-                        allDists = [thisPt.DistanceToSquared(tv[1]["geo"])
-                                    for tv in target_nodes]
-
-                    # sort the target nodes by distance to current node
-                    allDists, sorted_target_nodes = zip(
-                                *sorted(zip(allDists,
-                                            target_nodes),
-                                        key=itemgetter(0)))
-
-                    # the four closest nodes are the possible connections
-                    possible_connections = sorted_target_nodes[:4]
+                        eligible = (lambda x, f=forbidden_node:
+                                    target_keys[x] >= f)
+
+                    # the four closest nodes on the adjacent contour are the
+                    # possible connections
+                    allDists, possible_connections = target_tree.nearest(
+                                                            thisPt,
+                                                            4,
+                                                            eligible=eligible,
+                                                            precise=precise)
                     # print info on verbose setting
                     v_print("Possible connections: {}".format(
                                     [pc[0] for pc in possible_connections]))
@@ -554,39 +586,19 @@ class KnitNetwork(KnitNetworkBase):
 
                     # get the contours current direction
                     if k < len(initial_nodes)-1:
-                        contourDir = RhinoLine(
-                                    thisPt,
-                                    initial_nodes[k+1][1]["geo"]).Direction
+                        contourDir = direction(thisPt,
+                                               initial_nodes[k+1][1]["geo"])
                     elif k == len(initial_nodes)-1:
-                        contourDir = RhinoLine(
-                                initial_nodes[k-1][1]["geo"], thisPt).Direction
-                    contourDir.Unitize()
-
-                    # get the directions of the possible connections
-                    candidatePoints = [pc[1]["geo"]
-                                       for pc in possible_connections]
-                    candidateDirections = [RhinoLine(
-                            thisPt, cp).Direction for cp in candidatePoints]
-                    [cd.Unitize() for cd in candidateDirections]
-
-                    # get the angles between contour dir and possible conn dir
-                    normals = [RhinoVector3d.CrossProduct(
-                                contourDir, cd) for cd in candidateDirections]
-                    angles = [RhinoVector3d.VectorAngle(
-                              contourDir, cd, n) for cd, n in zip(
-                              candidateDirections, normals)]
-
-                    # compute deltas as a mesaure of perpendicularity
-                    deltas = [abs(a - (0.5 * pi)) for a in angles]
-
-                    # sort possible connections by distance, then by delta
-                    allDists, deltas, angles, most_perpendicular = zip(
-                            *sorted(zip(
-                                    allDists,
-                                    deltas,
-                                    angles,
-                                    possible_connections[:]),
-                                    key=itemgetter(0, 1)))
+                        contourDir = direction(initial_nodes[k-1][1]["geo"],
+                                               thisPt)
+
+                    # sort possible connections by distance, then by the
+                    # perpendicularity of their direction to the contour
+                    allDists, deltas, angles, most_perpendicular = \
+                        rank_candidates(thisPt,
+                                        contourDir,
+                                        possible_connections,
+                                        allDists)
 
                     # get node neighbors
                     nNeighbors = self[node[0]]
@@ -609,35 +621,13 @@ class KnitNetwork(KnitNetworkBase):
                             prevDir = prevEdges[0][2]["geo"].Direction
                         else:
                             prevDir = prevEdges[0][2]["geo"].Direction
-                        prevDir.Unitize()
-
-                        # get directions for the best two candidates
-                        mpA = most_perpendicular[0]
-                        mpB = most_perpendicular[1]
-                        dirA = RhinoLine(thisPt, mpA[1]["geo"]).Direction
-                        dirB = RhinoLine(thisPt, mpB[1]["geo"]).Direction
-                        dirA.Unitize()
-                        dirB.Unitize()
-
-                        # get normals for angle measurement
-                        normalA = RhinoVector3d.CrossProduct(prevDir, dirA)
-                        normalB = RhinoVector3d.CrossProduct(prevDir, dirB)
-
-                        # measure the angles
-                        angleA = RhinoVector3d.VectorAngle(
-                                                        prevDir,
-                                                        dirA,
-                                                        normalA)
-                        angleB = RhinoVector3d.VectorAngle(
-                                                        prevDir,
-                                                        dirB,
-                                                        normalB)
-
-                        # select final candidate for connection by angle
-                        if angleA < angleB:
-                            fCand = mpA
-                        else:
-                            fCand = mpB
+
+                        # select final candidate for connection by the angle
+                        # of the best two candidates to the previous edge
+                        fCand = least_angle_candidate(thisPt,
+                                                      prevDir,
+                                                      most_perpendicular[0],
+                                                      most_perpendicular[1])
 
                         # attempt to connect to final candidate
                         res = self.attempt_weft_connection(
@@ -669,6 +659,92 @@ class KnitNetwork(KnitNetworkBase):
                         if res:
                             forbidden_node = fCand[0]
 
+    def _create_aligned_weft_connections(self,
+                                         contour_set,
+                                         force_continuous_start=False,
+                                         force_continuous_end=False,
+                                         band_width=None,
+                                         precise=False,
+                                         parallel=False,
+                                         verbose=False):
+        """
+        Private method for creating all 'weft' connections between every pair
+        of adjacent contours in the supplied set by aligning them using a
+        banded, monotone dynamic programming matcher.
+
+        Notes
+        -----
+        The alignment of a pair only depends on the coordinates of its nodes.
+        All pairs are aligned first, optionally in parallel, using snapshots
+        of these coordinates. The resulting edges are then created in the
+        order of the pairs, so the result does not depend on the parallel
+        execution.
+        """
+
+        # define verbose print function
+        v_print = print if verbose else lambda *a, **k: None
+
+        if len(contour_set) < 2:
+            v_print("Not enough contours in contour set!")
+            return
+
+        # print info on verbose output
+        v_print("Creating aligned 'weft' connections for contour set...")
+
+        # collect the pairs of contours to align
+        pairs = []
+        for initial_nodes, target_nodes in pairwise(contour_set):
+            # get initial and target nodes without 'leaf' nodes
+            initial_nodes = initial_nodes[1:-1]
+            target_nodes = target_nodes[1:-1]
+
+            # options for continuous start and end
+            if force_continuous_start:
+                initial_nodes = initial_nodes[1:]
+                target_nodes = target_nodes[1:]
+            if force_continuous_end:
+                initial_nodes = initial_nodes[:-1]
+                target_nodes = target_nodes[:-1]
+
+            # skip if one of the contours has no nodes
+            if len(initial_nodes) == 0 or len(target_nodes) == 0:
+                continue
+
+            pairs.append((initial_nodes, target_nodes))
+
+        def align(pair):
+            return align_coordinates(pair[0],
+                                     pair[1],
+                                     band_width=band_width,
+                                     precise=precise)
+
+        # align all pairs of contours
+        snapshots = [(node_coordinates(initial_nodes),
+                      node_coordinates(target_nodes))
+                     for initial_nodes, target_nodes in pairs]
+        if parallel:
+            paths = parallel_map(align, snapshots)
+        else:
+            paths = [align(snapshot) for snapshot in snapshots]
+
+        # connect all matched pairs of nodes in the order of the pairs,
+        # always from the lower to the higher position
+        for (initial_nodes, target_nodes), path in zip(pairs, paths):
+            # print info on verbose setting
+            v_print("Aligned position {} and position {}.".format(
+                                            initial_nodes[0][1]["position"],
+                                            target_nodes[0][1]["position"]))
+
+            edges = []
+            for i, j in path:
+                node = initial_nodes[i]
+                candidate = target_nodes[j]
+                if node[1]["position"] < candidate[1]["position"]:
+                    edges.append((node[0], candidate[0]))
+                else:
+                    edges.append((candidate[0], node[0]))
+            self.create_weft_edges(edges)
+
     def _create_second_pass_weft_connections(self,
                                              contour_set,
                                              include_leaves=False,
@@ -700,6 +776,16 @@ class KnitNetwork(KnitNetworkBase):
         # print info on verbose output
         v_print("Creating second pass 'weft' connections for contour set...")
 
+        # keep the nodes ordered by identifier to extract the windows of
+        # possible connections by bisection, inside of a window the nodes
+        # keep the iteration order of the network
+        node_order = dict((n, x) for x, n in enumerate(self.nodes_iter()))
+        sorted_nodes = sorted(node_order)
+
+        # cache the nodes of the target positions, no nodes are added or
+        # changed during this pass
+        position_nodes = {}
+
         # loop over all nodes of positions (list of lists of tuples)
         for i, pos in enumerate(contour_set):
 
@@ -782,8 +868,12 @@ class KnitNetwork(KnitNetworkBase):
                 # only proceed if there is a target position
                 for target_position in target_positions:
                     # get target nodes
-                    target_nodes = self.nodes_on_position(
+                    try:
+                        target_nodes = position_nodes[target_position]
+                    except KeyError:
+                        target_nodes = self.nodes_on_position(
                                                     target_position, True)
+                        position_nodes[target_position] = target_nodes
 
                     # get the point geo of this node
                     thisPt = node[1]["geo"]
@@ -885,10 +975,11 @@ class KnitNetwork(KnitNetworkBase):
                     elif end_of_window == start_of_window:
                         window = [start_of_window]
                     else:
-                        window = [(n, d) for n, d
-                                  in self.nodes_iter(data=True)
-                                  if n >= start_of_window[0]
-                                  and n <= end_of_window[0]]
+                        window = sorted_nodes[
+                            bisect_left(sorted_nodes, start_of_window[0]):
+                            bisect_right(sorted_nodes, end_of_window[0])]
+                        window.sort(key=node_order.get)
+                        window = [(n, self.node[n]) for n in window]
 
                     if len(window) == 0:
                         # print info on verbose setting
@@ -930,40 +1021,19 @@ class KnitNetwork(KnitNetworkBase):
                         else:
                             # get the contours current direction
                             if k < len(initial_nodes)-1:
-                                contourDir = RhinoLine(
-                                        thisPt,
-                                        initial_nodes[k+1][1]["geo"]).Direction
+                                contourDir = direction(
+                                                thisPt,
+                                                initial_nodes[k+1][1]["geo"])
                             elif k == len(initial_nodes)-1:
-                                contourDir = RhinoLine(
-                                        initial_nodes[k-1][1]["geo"],
-                                        thisPt).Direction
-                            contourDir.Unitize()
-
-                            # get the directions of the possible connections
-                            candidatePoints = [pc[1]["geo"]
-                                               for pc in window]
-                            candidateDirections = [
-                                RhinoLine(thisPt, cp).Direction
-                                for cp in candidatePoints]
-                            [cd.Unitize() for cd in candidateDirections]
-
-                            # get the angles between contour dir and window dir
-                            normals = [RhinoVector3d.CrossProduct(
-                                       contourDir, cd)
-                                       for cd in candidateDirections]
-                            angles = [RhinoVector3d.VectorAngle(
-                                      contourDir, cd, n) for cd, n in zip(
-                                                candidateDirections, normals)]
-
-                            # compute deltas as a mesaure of perpendicularity
-                            deltas = [abs(a - (0.5 * pi)) for a in angles]
+                                contourDir = direction(
+                                                initial_nodes[k-1][1]["geo"],
+                                                thisPt)
 
                             # sort window by distance, then by delta
-                            allDists, deltas, most_perpendicular = zip(*sorted(
-                                        zip(allDists,
-                                            deltas,
-                                            window),
-                                        key=itemgetter(0, 1)))
+                            most_perpendicular = rank_candidates(thisPt,
+                                                                 contourDir,
+                                                                 window,
+                                                                 allDists)[3]
                             # set final candidate node for connection
                             fCand = most_perpendicular[0]
 
@@ -988,7 +1058,10 @@ class KnitNetwork(KnitNetworkBase):
                               max_connections=4,
                               least_connected=False,
                               precise=False,
-                              verbose=False):
+                              verbose=False,
+                              align_contours=False,
+                              band_width=None,
+                              parallel=False):
         """
         Attempts to create all the preliminary 'weft' connections for the
         network.
@@ -1046,6 +1119,30 @@ class KnitNetwork(KnitNetworkBase):
 
             Defaults to ``False``.
 
+        align_contours : bool, optional
+            If ``True``, every pair of adjacent contours is aligned in a
+            single pass using a banded, monotone dynamic programming matcher
+            instead of the greedy first pass and the windowed second pass.
+            The splitting index, the propagation from the center and the
+            options for least connected nodes and maximum connections are
+            ignored in this mode.
+
+            Defaults to ``False``.
+
+        band_width : int, optional
+            The band width, in nodes, used for aligning the contours if
+            ``align_contours`` is ``True``.
+
+            Defaults to ``None``, which uses a tenth of the longer contour of
+            every pair but at least ``4`` nodes.
+
+        parallel : bool, optional
+            If ``True`` and ``align_contours`` is ``True``, the pairs of
+            contours are aligned in parallel using a pool of threads. The
+            resulting edges are identical to the serial alignment.
+
+            Defaults to ``False``.
+
         Raises
         ------
         KnitNetworkError
@@ -1057,6 +1154,13 @@ class KnitNetwork(KnitNetworkBase):
         of Knit Patterns for Non-developable Surfaces* [1]_. Also see
         *KnitCrete - Stay-in-place knitted formworks for complex concrete
         structures* [2]_.
+
+        The alignment mode connects the nodes of every pair of contours along
+        a path of minimal summed distance (dynamic time warping). The path is
+        monotone along both contours, so the resulting 'weft' edges never
+        cross, and every node which is not a 'leaf' node receives at least
+        one connection to each adjacent contour. The runtime for a pair of
+        contours is in O(n * band_width).
         """
 
         # get all the positions / contours
@@ -1079,6 +1183,18 @@ class KnitNetwork(KnitNetworkBase):
             for pair in pairwise(chain):
                 self.create_weft_edge(pair[0], pair[1])
 
+        # align all pairs of adjacent contours in a single pass
+        if align_contours:
+            self._create_aligned_weft_connections(
+                            AllPositions,
+                            force_continuous_start=force_continuous_start,
+                            force_continuous_end=force_continuous_end,
+                            band_width=band_width,
+                            precise=precise,
+                            parallel=parallel,
+                            verbose=verbose)
+            return True
+
         # split position list into two sets based on start index
         leftContours = AllPositions[0:start_index+1]
         # optional propagation from center
@@ -1165,7 +1281,7 @@ class KnitNetwork(KnitNetworkBase):
                 if (len(connected_edges) > 4 or numweft > 2
                         or i == 0 or i == len(contour_set)-1):
                     # set 'end' attribute for this node
-                    self.node[node[0]]["end"] = True
+                    self.update_node(node[0], end=True)
 
                     # loop through all candidate edges
                     for j, edge in enumerate(connected_edges):
@@ -1173,47 +1289,54 @@ class KnitNetwork(KnitNetworkBase):
                         if not edge[2]["weft"]:
                             connected_node = edge[1]
                             # set 'end' attribute to conneted node
-                            self.node[connected_node]["end"] = True
+                            self.update_node(connected_node, end=True)
                             # set 'warp' attribute to current edge
                             self[edge[0]][edge[1]]["warp"] = True
 
     # ASSIGNING OF 'SEGMENT' ATTRIBUTES FOR MAPPING NETWORK -------------------
 
     def _traverse_weft_edge_until_end(self, start_end_node, start_node,
-                                      seen_segments, way_nodes=None,
-                                      way_edges=None, end_nodes=None):
+                                      segment_counts, start_edge):
         """
         Private method for traversing a path of 'weft' edges until another
         'end' node is discoverd.
+
+        Notes
+        -----
+        The path is traversed iteratively, so paths of arbitrary length can be
+        handled. The multiplicity of every segment between two 'end' nodes is
+        counted in the supplied counter map, which is updated in place.
         """
 
-        # initialize output lists
-        if way_nodes == None:
-            way_nodes = deque()
-            way_nodes.append(start_node[0])
-        if way_edges == None:
-            way_edges = deque()
-        if end_nodes == None:
-            end_nodes = deque()
-
-        # get the connected edges and filter them, sort out the ones that
-        # already have a 'segment' attribute assigned
-        connected_weft_edges = self.node_weft_edges(start_node[0], data=True)
-        filtered_weft_edges = []
-        for cwe in connected_weft_edges:
-            if cwe[2]["segment"] != None:
-                continue
-            if cwe in way_edges:
-                continue
-            elif (cwe[1], cwe[0], cwe[2]) in way_edges:
-                continue
-            filtered_weft_edges.append(cwe)
+        # initialize the nodes and edges along the way, the edges are also
+        # kept as a set in both directions for fast membership tests
+        way_nodes = [start_node[0]]
+        way_edges = [start_edge]
+        visited = set([(start_edge[0], start_edge[1]),
+                       (start_edge[1], start_edge[0])])
+
+        current_node = start_node
+        while True:
+            # get the connected edges and filter them, sort out the ones that
+            # already have a 'segment' attribute assigned
+            connected_weft_edges = self.node_weft_edges(current_node[0],
+                                                        data=True)
+            filtered_weft_edges = []
+            for cwe in connected_weft_edges:
+                if cwe[2]["segment"] != None:
+                    continue
+                if (cwe[0], cwe[1]) in visited:
+                    continue
+                filtered_weft_edges.append(cwe)
+
+            if len(filtered_weft_edges) > 1:
+                print(filtered_weft_edges)
+                print("More than one filtered candidate weft edge! " +
+                      "Segment complete...?")
+                return
+            elif len(filtered_weft_edges) == 0:
+                return
 
-        if len(filtered_weft_edges) > 1:
-            print(filtered_weft_edges)
-            print("More than one filtered candidate weft edge! " +
-                  "Segment complete...?")
-        elif len(filtered_weft_edges) == 1:
             fwec = filtered_weft_edges[0]
             connected_node = (fwec[1], self.node[fwec[1]])
 
@@ -1226,51 +1349,38 @@ class KnitNetwork(KnitNetworkBase):
                 else:
                     segStart = start_end_node
                     segEnd = connected_node[0]
-                if (segStart, segEnd) in seen_segments:
-                    segIndex = len([s for s in seen_segments
-                                    if s == (segStart, segEnd)])
-                else:
-                    segIndex = 0
-                # append the relevant data to the lists
-                end_nodes.append(connected_node[0])
+                segIndex = segment_counts[(segStart, segEnd)]
+                segment_counts[(segStart, segEnd)] += 1
                 way_edges.append(fwec)
-                seen_segments.append((segStart, segEnd))
                 # set final 'segment' attributes to all the way nodes
                 for waynode in way_nodes:
-                    self.node[waynode]["segment"] = (segStart,
-                                                     segEnd,
-                                                     segIndex)
+                    self.update_node(waynode, segment=(segStart,
+                                                       segEnd,
+                                                       segIndex))
                 # set final 'segment' attributes to all the way edges
                 for wayedge in way_edges:
                     self[wayedge[0]][wayedge[1]]["segment"] = (segStart,
                                                                segEnd,
                                                                segIndex)
-                # return the seen segments
-                return seen_segments
-            else:
-                # set the initial segment attribute to the node
-                self.node[connected_node[0]]["segment"] = (start_end_node,
-                                                           None,
-                                                           None)
-
-                # set the initial segment attribute to the edge
-                self[fwec[0]][fwec[1]]["segment"] = (start_end_node,
-                                                     None,
-                                                     None)
-                # append the relevant data to the lists
-                way_nodes.append(connected_node[0])
-                way_edges.append(fwec)
-
-                # call this method recursively until a 'end' node is found
-                return self._traverse_weft_edge_until_end(
-                                                    start_end_node,
-                                                    connected_node,
-                                                    seen_segments,
-                                                    way_nodes,
-                                                    way_edges,
-                                                    end_nodes)
-        else:
-            return seen_segments
+                return
+
+            # set the initial segment attribute to the node
+            self.update_node(connected_node[0], segment=(start_end_node,
+                                                         None,
+                                                         None))
+
+            # set the initial segment attribute to the edge
+            self[fwec[0]][fwec[1]]["segment"] = (start_end_node,
+                                                 None,
+                                                 None)
+            # append the relevant data to the lists
+            way_nodes.append(connected_node[0])
+            way_edges.append(fwec)
+            visited.add((fwec[0], fwec[1]))
+            visited.add((fwec[1], fwec[0]))
+
+            # continue until an 'end' node is found
+            current_node = connected_node
 
     def traverse_weft_edges_and_set_attributes(self, start_end_node):
         """
@@ -1286,8 +1396,9 @@ class KnitNetwork(KnitNetworkBase):
         weft_connections = self.node_weft_edges(start_end_node[0], data=True)
         weft_connections.sort(key=lambda x: x[1])
 
-        # loop through all connected weft edges
-        seen_segments = []
+        # loop through all connected weft edges and count the segments
+        # between every pair of 'end' nodes
+        segment_counts = Counter()
         for cwe in weft_connections:
             # check if connected weft edge already has a segment attribute
             if cwe[2]["segment"]:
@@ -1307,32 +1418,32 @@ class KnitNetwork(KnitNetworkBase):
                     segEnd = connected_node[0]
 
                 # get segment index
-                if (segStart, segEnd) in seen_segments:
-                    segIndex = len([s for s in seen_segments
-                                    if s == (segStart, segEnd)])
-                else:
-                    segIndex = 0
+                segIndex = segment_counts[(segStart, segEnd)]
+                segment_counts[(segStart, segEnd)] += 1
 
                 # set the final segment attribute to the edge
                 self[cwe[0]][cwe[1]]["segment"] = (segStart, segEnd, segIndex)
-                seen_segments.append((segStart, segEnd))
 
             # if the connected node is not an end node, we need to travel
             # until we find one
             else:
-                seen_segments = self._traverse_weft_edge_until_end(
-                                                        start_end_node[0],
-                                                        connected_node,
-                                                        seen_segments,
-                                                        way_edges=[cwe])
+                self._traverse_weft_edge_until_end(start_end_node[0],
+                                                   connected_node,
+                                                   segment_counts,
+                                                   cwe)
 
     def assign_segment_attributes(self):
         """
         Get the segmentation for loop generation and assign 'segment'
         attributes to 'weft' edges and nodes.
+
+        Notes
+        -----
+        The traversal only follows 'weft' edges and only writes 'segment'
+        attributes, the structure of the network is never modified.
         """
 
-        if len(self.weft_edges) == 0:
+        if self.number_of_weft_edges() == 0:
             errMsg = ("No 'weft' edges in KnitNetwork! Segmentation " +
                       "is impossible.")
             raise NoWeftEdgesError(errMsg)
@@ -1341,31 +1452,45 @@ class KnitNetwork(KnitNetworkBase):
                       "is impossible.")
             raise NoEndNodesError(errMsg)
 
-        # remove contour and 'warp' edges and store them
-        warp_storage = []
-        contour_storage = []
-        for edge in self.edges(data=True):
-            if not edge[2]["weft"]:
-                if edge[2]["warp"]:
-                    warp_storage.append(edge)
-                else:
-                    contour_storage.append(edge)
-                self.remove_edge(edge[0], edge[1])
-
         # get all 'end' nodes ordered by their 'position' attribute
         all_ends_by_position = self.all_ends_by_position(data=True)
 
-        # loop through all 'end' nodes
+        # loop through all 'end' nodes, the traversal only follows 'weft'
+        # edges, so all other edges are left untouched
         for position in all_ends_by_position:
             for endnode in position:
                 self.traverse_weft_edges_and_set_attributes(endnode)
 
-        # add all previously removed edges back into the network
-        [self.add_edge(edge[0], edge[1], attr_dict=edge[2])
-         for edge in warp_storage + contour_storage]
-
     # CREATION OF MAPPING NETWORK ---------------------------------------------
 
+    def _segment_node_chain(self, start_node, end_node, segment_edges):
+        """
+        Orders the nodes of the 'weft' edges of a segment by walking them from
+        the start node to the end node of the segment. Returns ``None`` if the
+        edges do not form a single unambiguous chain between both nodes.
+        """
+
+        neighbors = {}
+        for edge in segment_edges:
+            neighbors.setdefault(edge[0], []).append(edge[1])
+            neighbors.setdefault(edge[1], []).append(edge[0])
+
+        chain = [start_node]
+        previous = None
+        current = start_node
+        for i in range(len(segment_edges)):
+            candidates = [n for n in neighbors.get(current, ())
+                          if n != previous]
+            if len(candidates) != 1:
+                return None
+            previous = current
+            current = candidates[0]
+            chain.append(current)
+
+        if current != end_node:
+            return None
+        return chain
+
     def create_mapping_network(self):
         """
         Creates the corresponding mapping network for the final loop generation
@@ -1397,21 +1522,19 @@ class KnitNetwork(KnitNetworkBase):
         # create a new KnitMappingNetwork instance
         MappingNetwork = KnitMappingNetwork()
 
-        # get all edges of the current network by segment
-        weft_edges = sorted(self.weft_edges, key=lambda x: x[2]["segment"])
-        warp_edges = self.warp_edges
-
-        # initialize deque container for segment ids
-        segment_ids = deque()
-
-        # loop through all 'weft' edges and fill container with unique ids
-        for edge in weft_edges:
+        # group all 'weft' edges of the current network by segment in a
+        # single pass
+        segment_edges = {}
+        for edge in self.weft_edges:
             segment_id = edge[2]["segment"]
-            if segment_id not in segment_ids:
-                segment_ids.append(segment_id)
+            try:
+                segment_edges[segment_id].append(edge)
+            except KeyError:
+                segment_edges[segment_id] = [edge]
+        warp_edges = self.warp_edges
 
         # error checking
-        if len(segment_ids) == 0:
+        if len(segment_edges) == 0:
             errMsg = (
                     "The network contains no 'weft' edges with a 'segment' " +
                     "attribute assigned to them. A KnitMappingNetwork can " +
@@ -1421,15 +1544,20 @@ class KnitNetwork(KnitNetworkBase):
             raise NoWeftEdgesError(errMsg)
 
         # loop through all unique segment ids
-        for id in segment_ids:
-            # get the corresponding edges for this id and sort them
-            segment_edges = [e for e in weft_edges if e[2]["segment"] == id]
-            segment_edges.sort(key=lambda x: x[0])
+        for id in sorted(segment_edges):
             # extract start and end nodes
             start_node = (id[0], self.node[id[0]])
             endNode = (id[1], self.node[id[1]])
-            # get all the geometry of the individual edges
-            segment_geo = [e[2]["geo"] for e in segment_edges]
+            # walk the chain of nodes from start to end to build the
+            # geometry of the segment
+            chain = self._segment_node_chain(id[0], id[1], segment_edges[id])
+            if chain is not None:
+                segment_geo = RhinoPolyline([self.node[n]["geo"]
+                                             for n in chain])
+            else:
+                # fall back to joining the geometry of the individual edges
+                edges = sorted(segment_edges[id], key=lambda x: x[0])
+                segment_geo = [e[2]["geo"] for e in edges]
             # create a segment contour edge in the mapping network
             res = MappingNetwork.create_segment_contour_edge(
                                                         start_node,
@@ -1489,6 +1617,30 @@ class KnitNetwork(KnitNetworkBase):
                                "The associated mapping network of this " +
                                "KnitNetwork instance.")
 
+    # NODE RELABELING ---------------------------------------------------------
+
+    def _relabel_nodes(self, mapping, seen):
+        """
+        Relabels the nodes of this network and of its mapping network in
+        place using the given mapping.
+
+        Raises
+        ------
+        MappingNetworkError
+            If the mapping network contains nodes which are not part of this
+            network.
+        """
+
+        mapnet = self.mapping_network
+        if mapnet and any(n not in mapping for n in mapnet.nodes_iter()):
+            errMsg = ("Mapping network contains nodes which are not part " +
+                      "of this network, relabeling is impossible!")
+            raise MappingNetworkError(errMsg)
+
+        super(KnitNetwork, self)._relabel_nodes(mapping, seen)
+        if mapnet:
+            mapnet._relabel_nodes(mapping, seen)
+
     # RETRIEVAL OF NODES AND EDGES FROM MAPPING NETWORK -----------------------
 
     def all_nodes_by_segment(self, data=False, edges=False):
@@ -1530,55 +1682,24 @@ class KnitNetwork(KnitNetworkBase):
             raise MappingNetworkError(errMsg)
 
         allSegments = mapnet.segment_contour_edges
-        allSegmentNodes = [(n, d) for n, d
-                           in self.nodes_iter(data=True) if d["segment"]]
-
-        segdict = {}
-        for n in allSegmentNodes:
-            if n[1]["segment"] not in segdict:
-                segdict[n[1]["segment"]] = [n]
-            else:
-                segdict[n[1]["segment"]].append(n)
+        segment_index = self.node.segments
 
         anbs = []
-        if data and edges:
-            for segment in allSegments:
-                segval = segment[2]["segment"]
-                try:
-                    segnodes = sorted(segdict[segval])
-                except KeyError:
-                    segnodes = []
+        for segment in allSegments:
+            segval = segment[2]["segment"]
+            segnodes = sorted(segment_index.nodes(segval))
+            if data:
+                segnodes = [(sn, self.node[sn]) for sn in segnodes]
+            if edges:
                 anbs.append((segval, segnodes, segment))
-        elif data and not edges:
-            for segment in allSegments:
-                segval = segment[2]["segment"]
-                try:
-                    segnodes = sorted(segdict[segval])
-                except KeyError:
-                    segnodes = []
+            else:
                 anbs.append((segval, segnodes))
-        elif not data and edges:
-            for segment in allSegments:
-                segval = segment[2]["segment"]
-                try:
-                    segnodes = sorted(segdict[segval])
-                except KeyError:
-                    segnodes = []
-                anbs.append((segval, [sn[0] for sn in segnodes], segment))
-        elif not data and not edges:
-            for segment in allSegments:
-                segval = segment[2]["segment"]
-                try:
-                    segnodes = sorted(segdict[segval])
-                except KeyError:
-                    segnodes = []
-                anbs.append((segval, [sn[0] for sn in segnodes]))
 
         return anbs
 
     # STITCH WIDTH SAMPLING ---------------------------------------------------
 
-    def sample_segment_contours(self, stitch_width):
+    def sample_segment_contours(self, stitch_width, parallel=False):
         """
         Samples the segment contours of the mapping network with the given
         stitch width. The resulting points are added to the network as nodes
@@ -1591,6 +1712,13 @@ class KnitNetwork(KnitNetworkBase):
         stitch_width : float
             The width of a single stitch inside the knit.
 
+        parallel : bool, optional
+            If ``True``, the segment contours are sampled in parallel using a
+            pool of threads. The resulting nodes and their identifiers are
+            identical to the serial sampling.
+
+            Defaults to ``False``.
+
         Raises
         ------
         MappingNetworkError
@@ -1617,11 +1745,8 @@ class KnitNetwork(KnitNetworkBase):
         # get all the segment geometry ordered by segment number
         segment_contours = mapnet.segment_contour_edges
 
-        # sample all segments with the stitch width
-        nodeindex = maxNode + 1
-        for i, seg in enumerate(segment_contours):
-            # get the geometry of the contour and reparametreize its domain
-            geo = seg[2]["geo"]
+        def sample(geo):
+            # reparametrize the domain of the contour geometry
             geo = geo.ToPolylineCurve()
             geo.Domain = RhinoInterval(0.0, 1.0)
 
@@ -1629,9 +1754,26 @@ class KnitNetwork(KnitNetworkBase):
             crvlen = geo.GetLength()
             density = int(round(crvlen / stitch_width))
             if density == 0:
-                continue
+                return None
             divT = geo.DivideByCount(density, False)
-            divPts = [geo.PointAt(t) for t in divT]
+            return [geo.PointAt(t) for t in divT]
+
+        # sample all segments with the stitch width
+        segment_geo = [seg[2]["geo"] for seg in segment_contours]
+        if parallel:
+            segment_points = parallel_map(sample, segment_geo)
+        else:
+            segment_points = [sample(geo) for geo in segment_geo]
+
+        # collect the nodes of all segments in the order of the segments, so
+        # node identifiers are always assigned deterministically
+        nodePoints = []
+        nodeNums = []
+        nodeLeaves = []
+        nodeSegments = []
+        for seg, divPts in zip(segment_contours, segment_points):
+            if divPts is None:
+                continue
 
             # set leaf attribute
             # TODO: better leaf strategy - this works but assigns false
@@ -1641,23 +1783,19 @@ class KnitNetwork(KnitNetworkBase):
             else:
                 nodeLeaf = False
 
-            # add all the nodes to the network
-            for j, pt in enumerate(divPts):
-                # add node to network
-                self.node_from_point3d(
-                                    nodeindex,
-                                    pt,
-                                    position=None,
-                                    num=j,
-                                    leaf=nodeLeaf,
-                                    start=False,
-                                    end=False,
-                                    segment=seg[2]["segment"],
-                                    increase=False,
-                                    decrease=False,
-                                    color=None)
-                # increment node index
-                nodeindex += 1
+            # collect all the nodes of the segment
+            nodePoints.extend(divPts)
+            nodeNums.extend(range(len(divPts)))
+            nodeLeaves.extend([nodeLeaf] * len(divPts))
+            nodeSegments.extend([seg[2]["segment"]] * len(divPts))
+
+        # add all the nodes to the network
+        nodeindex = maxNode + 1
+        self.nodes_from_point3d(range(nodeindex, nodeindex + len(nodePoints)),
+                                nodePoints,
+                                {"num": nodeNums,
+                                 "leaf": nodeLeaves,
+                                 "segment": nodeSegments})
 
     # CREATION OF FINAL 'WEFT' CONNECTIONS ------------------------------------
 
@@ -1675,31 +1813,20 @@ class KnitNetwork(KnitNetworkBase):
         """
 
         # get all nodes by segment contour
-        SegmentValues, AllNodesBySegment = zip(*self.all_nodes_by_segment(
-                                                                    data=True))
+        SegmentValues, AllNodesBySegment = zip(*self.all_nodes_by_segment())
 
-        # loop through all the segment contours
+        # loop through all the segment contours and collect the final
+        # 'weft' edges, which run from the first 'end' node over all nodes on
+        # the segment to the last 'end' node
+        weftEdges = []
         for i, segment in enumerate(AllNodesBySegment):
             segval = SegmentValues[i]
-            firstNode = (segval[0], self.node[segval[0]])
-            lastNode = (segval[1], self.node[segval[1]])
-
-            if len(segment) == 0:
-                self.create_weft_edge(firstNode, lastNode, segval)
-            elif len(segment) == 1:
-                self.create_weft_edge(firstNode, segment[0], segval)
-                self.create_weft_edge(segment[0], lastNode, segval)
-            else:
-                # loop through all nodes on the current segment and create
-                # the final 'weft' edges
-                for j, node in enumerate(segment):
-                    if j == 0:
-                        self.create_weft_edge(firstNode, node, segval)
-                        self.create_weft_edge(node, segment[j+1], segval)
-                    elif j < len(segment)-1:
-                        self.create_weft_edge(node, segment[j+1], segval)
-                    elif j == len(segment)-1:
-                        self.create_weft_edge(node, lastNode, segval)
+            chain = [segval[0]] + list(segment) + [segval[1]]
+            weftEdges.extend([(chain[j], chain[j + 1], segval)
+                              for j in range(len(chain) - 1)])
+
+        # create the final 'weft' edges
+        self.create_weft_edges(weftEdges)
 
     # CREATION OF FINAL 'WARP' CONNECTIONS ------------------------------------
 
@@ -1804,11 +1931,15 @@ class KnitNetwork(KnitNetworkBase):
 
         # define forbidden node index
         forbidden_node = -1
+        forbidden_index = 0
 
         # do nothing if one of the sets is empty
         if len(initial_nodes) == 0 or len(target_nodes) == 0:
             return
 
+        # build a spatial index of the target nodes
+        target_tree = NodeKDTree(target_nodes)
+
         # loop through all nodes on the current segment
         for k, node in enumerate(initial_nodes):
             # get geometry from current node
@@ -1819,28 +1950,21 @@ class KnitNetwork(KnitNetworkBase):
                                                         node[0],
                                                         node[1]["segment"]))
 
-            # filtering according to forbidden nodes
+            # filtering according to forbidden nodes, only the target nodes
+            # from the forbidden node onwards are eligible
             if forbidden_node != -1:
-                target_nodes = [tnode for tx, tnode in enumerate(target_nodes)
-                                if tx >= target_nodes.index(forbidden_node)]
-            if len(target_nodes) == 0:
-                continue
-
-            # compute distances to target nodes
-            if precise:
-                allDists = [thisPt.DistanceTo(tn[1]["geo"])
-                            for tn in target_nodes]
+                forbidden_index = target_nodes.index(forbidden_node,
+                                                     forbidden_index)
+                eligible = (lambda x, f=forbidden_index: x >= f)
             else:
-                allDists = [thisPt.DistanceToSquared(tn[1]["geo"])
-                            for tn in target_nodes]
-
-            # sort nodes after distances
-            allDists, sorted_target_nodes = zip(*sorted(
-                                                zip(allDists, target_nodes),
-                                                key=itemgetter(0)))
+                eligible = None
 
             # the four nearest nodes are the possible connections
-            possible_connections = sorted_target_nodes[:4]
+            allDists, possible_connections = target_tree.nearest(
+                                                            thisPt,
+                                                            4,
+                                                            eligible=eligible,
+                                                            precise=precise)
             # print info on verbose setting
             v_print("Possible connections: {}".format([pc[0] for pc in
                                                        possible_connections]))
@@ -1865,38 +1989,19 @@ class KnitNetwork(KnitNetworkBase):
 
             # get the segment contours current direction
             if k < len(initial_nodes)-1:
-                contourDir = RhinoLine(thisPt,
-                                       initial_nodes[k+1][1]["geo"]).Direction
+                contourDir = direction(thisPt, initial_nodes[k+1][1]["geo"])
             elif k == len(initial_nodes)-1:
-                contourDir = RhinoLine(
-                                initial_nodes[k-1][1]["geo"], thisPt).Direction
-            contourDir.Unitize()
-
-            # get the directions of the possible connections
-            candidatePoints = [pc[1]["geo"] for pc in possible_connections]
-            candidateDirections = [RhinoLine(
-                            thisPt, cp).Direction for cp in candidatePoints]
-            [cd.Unitize() for cd in candidateDirections]
-
-            # get the angles between segment contour dir and possible conn dir
-            normals = [RhinoVector3d.CrossProduct(
-                       contourDir, cd) for cd in candidateDirections]
-            angles = [RhinoVector3d.VectorAngle(
-                      contourDir, cd, n) for cd, n in zip(
-                      candidateDirections, normals)]
-
-            # compute deltas as a measure of perpendicularity
-            deltas = [abs(a - (0.5 * pi)) for a in angles]
-
-            # sort possible connections first by distance, then by delta
+                contourDir = direction(initial_nodes[k-1][1]["geo"], thisPt)
+
+            # sort possible connections first by distance, then by the
+            # perpendicularity of their direction to the segment contour
             (allDists,
              deltas,
              angles,
-             most_perpendicular) = zip(*sorted(zip(allDists,
-                                                   deltas,
-                                                   angles,
-                                                   possible_connections[:]),
-                                               key=itemgetter(0, 1)))
+             most_perpendicular) = rank_candidates(thisPt,
+                                                   contourDir,
+                                                   possible_connections,
+                                                   allDists)
 
             # compute angle difference
             aDelta = angles[0] - angles[1]
@@ -1919,29 +2024,12 @@ class KnitNetwork(KnitNetworkBase):
                     prevDir = prevEdges[0][2]["geo"].Direction
                 else:
                     prevDir = prevEdges[0][2]["geo"].Direction
-                prevDir.Unitize()
-
-                # get directions for the best two candidates
-                mpA = most_perpendicular[0]
-                mpB = most_perpendicular[1]
-                dirA = RhinoLine(thisPt, mpA[1]["geo"]).Direction
-                dirB = RhinoLine(thisPt, mpB[1]["geo"]).Direction
-                dirA.Unitize()
-                dirB.Unitize()
-
-                # get normals for angle measurement
-                normalA = RhinoVector3d.CrossProduct(prevDir, dirA)
-                normalB = RhinoVector3d.CrossProduct(prevDir, dirB)
-
-                # measure the angles
-                angleA = RhinoVector3d.VectorAngle(prevDir, dirA, normalA)
-                angleB = RhinoVector3d.VectorAngle(prevDir, dirB, normalB)
 
                 # select final candidate for connection
-                if angleA < angleB:
-                    fCand = mpA
-                else:
-                    fCand = mpB
+                fCand = least_angle_candidate(thisPt,
+                                              prevDir,
+                                              most_perpendicular[0],
+                                              most_perpendicular[1])
 
                 # attempt connection to final candidate
                 res = self.attempt_warp_connection(
@@ -1980,6 +2068,13 @@ class KnitNetwork(KnitNetworkBase):
         Private method for creating second pass 'warp' connections for the
         given set of contours.
 
+        Returns
+        -------
+        node : :obj:`tuple`
+            2-tuple of (node_identifier, node_data) of the node in the window
+            the source node has been connected to or ``None`` if the window
+            is empty.
+
         Notes
         -----
         Closely resembles the implementation described in *Automated Generation
@@ -1994,6 +2089,7 @@ class KnitNetwork(KnitNetworkBase):
         if len(window) == 0:
             # print info on verbose setting
             v_print("Length of window is 0, skipping...")
+            return None
         elif len(window) == 1:
             # print info on verbose setting
             v_print("Window has only one node.")
@@ -2004,6 +2100,7 @@ class KnitNetwork(KnitNetworkBase):
                 self.create_warp_edge(window[0], source_nodes[source_index])
             else:
                 self.create_warp_edge(source_nodes[source_index], window[0])
+            return window[0]
         else:
             # retrive the point of the current source node
             thisPt = source_nodes[source_index][1]["geo"]
@@ -2024,35 +2121,17 @@ class KnitNetwork(KnitNetworkBase):
 
             # get the contours current direction
             if source_index < len(source_nodes)-1:
-                sourceDir = RhinoLine(
-                            thisPt,
-                            source_nodes[source_index+1][1]["geo"]).Direction
+                sourceDir = direction(thisPt,
+                                      source_nodes[source_index+1][1]["geo"])
             elif source_index == len(source_nodes)-1:
-                sourceDir = RhinoLine(source_nodes[source_index-1][1]["geo"],
-                                      thisPt).Direction
-            sourceDir.Unitize()
-
-            # get the directions of the possible connections
-            candidatePoints = [pc[1]["geo"] for pc in window]
-            candidateDirections = [RhinoLine(thisPt, cp).Direction for cp
-                                   in candidatePoints]
-            [cd.Unitize() for cd in candidateDirections]
-
-            # get the angles between contour dir and window dir
-            normals = [RhinoVector3d.CrossProduct(sourceDir, cd)
-                       for cd in candidateDirections]
-            angles = [RhinoVector3d.VectorAngle(sourceDir, cd, n) for cd, n
-                      in zip(candidateDirections, normals)]
-
-            # compute deltas as a mesaure of perpendicularity
-            deltas = [abs(a - (0.5 * pi)) for a in angles]
+                sourceDir = direction(source_nodes[source_index-1][1]["geo"],
+                                      thisPt)
 
             # sort window by distance, then by delta
-            allDists, deltas, most_perpendicular = zip(*sorted(
-                                                    zip(allDists,
-                                                        deltas,
-                                                        window),
-                                                    key=itemgetter(0, 1)))
+            most_perpendicular = rank_candidates(thisPt,
+                                                 sourceDir,
+                                                 window,
+                                                 allDists)[3]
             # set final candidate node for connection
             fCand = most_perpendicular[0]
 
@@ -2066,6 +2145,132 @@ class KnitNetwork(KnitNetworkBase):
                 self.create_warp_edge(fCand, source_nodes[source_index])
             else:
                 self.create_warp_edge(source_nodes[source_index], fCand)
+            return fCand
+
+    def _create_second_pass_warp_connections(self, source_chain_nodes,
+                                             target_chain_nodes, source_key,
+                                             target_key, precise=False,
+                                             verbose=False, reverse=False):
+        """
+        Private method for creating second pass 'warp' connections from all
+        unconnected nodes of a source chain to the windows of a target chain
+        between the already connected nodes.
+
+        Notes
+        -----
+        The index of every node inside of the target chain as well as whether
+        a node of the target chain can close a window are computed once for
+        the pair of chains and updated after every new connection, so finding
+        a window does not involve querying the 'warp' edges of the nodes of
+        the target chain.
+        """
+
+        # define verbose print function
+        v_print = print if verbose else lambda *a, **k: None
+
+        # map every node of the target chain to its indices in the chain
+        target_indices = dict()
+        for n, tcn in enumerate(target_chain_nodes):
+            try:
+                target_indices[tcn[0]].append(n)
+            except KeyError:
+                target_indices[tcn[0]] = [n]
+
+        source_ids = set([scn[0] for scn in source_chain_nodes])
+        lastSource = source_chain_nodes[-1][0]
+
+        def closes_window(node):
+            # a node of the target chain closes a window if it is the last
+            # node of the source chain or connected to the source chain
+            if node == lastSource:
+                return True
+            for we in self.node_warp_edges(node, data=False):
+                if we[1] in source_ids:
+                    return True
+            return False
+
+        window_ends = [closes_window(tcn[0]) for tcn in target_chain_nodes]
+
+        # initialize start of window marker
+        start_of_window = -1
+
+        # loop through all nodes on the source chain
+        for k, node in enumerate(source_chain_nodes):
+            # if the node is the first or the last node, it is defined as
+            # connected per-se
+            node_connected = (k == 0 or k == len(source_chain_nodes)-1)
+
+            # find out if the current node is already connected to the
+            # target chain, which also defines the start of the window for
+            # the next node
+            for we in self.node_warp_edges(node[0], data=False):
+                indices = target_indices.get(we[1])
+                if indices is not None:
+                    if indices[-1] > start_of_window:
+                        start_of_window = indices[-1]
+                    node_connected = True
+
+            # if the node is connected, there is nothing left to do
+            if node_connected:
+                continue
+
+            v_print("Node: {}".format(node[0]))
+            v_print("Start of window: {}".format(start_of_window))
+
+            # re-check start of window for <.====/ case
+            if len(target_chain_nodes) >= 2 and start_of_window == -1:
+                if target_chain_nodes[0] == source_chain_nodes[0]:
+                    start_of_window = 1
+                else:
+                    start_of_window = 0
+
+            # find the end of the window
+            end_of_window = None
+            for n in range(max(start_of_window, 0), len(target_chain_nodes)):
+                if window_ends[n]:
+                    end_of_window = n
+                    if end_of_window and end_of_window > start_of_window:
+                        break
+
+            # re-check end of window for /====.> case
+            if end_of_window:
+                tcn_we = target_chain_nodes[end_of_window]
+                ccn_end = source_chain_nodes[-1]
+                ccn_len = len(source_chain_nodes)
+                if tcn_we == ccn_end and k == ccn_len-2:
+                    end_of_window -= 1
+            if end_of_window is None or end_of_window < start_of_window:
+                start_of_window = -1
+                end_of_window = None
+
+            # if there is no valid window, continue with the next node
+            if start_of_window == -1 or end_of_window is None:
+                v_print("No valid window for current chain!")
+                continue
+
+            if end_of_window == len(target_chain_nodes)-1:
+                window = target_chain_nodes[start_of_window:]
+            else:
+                window = target_chain_nodes[start_of_window:end_of_window+1]
+
+            v_print("End of window: {}".format(end_of_window))
+            v_print("Connecting chain {} to chain {}.".format(source_key,
+                                                              target_key))
+
+            # execute connection to target
+            connected = self._create_second_pass_warp_connection(
+                                                        source_chain_nodes,
+                                                        k,
+                                                        window,
+                                                        precise=precise,
+                                                        verbose=verbose,
+                                                        reverse=reverse)
+
+            # update the nodes of the target chain affected by the new edge
+            if connected is not None:
+                for nid in (node[0], connected[0]):
+                    for n in target_indices.get(nid, ()):
+                        window_ends[n] = closes_window(nid)
 
     def create_final_warp_connections(self, max_connections=4,
                                       include_end_nodes=True, precise=False,
@@ -2132,9 +2337,61 @@ class KnitNetwork(KnitNetworkBase):
                                                                     False,
                                                                     True)
 
+        # index the target chains by their start and end nodes, keeping the
+        # order of the chain dictionary for breaking ties between distances
+        target_chain_index = dict()
+        for key in target_chain_dict:
+            try:
+                target_chain_index[(key[0], key[1])].append(key)
+            except KeyError:
+                target_chain_index[(key[0], key[1])] = [key]
+
         # initialize container dict for connected chains
         connected_chains = dict()
 
+        # the joined geometry of a chain is only needed for a sample point,
+        # so the sample points are memoized by the segment ids of the chain
+        chain_sample_points = dict()
+
+        def chain_sample_point(chain_ids):
+            try:
+                return chain_sample_points[chain_ids]
+            except KeyError:
+                pass
+            chain_geo = RhinoCurve.JoinCurves(
+                            [SegmentDict[id][0][2]["geo"].ToPolylineCurve()
+                             for id in chain_ids])[0]
+            spt = chain_geo.PointAtNormalizedLength(0.5)
+            chain_sample_points[chain_ids] = spt
+            return spt
+
+        def possible_target_keys(start, end):
+            # get the keys of all unconnected target chains between two
+            # 'end' nodes
+            return [key for key in target_chain_index.get((start, end), ())
+                    if key not in connected_chains]
+
+        def closest_target_key(keys, spt, exclude_geo=None):
+            # find the key of the target chain with the sample point closest
+            # to the given sample point, the first key wins on equal distance
+            closest = None
+            closestDist = None
+            for key in keys:
+                ptc = tuple(target_chain_dict[key])
+                if exclude_geo is not None:
+                    ptc_geo_list = [SegmentDict[id][0][2]["geo"]
+                                    for id in ptc]
+                    if ptc_geo_list == exclude_geo:
+                        continue
+                if precise:
+                    ptc_dist = spt.DistanceTo(chain_sample_point(ptc))
+                else:
+                    ptc_dist = spt.DistanceToSquared(chain_sample_point(ptc))
+                if closest is None or ptc_dist < closestDist:
+                    closest = key
+                    closestDist = ptc_dist
+            return closest
+
         # initialize segment mapping dictionaries
         source_to_target = OrderedDict()
         target_to_source = OrderedDict()
@@ -2159,9 +2416,7 @@ class KnitNetwork(KnitNetworkBase):
             # extract the current chains geometry
             current_chain_geo_list = [SegmentDict[id][0][2]["geo"]
                                       for id in current_ids]
-            current_chain_geo = RhinoCurve.JoinCurves(
-                [ccg.ToPolylineCurve() for ccg in current_chain_geo_list])[0]
-            current_chain_spt = current_chain_geo.PointAtNormalizedLength(0.5)
+            current_chain_spt = chain_sample_point(current_ids)
             # retrieve the current segments from the segment dictionary by id
             current_segment_nodes = [SegmentDict[id][1] for id in current_ids]
             # retrieve the current nodes from the list of current segments
@@ -2182,49 +2437,12 @@ class KnitNetwork(KnitNetworkBase):
             # CASE 1 - ENCLOSED SHORT ROW <====> ALL CASES --------------------
 
             # look for possible targets using a guess about the chain value
-            possible_target_keys = [key for key in target_chain_dict
-                                    if key[0] == chain_value[0]
-                                    and key[1] == chain_value[1]
-                                    and key not in connected_chains]
-            if len(possible_target_keys) > 0:
-                # find the correct chain by using geometric distance
-                possible_target_chains = [target_chain_dict[tk] for tk
-                                          in possible_target_keys]
-                # for every chain in the possible target chains, get the
-                # geometry and compute a sample distance
-                filtered_target_keys = []
-                possible_target_chain_dists = []
-                for j, ptc in enumerate(possible_target_chains):
-                    # retrieve possible target geometry and join into one crv
-                    ptc_geo_list = [SegmentDict[id][0][2]["geo"] for id in ptc]
-                    if ptc_geo_list == current_chain_geo_list:
-                        continue
-                    ptc_geo = RhinoCurve.JoinCurves(
-                        [ptcg.ToPolylineCurve() for ptcg in ptc_geo_list])[0]
-                    # get a sample point and measure the distance to the
-                    # source chain sample point
-                    ptc_spt = ptc_geo.PointAtNormalizedLength(0.5)
-                    if precise:
-                        ptc_dist = current_chain_spt.DistanceTo(ptc_spt)
-                    else:
-                        ptc_dist = current_chain_spt.DistanceToSquared(ptc_spt)
-                    # append the filtered key to the key list
-                    filtered_target_keys.append(possible_target_keys[j])
-                    # append the measured distance to the distance list
-                    possible_target_chain_dists.append(ptc_dist)
-                if len(filtered_target_keys) > 0:
-                    # sort filtered target keys using the distances
-                    possible_target_chain_dists, filtered_target_keys = zip(
-                                    *sorted(zip(
-                                                possible_target_chain_dists,
-                                                filtered_target_keys),
-                                            key=itemgetter(0)))
-                    # set target key
-                    target_key = filtered_target_keys[0]
-                else:
-                    target_key = None
-            else:
-                target_key = None
+            # and find the correct chain by using geometric distance
+            target_key = closest_target_key(
+                            possible_target_keys(chain_value[0],
+                                                 chain_value[1]),
+                            current_chain_spt,
+                            exclude_geo=current_chain_geo_list)
 
             # attempt warp connections if we have found a correct key
             if target_key:
@@ -2272,41 +2490,14 @@ class KnitNetwork(KnitNetworkBase):
             # CASE 2 - SHORT ROW TO THE RIGHT <=====/ ALL CASES ---------------
 
             # look for possible targets using a guess about the chain value
-            possible_target_keys = [key for key in target_chain_dict
-                                    if key[0] == chain_value[0]
-                                    and key[1] == chain_value[1]+1
-                                    and key not in connected_chains]
-            if len(possible_target_keys) == 1:
-                target_key = possible_target_keys[0]
-            elif len(possible_target_keys) > 1:
-                # find the correct chain by using geometric distance
-                possible_target_chains = [target_chain_dict[tk] for tk
-                                          in possible_target_keys]
-                # for every chain in the possible target chains, get the
-                # geometry and compute a sample distance
-                possible_target_chain_dists = []
-                for ptc in possible_target_chains:
-                    # retrieve possible target geometry and join into one crv
-                    ptc_geo = [SegmentDict[id][0][2]["geo"] for id in ptc]
-                    ptc_geo = RhinoCurve.JoinCurves([pg.ToPolylineCurve()
-                                                     for pg in ptc_geo])[0]
-                    # get a sample point and measure the distance to the
-                    # source chain sample point
-                    ptc_spt = ptc_geo.PointAtNormalizedLength(0.5)
-                    if precise:
-                        ptc_dist = current_chain_spt.DistanceTo(ptc_spt)
-                    else:
-                        ptc_dist = current_chain_spt.DistanceToSquared(ptc_spt)
-                    # append the measured distance to the list
-                    possible_target_chain_dists.append(ptc_dist)
-                # sort possible target keys using the distances
-                possible_target_chain_dists, possible_target_keys = zip(
-                                    *sorted(zip(possible_target_chain_dists,
-                                                possible_target_keys),
-                                            key=itemgetter(0)))
-                target_key = possible_target_keys[0]
+            target_keys = possible_target_keys(chain_value[0],
+                                               chain_value[1] + 1)
+            if len(target_keys) == 1:
+                target_key = target_keys[0]
             else:
-                target_key = None
+                # find the correct chain by using geometric distance
+                target_key = closest_target_key(target_keys,
+                                                current_chain_spt)
 
             # attempt warp connections if we have found a correct key
             if target_key:
@@ -2362,41 +2553,14 @@ class KnitNetwork(KnitNetworkBase):
             # CASE 3 - SHORT ROW TO THE LEFT /====> ALL CASES -----------------
 
             # look for possible targets using a guess about the chain value
-            possible_target_keys = [key for key in target_chain_dict
-                                    if key[0] == chain_value[0]+1
-                                    and key[1] == chain_value[1]
-                                    and key not in connected_chains]
-            if len(possible_target_keys) == 1:
-                target_key = possible_target_keys[0]
-            elif len(possible_target_keys) > 1:
-                # find the correct chain by using geometric distance
-                possible_target_chains = [target_chain_dict[tk] for tk
-                                          in possible_target_keys]
-                # for every chain in the possible target chains, get the
-                # geometry and compute a sample distance
-                possible_target_chain_dists = []
-                for ptc in possible_target_chains:
-                    # retrieve possible target geometry and join into one crv
-                    ptc_geo = [SegmentDict[id][0][2]["geo"] for id in ptc]
-                    ptc_geo = RhinoCurve.JoinCurves(
-                        [pg.ToPolylineCurve() for pg in ptc_geo])[0]
-                    # get a sample point and measure the distance to the
-                    # source chain sample point
-                    ptc_spt = ptc_geo.PointAtNormalizedLength(0.5)
-                    if precise:
-                        ptc_dist = current_chain_spt.DistanceTo(ptc_spt)
-                    else:
-                        ptc_dist = current_chain_spt.DistanceToSquared(ptc_spt)
-                    # append the measured distance to the list
-                    possible_target_chain_dists.append(ptc_dist)
-                # sort possible target keys using the distances
-                possible_target_chain_dists, possible_target_keys = zip(
-                                    *sorted(zip(possible_target_chain_dists,
-                                                possible_target_keys),
-                                            key=itemgetter(0)))
-                target_key = possible_target_keys[0]
+            target_keys = possible_target_keys(chain_value[0] + 1,
+                                               chain_value[1])
+            if len(target_keys) == 1:
+                target_key = target_keys[0]
             else:
-                target_key = None
+                # find the correct chain by using geometric distance
+                target_key = closest_target_key(target_keys,
+                                                current_chain_spt)
 
             # attempt warp connections if we have found a correct key
             if target_key:
@@ -2451,41 +2615,14 @@ class KnitNetwork(KnitNetworkBase):
             # CASE 4 - REGULAR ROW /=====/ ALL CASES --------------------------
 
             # look for possible targets using a guess about the chain value
-            possible_target_keys = [key for key in target_chain_dict
-                                    if key[0] == chain_value[0]+1
-                                    and key[1] == chain_value[1]+1
-                                    and key not in connected_chains]
-            if len(possible_target_keys) == 1:
-                target_key = possible_target_keys[0]
-            elif len(possible_target_keys) > 1:
-                # find the correct chain by using geometric distance
-                possible_target_chains = [target_chain_dict[tk] for tk
-                                          in possible_target_keys]
-                # for every chain in the possible target chains, get the
-                # geometry and compute a sample distance
-                possible_target_chain_dists = []
-                for ptc in possible_target_chains:
-                    # retrieve possible target geometry and join into one crv
-                    ptc_geo = [SegmentDict[id][0][2]["geo"] for id in ptc]
-                    ptc_geo = RhinoCurve.JoinCurves([pg.ToPolylineCurve()
-                                                     for pg in ptc_geo])[0]
-                    # get a sample point and measure the distance to the
-                    # source chain sample point
-                    ptc_spt = ptc_geo.PointAtNormalizedLength(0.5)
-                    if precise:
-                        ptc_dist = current_chain_spt.DistanceTo(ptc_spt)
-                    else:
-                        ptc_dist = current_chain_spt.DistanceToSquared(ptc_spt)
-                    # append the measured distance to the list
-                    possible_target_chain_dists.append(ptc_dist)
-                # sort possible target keys using the distances
-                possible_target_chain_dists, possible_target_keys = zip(
-                                    *sorted(zip(possible_target_chain_dists,
-                                                possible_target_keys),
-                                            key=itemgetter(0)))
-                target_key = possible_target_keys[0]
+            target_keys = possible_target_keys(chain_value[0] + 1,
+                                               chain_value[1] + 1)
+            if len(target_keys) == 1:
+                target_key = target_keys[0]
             else:
-                target_key = None
+                # find the correct chain by using geometric distance
+                target_key = closest_target_key(target_keys,
+                                                current_chain_spt)
 
             # attempt warp connections if we have found a correct key
             if target_key:
@@ -2566,109 +2703,20 @@ class KnitNetwork(KnitNetworkBase):
             target_chain_nodes.append((target_chain[-1][1],
                                        self.node[target_chain[-1][1]]))
 
-            # initialize start of window marker
-            start_of_window = -1
-
-            # loop through all nodes on the current chain
-            for k, node in enumerate(current_chain_nodes):
-                # find out if the current node is already principally connected
-                node_connected = False
-                # if the node is the first or the last node, it is defined as
-                # connected per-se
-                if k == 0 or k == len(current_chain_nodes)-1:
-                    node_connected = True
-
-                # find out if the current node is already connected to the
-                # target chain, get node warp edges and their target nodes
-                node_warp_edges = self.node_warp_edges(node[0], data=False)
-                warp_edge_targets = [we[1] for we in node_warp_edges]
-                # loop over warp edge targets to get the start of the window
-                for wet in warp_edge_targets:
-                    # loop over target chain nodes
-                    for n, tcn in enumerate(target_chain_nodes):
-                        # if a warp edge target is in the target chain,
-                        # the node is connected and star of window for next
-                        # node is defined
-                        if wet == tcn[0]:
-                            if n > start_of_window or start_of_window == -1:
-                                start_of_window = n
-                            node_connected = True
-
-                # if the node is not connected to the target chain, we
-                # need to find the end of the window
-                if not node_connected:
-                    v_print("Node: {}".format(node[0]))
-                    v_print("Start of window: {}".format(start_of_window))
-
-                    # re-check start of window for <.====/ case
-                    if len(target_chain_nodes) >= 2 and start_of_window == -1:
-                        if target_chain_nodes[0] == current_chain_nodes[0]:
-                            start_of_window = 1
-                        else:
-                            start_of_window = 0
-
-                    end_of_window = None
-                    # loop over target chain nodes
-                    for n, tcn in enumerate(target_chain_nodes):
-                        if n >= start_of_window:
-                            if tcn[0] == current_chain_nodes[-1][0]:
-                                end_of_window = n
-                            # get all warp edges of the current target node
-                            # and their targets
-                            tcn_warp_edges = self.node_warp_edges(tcn[0],
-                                                                  data=False)
-                            tcn_warp_edge_targets = [we[1] for we
-                                                     in tcn_warp_edges]
-                            # loop over warp edge targets
-                            for twet in tcn_warp_edge_targets:
-                                if (twet in [cn[0] for cn
-                                             in current_chain_nodes]):
-                                    end_of_window = n
-                                    break
-                        if end_of_window and end_of_window > start_of_window:
-                            break
-
-                    # re-check end of window for /====.> case
-                    if end_of_window:
-                        tcn_we = target_chain_nodes[end_of_window]
-                        ccn_end = current_chain_nodes[-1]
-                        ccn_len = len(current_chain_nodes)
-                        if tcn_we == ccn_end and k == ccn_len-2:
-                            end_of_window -= 1
-                    if end_of_window < start_of_window:
-                        start_of_window = -1
-                        end_of_window = None
-
-                    # if we have a valid window, set the target nodes
-                    if start_of_window != -1 and end_of_window != None:
-                        if end_of_window == len(target_chain_nodes)-1:
-                            window = target_chain_nodes[start_of_window:]
-                        else:
-                            window = target_chain_nodes[start_of_window:
-                                                        end_of_window+1]
-
-                        v_print("End of window: {}".format(end_of_window))
-
-                        # execute connection to target
-                        if cckey <= tckey:
-                            rev = False
-                        else:
-                            rev = True
+            # set the direction of the new 'warp' edges
+            if cckey <= tckey:
+                rev = False
+            else:
+                rev = True
 
-                        v_print("Connecting chain {} to chain {}".format(
-                                                                    cckey,
-                                                                    tckey))
-
-                        self._create_second_pass_warp_connection(
-                                                        current_chain_nodes,
-                                                        k,
-                                                        window,
-                                                        precise=precise,
-                                                        verbose=verbose,
-                                                        reverse=rev)
-                    else:
-                        # print info on verbose setting
-                        v_print("No valid window for current chain!")
+            # create second pass 'warp' connections between the chains
+            self._create_second_pass_warp_connections(current_chain_nodes,
+                                                      target_chain_nodes,
+                                                      cckey,
+                                                      tckey,
+                                                      precise=precise,
+                                                      verbose=verbose,
+                                                      reverse=rev)
 
         # INVOKE SECOND PASS FOR TARGET ---> SOURCE ---------------------------
         for i, current_chain in enumerate(target_to_source):
@@ -2699,110 +2747,20 @@ class KnitNetwork(KnitNetworkBase):
             target_chain_nodes.append((target_chain[-1][1],
                                        self.node[target_chain[-1][1]]))
 
-            # initialize start of window marker
-            start_of_window = -1
-
-            # loop through all nodes on the current chain
-            for k, node in enumerate(current_chain_nodes):
-                # find out if the current node is already principally connected
-                node_connected = False
-                if k == 0 or k == len(current_chain_nodes)-1:
-                    node_connected = True
-
-                # find out if the current node is already connected to the
-                # target chain
-                node_warp_edges = self.node_warp_edges(node[0], data=False)
-                warp_edge_targets = [we[1] for we in node_warp_edges]
-                # loop over weft edge targets
-                for wet in warp_edge_targets:
-                    # if warp edge target  is in target chain nodes, node
-                    # is connected and the start of our window for the next
-                    # node
-                    for n, tcn in enumerate(target_chain_nodes):
-                        if wet == tcn[0]:
-                            if n > start_of_window or start_of_window == -1:
-                                start_of_window = n
-                            node_connected = True
-
-                # if the node is not connected to the target chain, we
-                # need to find the end of the window
-                if not node_connected:
-                    # print info on verbose output
-                    v_print("Node: {}".format(node[0]))
-                    v_print("Start of window: {}".format(start_of_window))
-
-                    # re-check start of window for <.====/ case
-                    if len(target_chain_nodes) >= 2 and start_of_window == -1:
-                        if target_chain_nodes[0] == current_chain_nodes[0]:
-                            start_of_window = 1
-                        else:
-                            start_of_window = 0
-
-                    end_of_window = None
-                    # loop over target chain nodes
-                    for n, tcn in enumerate(target_chain_nodes):
-                        if n >= start_of_window:
-                            if tcn[0] == current_chain_nodes[-1][0]:
-                                end_of_window = n
-                            # get all warp edges of the current target node and
-                            # their targets
-                            tcn_warp_edges = self.node_warp_edges(tcn[0],
-                                                                  data=False)
-                            tcn_warp_edge_targets = [we[1] for we
-                                                     in tcn_warp_edges]
-                            # loop over warp edge targets of current target
-                            # node
-                            for twet in tcn_warp_edge_targets:
-                                # if warp edge target is in current chain,
-                                # it is the end of the window
-                                if (twet in [cn[0] for cn
-                                             in current_chain_nodes]):
-                                    end_of_window = n
-                                    break
-                        if end_of_window and end_of_window > start_of_window:
-                            break
-
-                    # re-check end of window for /====.> case
-                    if end_of_window:
-                        tcn_we = target_chain_nodes[end_of_window]
-                        ccn_end = current_chain_nodes[-1]
-                        ccn_len = len(current_chain_nodes)
-                        if tcn_we == ccn_end and k == ccn_len-2:
-                            end_of_window -= 1
-                    if end_of_window < start_of_window:
-                        start_of_window = -1
-                        end_of_window = None
-
-                    # if there is a valid window, set the target chain nodes
-                    if start_of_window != -1 and end_of_window != None:
-                        if end_of_window == len(target_chain_nodes)-1:
-                            window = target_chain_nodes[start_of_window:]
-                        else:
-                            window = target_chain_nodes[start_of_window:
-                                                        end_of_window+1]
-
-                        # print info on verbose output
-                        v_print("End of window: {}".format(end_of_window))
-
-                        # execute connection
-                        if cckey < tckey:
-                            rev = False
-                        else:
-                            rev = True
-
-                        v_print("Connecting chain {} to chain {}.".format(
-                                                                        cckey,
-                                                                        tckey))
+            # set the direction of the new 'warp' edges
+            if cckey < tckey:
+                rev = False
+            else:
+                rev = True
 
-                        self._create_second_pass_warp_connection(
-                                                        current_chain_nodes,
-                                                        k,
-                                                        window,
-                                                        precise=precise,
-                                                        verbose=verbose,
-                                                        reverse=rev)
-                    else:
-                        v_print("No valid window for current chain!")
+            # create second pass 'warp' connections between the chains
+            self._create_second_pass_warp_connections(current_chain_nodes,
+                                                      target_chain_nodes,
+                                                      cckey,
+                                                      tckey,
+                                                      precise=precise,
+                                                      verbose=verbose,
+                                                      reverse=rev)
 
     # FIND FACES OF NETWORK ---------------------------------------------------
 
@@ -2829,10 +2787,11 @@ class KnitNetwork(KnitNetworkBase):
         dirnet.graph = self.graph
         dirnet.node = self.node
         dirnet.mapping_network = self.mapping_network
+        dirnet._projection_cache = self._get_projection_cache()
 
         return dirnet
 
-    def find_cycles(self, mode=-1):
+    def find_cycles(self, mode=-1, parallel=False):
         """
         Finds the cycles (faces) of this network by utilizing a wall-follower
         mechanism.
@@ -2856,6 +2815,14 @@ class KnitNetwork(KnitNetworkBase):
 
             Defaults to ``-1``.
 
+        parallel : bool, optional
+            If ``True`` and ``mode`` is ``0``, ``1`` or ``2``, the nodes are
+            projected onto the reference geometry in parallel using a pool of
+            threads. Only use this if the reference geometry can safely be
+            queried from several threads at once.
+
+            Defaults to ``False``.
+
         Warning
         -------
         Modes other than ``-1`` are only possible if this network has an
@@ -2870,9 +2837,10 @@ class KnitNetwork(KnitNetworkBase):
         For more info see [16]_.
         """
 
-        return self.to_KnitDiNetwork().find_cycles(mode=mode)
+        return self.to_KnitDiNetwork().find_cycles(mode=mode,
+                                                   parallel=parallel)
 
-    def create_mesh(self, mode=-1, max_valence=4):
+    def create_mesh(self, mode=-1, max_valence=4, parallel=False):
         """
         Constructs a mesh from this network by finding cycles and using them as
         mesh faces.
@@ -2904,6 +2872,14 @@ class KnitNetwork(KnitNetworkBase):
 
             Defaults to ``4``.
 
+        parallel : bool, optional
+            If ``True`` and ``mode`` is ``0``, ``1`` or ``2``, the nodes are
+            projected onto the reference geometry in parallel using a pool of
+            threads. Only use this if the reference geometry can safely be
+            queried from several threads at once.
+
+            Defaults to ``False``.
+
         Warning
         -------
         Modes other than ``-1`` are only possible if this network has an
@@ -2914,12 +2890,13 @@ class KnitNetwork(KnitNetworkBase):
         """
 
         return self.to_KnitDiNetwork().create_mesh(mode=mode,
-                                                   max_valence=max_valence)
+                                                   max_valence=max_valence,
+                                                   parallel=parallel)
 
     # DUALITY -----------------------------------------------------------------
 
     def create_dual(self, mode=-1, merge_adj_creases=False,
-                    mend_trailing_rows=False):
+                    mend_trailing_rows=False, parallel=False):
         """
         Creates the dual of this KnitNetwork while translating current edge
         attributes to the edges of the dual network.
@@ -2959,6 +2936,14 @@ class KnitNetwork(KnitNetworkBase):
 
             Defaults to ``False``.
 
+        parallel : bool, optional
+            If ``True`` and ``mode`` is ``0``, ``1`` or ``2``, the nodes are
+            projected onto the reference geometry in parallel using a pool of
+            threads. Only use this if the reference geometry can safely be
+            queried from several threads at once.
+
+            Defaults to ``False``.
+
         Returns
         -------
         dual_network : :class:`KnitDiNetwork`
@@ -2981,7 +2966,7 @@ class KnitNetwork(KnitNetworkBase):
         """
 
         # first find the cycles of this network
-        cycles = self.find_cycles(mode=mode)
+        cycles = self.find_cycles(mode=mode, parallel=parallel)
 
         # get node data for all nodes once
         node_data = {k: self.node[k] for k in self.nodes_iter()}
@@ -2989,6 +2974,8 @@ class KnitNetwork(KnitNetworkBase):
         # create new directed KnitDiNetwork for dual network
         DualNetwork = KnitDiNetwork(
                         reference_geometry=self.graph["reference_geometry"])
+        DualNetwork.columnar = self.columnar
+        DualNetwork.lazy_edge_geometry = self.lazy_edge_geometry
 
         # create mapping dict for edges to adjacent cycles
         edge_to_cycle = {(u, v): None for u, v in self.edges_iter()}
@@ -3118,8 +3105,8 @@ class KnitNetwork(KnitNetworkBase):
         # MERGE ADJACENT INCREASES/DECREASES ----------------------------------
 
         if merge_adj_creases:
-            increase_nodes = [inc for inc in DualNetwork.nodes_iter(data=True)
-                              if inc[1]["increase"]]
+            increase_nodes = DualNetwork.nodes_with_flags(("increase",),
+                                                          data=True)
             for increase, data in increase_nodes:
                 pred = DualNetwork.predecessors(increase)
                 suc = DualNetwork.successors(increase)
@@ -3148,9 +3135,9 @@ class KnitNetwork(KnitNetworkBase):
                     data["increase"] = False
                     # edit the edges of the increase
                     for edge in DualNetwork.edges_iter(increase, data=True):
-                        edge[2]["geo"] = RhinoLine(
-                                            data["geo"],
-                                            DualNetwork.node[edge[1]]["geo"])
+                        edge[2]["geo"] = DualNetwork._edge_line(
+                                            data,
+                                            DualNetwork.node[edge[1]])
                     # edit edges of decrease
                     for edge in DualNetwork.in_edges_iter(pred, data=True):
                         if edge[2]["warp"]:
@@ -3186,13 +3173,13 @@ class KnitNetwork(KnitNetworkBase):
                     data["increase"] = False
                     # edit the edges of the increase
                     for edge in DualNetwork.edges_iter(increase, data=True):
-                        edge[2]["geo"] = RhinoLine(
-                                            data["geo"],
-                                            DualNetwork.node[edge[1]]["geo"])
+                        edge[2]["geo"] = DualNetwork._edge_line(
+                                            data,
+                                            DualNetwork.node[edge[1]])
                     for edge in DualNetwork.in_edges_iter(increase, data=True):
-                        edge[2]["geo"] = RhinoLine(
-                                            DualNetwork.node[edge[0]]["geo"],
-                                            data["geo"])
+                        edge[2]["geo"] = DualNetwork._edge_line(
+                                            DualNetwork.node[edge[0]],
+                                            data)
                     # edit incoming edges of decrease
                     for edge in DualNetwork.in_edges_iter(suc, data=True):
                         if edge[2]["warp"]:
@@ -2,7 +2,8 @@
 from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
-from collections import OrderedDict
+from array import array
+from copy import deepcopy
 
 # DUNDER ----------------------------------------------------------------------
 __all__ = [
@@ -13,7 +14,19 @@ __all__ = [
 import networkx as nx
 
 # LOCAL MODULE IMPORTS --------------------------------------------------------
+from cockatoo._knitstorage import KnitAdjacencyMap
+from cockatoo._knitstorage import KnitColumnarNodeMap
+from cockatoo._knitstorage import KnitEdgeData
+from cockatoo._knitstorage import KnitEdgeStore
+from cockatoo._knitstorage import KnitNodeMap
+from cockatoo._knitstorage import LazyEdgeGeometry
+from cockatoo._knitstorage import NODE_FLAGS
+from cockatoo._knitstorage import STITCH_CLASSES
+from cockatoo._knitstorage import attribute_id
+from cockatoo._knitstorage import flags_mask
+from cockatoo._knitstorage import unpack_node_flags
 from cockatoo.environment import RHINOINSIDE
+from cockatoo.utilities import parallel_map
 
 # RHINO IMPORTS ---------------------------------------------------------------
 if RHINOINSIDE:
@@ -22,11 +35,15 @@ if RHINOINSIDE:
     from Rhino.Geometry import Curve as RhinoCurve
     from Rhino.Geometry import Line as RhinoLine
     from Rhino.Geometry import LineCurve as RhinoLineCurve
+    from Rhino.Geometry import Mesh as RhinoMesh
+    from Rhino.Geometry import NurbsSurface as RhinoNurbsSurface
     from Rhino.Geometry import Polyline as RhinoPolyline
 else:
     from Rhino.Geometry import Curve as RhinoCurve
     from Rhino.Geometry import Line as RhinoLine
     from Rhino.Geometry import LineCurve as RhinoLineCurve
+    from Rhino.Geometry import Mesh as RhinoMesh
+    from Rhino.Geometry import NurbsSurface as RhinoNurbsSurface
     from Rhino.Geometry import Polyline as RhinoPolyline
 
 # CLASS DECLARATION -----------------------------------------------------------
@@ -87,10 +104,10 @@ class KnitNetworkBase(nx.Graph):
         else:
             name = "KnitNetworkBase"
 
-        nn = len(self.nodes())
-        ce = len(self.contour_edges)
-        wee = len(self.weft_edges)
-        wae = len(self.warp_edges)
+        nn = self.number_of_nodes()
+        ce = self.number_of_contour_edges()
+        wee = self.number_of_weft_edges()
+        wae = self.number_of_warp_edges()
         data = ("({} Nodes, {} Contours, {} Weft, {} Warp)")
         data = data.format(nn, ce, wee, wae)
 
@@ -158,73 +175,26 @@ class KnitNetworkBase(nx.Graph):
         network_nodes = self.nodes(data=True)
         network_edges = self.edges(data=True)
 
+        # fill and text colors for every stitch class
+        node_styles = {"R": (col_regular, white),
+                       "E": (col_end, white),
+                       "S": (col_start_end, black),
+                       "Ei": (col_increase_end, black),
+                       "Ed": (col_decrease_end, black),
+                       "L": (col_leaf, black),
+                       "SL": (col_start_leaf, black),
+                       "EL": (col_end_leaf, black),
+                       "SEL": (col_start_leaf_end, black),
+                       "i": (col_increase, white),
+                       "d": (col_decrease, white)}
+
         # process all nodes and add them to the dot graph
         for node in network_nodes:
             ndata = node[1]
 
-            # END BUT NOT LEAF
-            if ndata["end"] and not ndata["leaf"]:
-                if not ndata["increase"] and not ndata["decrease"]:
-                    if ndata["start"]:
-                        node_type = "S"
-                        node_color = col_start_end
-                        node_txt_color = black
-                    else:
-                        node_type = "E"
-                        node_color = col_end
-                        node_txt_color = white
-
-                elif ndata["increase"] and not ndata["decrease"]:
-                    node_type = "Ei"
-                    node_color = col_increase_end
-                    node_txt_color = black
-                elif not ndata["increase"] and ndata["decrease"]:
-                    node_type = "Ed"
-                    node_color = col_decrease_end
-                    node_txt_color = black
-
-                node_shape = circle
-
-            # LEAF BUT NOT END
-            elif ndata["leaf"] and not ndata["end"]:
-                if ndata["start"]:
-                    node_type = "SL"
-                    node_color = col_start_leaf
-                else:
-                    node_type = "L"
-                    node_color = col_leaf
-
-                node_txt_color = black
-                node_shape = circle
-
-            # END AND LEAF
-            elif ndata["leaf"] and ndata["end"]:
-                if ndata["start"]:
-                    node_type = "SEL"
-                    node_color = col_start_leaf_end
-                else:
-                    node_type = "EL"
-                    node_color = col_end_leaf
-
-                node_txt_color = black
-                node_shape = circle
-
-            # NO END NO LEAF
-            elif not ndata["leaf"] and not ndata["end"]:
-                # INCREASE
-                if ndata["increase"] and not ndata["decrease"]:
-                    node_type = "i"
-                    node_color = col_increase
-                # DECREASE
-                elif not ndata["increase"] and ndata["decrease"]:
-                    node_type = "d"
-                    node_color = col_decrease
-                else:
-                    node_type = "R"
-                    node_color = col_regular
-
-                node_txt_color = white
-                node_shape = circle
+            node_type = self.node_stitch_class(node[0])
+            node_color, node_txt_color = node_styles[node_type]
+            node_shape = circle
 
             if node[1]["segment"]:
                 node_label = str(node[0]) + "\n" + node_type + "\n" + \
@@ -312,27 +282,24 @@ class KnitNetworkBase(nx.Graph):
         network_nodes = self.nodes(data=True)
         network_edges = self.edges(data=True)
 
+        # node types and colors for every stitch class
+        node_styles = {"R": ("regular", black),
+                       "i": ("regular", black),
+                       "d": ("regular", black),
+                       "E": ("end", red),
+                       "S": ("end", red),
+                       "Ei": ("end", red),
+                       "Ed": ("end", red),
+                       "L": ("leaf", green),
+                       "SL": ("leaf", green),
+                       "EL": ("end leaf", orange),
+                       "SEL": ("end leaf", orange)}
+
         # add all nodes to the render graph
         for node in network_nodes:
-            if node[1]["end"] and not node[1]["leaf"]:
-                node_type = "end"
-                node_color = red
-                node_shape = circle
-
-            elif node[1]["leaf"] and not node[1]["end"]:
-                node_type = "leaf"
-                node_color = green
-                node_shape = circle
-
-            elif node[1]["leaf"] and node[1]["end"]:
-                node_type = "end leaf"
-                node_color = orange
-                node_shape = circle
-
-            else:
-                node_type = "regular"
-                node_color = black
-                node_shape = circle
+            node_class = self.node_stitch_class(node[0])
+            node_type, node_color = node_styles[node_class]
+            node_shape = circle
 
             nodeAttrs = {"color": node_color,
                          "shape": node_shape,
@@ -358,6 +325,316 @@ class KnitNetworkBase(nx.Graph):
 
         return GephiGraph
 
+    # NODE STORAGE ------------------------------------------------------------
+
+    def _get_node(self):
+        """
+        Gets the node dictionary of the network.
+        """
+
+        return self._node
+
+    def _set_node(self, node_dict):
+        """
+        Sets the node dictionary of the network. Any mapping gets converted
+        to a KnitNodeMap, so that the node indexes are always valid - also
+        when a node dictionary gets assigned directly, i.e. by the NetworkX
+        copy constructor or by KnitNetwork.to_KnitDiNetwork().
+        """
+
+        if node_dict is self.__dict__.get("_node"):
+            return
+        if self._columnar:
+            self._node = KnitColumnarNodeMap(node_dict)
+        else:
+            self._node = KnitNodeMap(node_dict)
+
+    node = property(_get_node, _set_node, None,
+                    "The node dictionary of the network, mapping every " +
+                    "node to its attribute dictionary.")
+
+    _columnar = False
+
+    def _get_columnar(self):
+        """
+        Gets whether the node attributes of the network are stored in
+        columns.
+        """
+
+        return self._columnar
+
+    def _set_columnar(self, columnar):
+        """
+        Switches the node storage of the network between attribute
+        dictionaries and columns.
+
+        Notes
+        -----
+        With columnar storage, coordinates, 'position', 'num' and the boolean
+        flags of all nodes are stored in typed arrays instead of one
+        dictionary per node, which reduces the memory needed for the node
+        attributes several times. The node dictionary then creates a
+        lightweight proxy whenever the attributes of a node are accessed, so
+        attribute access stays the same.
+
+        Existing nodes are carried over. Attribute dictionaries which are
+        shared with another network (i.e. the mapping network) get copied
+        in the process.
+        """
+
+        columnar = bool(columnar)
+        if columnar == self._columnar:
+            return
+        self._columnar = columnar
+        current = self.__dict__.get("_node")
+        if current is None:
+            return
+        items = list(current.items())
+        if columnar:
+            self._node = KnitColumnarNodeMap()
+        else:
+            self._node = KnitNodeMap()
+        current.clear()
+        self._node._bulk_load(items)
+
+    columnar = property(_get_columnar, _set_columnar, None,
+                        "If ``True``, the node attributes of the network " +
+                        "are stored in columns.")
+
+    def _get_edge_store(self):
+        """
+        Gets the edge store of the network, creating it if necessary.
+        """
+
+        store = self.__dict__.get("_edgestore")
+        if store is None:
+            store = KnitEdgeStore(multigraph=self.is_multigraph(),
+                                  directed=self.is_directed())
+            self._edgestore = store
+        return store
+
+    def _get_adj(self):
+        """
+        Gets the adjacency dictionary of the network.
+        """
+
+        return self._adj
+
+    def _set_adj(self, adj_dict):
+        """
+        Sets the adjacency dictionary of the network. Any mapping gets
+        converted to a KnitAdjacencyMap which keeps the edge store and its
+        indexes in sync with all edge insertions, removals and attribute
+        writes.
+        """
+
+        current = self.__dict__.get("_adj")
+        if adj_dict is current:
+            return
+        if current is not None:
+            current._release()
+        store = self._get_edge_store()
+        store.clear()
+        self._adj = KnitAdjacencyMap(store, True, adj_dict)
+
+    adj = property(_get_adj, _set_adj, None,
+                   "The adjacency dictionary of the network.")
+
+    def _get_pred(self):
+        """
+        Gets the predecessor dictionary of a directed network.
+        """
+
+        return self._pred
+
+    def _set_pred(self, pred_dict):
+        """
+        Sets the predecessor dictionary of a directed network. Edges are
+        registered through the successors, so the predecessor dictionary only
+        shares the converted attribute data.
+        """
+
+        if pred_dict is self.__dict__.get("_pred"):
+            return
+        self._pred = KnitAdjacencyMap(self._get_edge_store(), False, pred_dict)
+
+    pred = property(_get_pred, _set_pred, None,
+                    "The predecessor dictionary of a directed network.")
+
+    # COPYING -----------------------------------------------------------------
+
+    _STORAGE_ATTRIBUTES = frozenset(("_node", "_adj", "_pred", "_edgestore",
+                                     "edge", "succ", "_columnar",
+                                     "_projection_cache",
+                                     "_aggregate_cache"))
+
+    def __deepcopy__(self, memo):
+        """
+        Returns a deep copy of the network. Used by :func:`copy.deepcopy` and
+        :meth:`networkx.Graph.copy`.
+
+        Notes
+        -----
+        The node map, the adjacency and the edge store of a KnitNetworkBase
+        are linked to each other and can not be copied one by one. Instead,
+        the copy gets new storage of the same kind, which is filled with
+        deep copies of the node and edge attributes. Attribute dictionaries
+        shared with another network which is copied along (i.e. the mapping
+        network) are shared by the copies as well. Cached results are not
+        copied.
+        """
+
+        H = self.__class__()
+        memo[id(self)] = H
+        H.columnar = self.columnar
+        for key, value in self.__dict__.items():
+            if key not in self._STORAGE_ATTRIBUTES:
+                setattr(H, key, deepcopy(value, memo))
+
+        # copy the nodes, keeping dictionaries shared between networks
+        items = []
+        for n, d in self.node.items():
+            if not isinstance(d, dict):
+                d = d.copy()
+            items.append((n, deepcopy(d, memo)))
+        H.node._bulk_load(items)
+        H_adj = H.adj
+        for n, d in items:
+            H_adj[n] = {}
+            if H.is_directed():
+                H.pred[n] = {}
+
+        # copy the edges, attribute dictionaries are copied as plain dicts
+        if self.is_multigraph():
+            for u, v, key, d in self.edges_iter(keys=True, data=True):
+                H.add_edge(u, v, key, deepcopy(d, memo))
+        else:
+            for u, v, d in self.edges_iter(data=True):
+                H.add_edge(u, v, deepcopy(d, memo))
+        return H
+
+    # SUBGRAPHS ---------------------------------------------------------------
+
+    def subgraph(self, nbunch):
+        """
+        Returns the subgraph induced on the given nodes, sharing the node and
+        edge attribute data with this network. Works like
+        :meth:`networkx.Graph.subgraph` for undirected networks.
+
+        Parameters
+        ----------
+        nbunch : iterable
+            A container of nodes which will be iterated through once.
+
+        Returns
+        -------
+        subgraph : :class:`KnitNetworkBase`
+            A network of the same class as this one.
+
+        Notes
+        -----
+        The adjacency of a KnitNetworkBase converts neighbor dictionaries on
+        assignment. Other than NetworkX, this method therefore fills every
+        neighbor dictionary after it has been added to the new network.
+        Edges of a MultiGraph get new key dictionaries, as in NetworkX.
+        """
+
+        bunch = self.nbunch_iter(nbunch)
+        multigraph = self.is_multigraph()
+        H = self.__class__()
+        H_adj = H.adj
+        self_adj = self.adj
+        for n in bunch:
+            H_adj[n] = {}
+            Hnbrs = H_adj[n]
+            for nbr, d in self_adj[n].items():
+                if nbr in H_adj:
+                    if multigraph:
+                        d = d.copy()
+                    Hnbrs[nbr] = d
+                    H_adj[nbr][n] = d
+        for n in H:
+            H.node[n] = self.node[n]
+        H.graph = self.graph
+        return H
+
+    # NODE ATTRIBUTES ---------------------------------------------------------
+
+    def update_node(self, n, attr_dict=None, **attr):
+        """
+        Updates the attributes of an existing node of the network, keeping
+        the node indexes up to date.
+
+        Parameters
+        ----------
+        n : hashable
+            The node to update.
+
+        attr_dict : :obj:`dict`, optional
+            Dictionary of node attributes.
+
+            Defaults to ``None``.
+
+        attr : keyword arguments, optional
+            Set or change attributes using key=value.
+
+        Raises
+        ------
+        NetworkXError
+            If the node is not in the network.
+
+        Notes
+        -----
+        Updates the node indexes just like writing the attributes directly
+        (i.e. ``network.node[n].update(attr)``) does, but raises an error for
+        nodes which are not part of the network.
+        """
+
+        if attr_dict is None:
+            attr_dict = attr
+        else:
+            try:
+                attr_dict.update(attr)
+            except AttributeError:
+                errMsg = "The attr_dict argument must be a dictionary."
+                raise nx.NetworkXError(errMsg)
+        if n not in self.node:
+            errMsg = "The node %s is not in the graph." % (n,)
+            raise nx.NetworkXError(errMsg)
+        self.node.update_node(n, attr_dict)
+
+    def add_node(self, n, attr_dict=None, **attr):
+        """
+        Adds a single node n and updates its attributes. Works like
+        :meth:`networkx.Graph.add_node` but updates the attributes of an
+        existing node through :meth:`update_node`.
+        """
+
+        if n in self.node:
+            self.update_node(n, attr_dict, **attr)
+        elif self.is_directed():
+            nx.DiGraph.add_node(self, n, attr_dict, **attr)
+        else:
+            nx.Graph.add_node(self, n, attr_dict, **attr)
+
+    def add_nodes_from(self, nodes, **attr):
+        """
+        Adds multiple nodes. Works like :meth:`networkx.Graph.add_nodes_from`
+        but updates the attributes of existing nodes through
+        :meth:`update_node`.
+        """
+
+        for n in nodes:
+            try:
+                n in self.node
+            except TypeError:
+                n, ndict = n
+                attr_dict = attr.copy()
+                attr_dict.update(ndict)
+                self.add_node(n, attr_dict)
+                continue
+            self.add_node(n, attr.copy())
+
     # NODE CREATION -----------------------------------------------------------
 
     def node_from_point3d(self, node_index, pt, position=None, num=None,
@@ -452,6 +729,89 @@ class KnitNetworkBase(nx.Graph):
         # add the node to the network instance
         self.add_node(node_index, attr_dict=node_attributes)
 
+    def nodes_from_point3d(self, node_indices, points, sequences=None,
+                           **attr):
+        """
+        Creates many network nodes at once from Rhino Point3d objects and
+        attributes.
+
+        Parameters
+        ----------
+        node_indices : iterable of hashable
+            The indices of the nodes in the network, one for every point.
+
+        points : iterable of :class:`Rhino.Geometry.Point3d`
+            The RhinoCommon Point3d objects of the nodes.
+
+        sequences : :obj:`dict`, optional
+            Mapping of attribute names to sequences holding one value per
+            node, i.e. ``{"num": range(len(points))}``.
+
+            Defaults to ``None``.
+
+        **attr
+            Attribute values which are shared by all nodes. Attributes which
+            are neither given here nor in ``sequences`` get the default
+            values of node_from_point3d().
+
+        Notes
+        -----
+        The result is the same as calling node_from_point3d() for every point
+        in turn, but the node dictionary and its indexes are updated only
+        once for all new nodes.
+        """
+
+        # compile shared node attributes
+        shared = {"x": 0.0,
+                  "y": 0.0,
+                  "z": 0.0,
+                  "position": None,
+                  "num": None,
+                  "leaf": False,
+                  "start": False,
+                  "end": False,
+                  "segment": None,
+                  "increase": False,
+                  "decrease": False,
+                  "geo": None,
+                  "color": None}
+        shared.update(attr)
+
+        # get per node attribute sequences
+        if sequences:
+            seqKeys = list(sequences.keys())
+            seqValues = list(zip(*[sequences[k] for k in seqKeys]))
+        else:
+            seqKeys = []
+            seqValues = []
+
+        adj = self.adj
+        added = {}
+        addedItems = []
+        for i, (node, pt) in enumerate(zip(node_indices, points)):
+            # compile node attributes
+            node_attributes = dict(shared, x=pt.X, y=pt.Y, z=pt.Z, geo=pt)
+            if seqKeys:
+                node_attributes.update(zip(seqKeys, seqValues[i]))
+
+            # existing nodes get updated, just like by add_node
+            if node in added:
+                added[node].update(node_attributes)
+                continue
+            elif node in adj:
+                self.node.update_node(node, node_attributes)
+                continue
+
+            added[node] = node_attributes
+            addedItems.append((node, node_attributes))
+
+        # add the new nodes to the network instance
+        newNodes = [item[0] for item in addedItems]
+        adj._insert_nodes(newNodes)
+        if self.is_directed():
+            self.pred._insert_nodes(newNodes)
+        self.node._insert_many(addedItems)
+
     # NODE GEOMETRY -----------------------------------------------------------
 
     def node_geometry(self, node_index):
@@ -498,6 +858,389 @@ class KnitNetworkBase(nx.Graph):
         except KeyError:
             return None
 
+    # REFERENCE GEOMETRY PROJECTION -------------------------------------------
+
+    def _get_projection_cache(self):
+        """
+        Gets the cache of the projections of the nodes onto the reference
+        geometry, creating it if it does not exist yet.
+        """
+
+        try:
+            return self._projection_cache
+        except AttributeError:
+            self._projection_cache = {"geometry": None, "nodes": {}}
+            return self._projection_cache
+
+    def reference_projection(self, nodes=None, parallel=False):
+        """
+        Gets the closest points of the nodes on the reference geometry of the
+        network and the normals of the reference geometry at these points.
+
+        Parameters
+        ----------
+        nodes : :obj:`list`, optional
+            The identifiers of the nodes to project.
+
+            Defaults to ``None``, which projects all nodes of the network.
+
+        parallel : bool, optional
+            If ``True``, nodes which are not cached yet are projected
+            concurrently using :func:`cockatoo.utilities.parallel_map`.
+
+            Defaults to ``False``.
+
+        Returns
+        -------
+        projection : :obj:`tuple`
+            2-tuple of the closest points and the normals as dicts by node
+            identifier. Closest points are ``Rhino.Geometry.MeshPoint``
+            instances for a mesh and (u, v) 2-tuples for a NURBS surface.
+            Both are ``None`` if the network has no reference geometry or if
+            it is neither a mesh nor a NURBS surface.
+
+        Notes
+        -----
+        Projections are cached on the network by node identifier together
+        with the coordinates of the node. An entry is recomputed if the node
+        has moved since and the whole cache is dropped if another reference
+        geometry is set. Modifying the reference geometry in place is not
+        detected.
+        """
+
+        try:
+            reference_geometry = self.graph["reference_geometry"]
+        except KeyError:
+            reference_geometry = None
+
+        if not reference_geometry:
+            return None, None
+        elif isinstance(reference_geometry, RhinoMesh):
+            def project(point):
+                cp = reference_geometry.ClosestMeshPoint(point, 0)
+                return cp, reference_geometry.NormalAt(cp)
+        elif isinstance(reference_geometry, RhinoNurbsSurface):
+            def project(point):
+                cp = reference_geometry.ClosestPoint(point)[1:]
+                return cp, reference_geometry.NormalAt(cp[0], cp[1])
+        else:
+            return None, None
+
+        cache = self._get_projection_cache()
+        if cache["geometry"] is not reference_geometry:
+            cache["geometry"] = reference_geometry
+            cache["nodes"] = {}
+        entries = cache["nodes"]
+
+        if nodes is None:
+            nodes = self.nodes_iter()
+
+        # collect the nodes without valid cache entries
+        keys = []
+        missing = []
+        for k in nodes:
+            keys.append(k)
+            d = self.node[k]
+            xyz = (d["x"], d["y"], d["z"])
+            entry = entries.get(k)
+            if entry is None or entry[0] != xyz:
+                missing.append((k, xyz, d["geo"]))
+
+        # project the first node on its own, so that lazily built search
+        # structures of the reference geometry exist before querying it
+        # concurrently
+        if missing:
+            k, xyz, pt = missing[0]
+            entries[k] = (xyz,) + project(pt)
+            missing = missing[1:]
+        if parallel and len(missing) > 1:
+            results = parallel_map(project, [m[2] for m in missing])
+        else:
+            results = [project(m[2]) for m in missing]
+        for (k, xyz, pt), result in zip(missing, results):
+            entries[k] = (xyz,) + result
+
+        cbp = {k: entries[k][1] for k in keys}
+        nrm = {k: entries[k][2] for k in keys}
+        return cbp, nrm
+
+    # COORDINATE BUFFERS ------------------------------------------------------
+
+    def coordinate_buffer(self):
+        """
+        Gets the coordinates of all nodes of the network as one contiguous
+        buffer of floats.
+
+        Returns
+        -------
+        coordinates : :obj:`array.array`
+            Array of typecode ``'d'`` holding the interleaved 'x', 'y' and 'z'
+            attributes of all nodes, three values per node.
+
+        nodes : :obj:`list`
+            The nodes of the network by row. The coordinates of ``nodes[i]``
+            are stored at ``coordinates[3 * i:3 * i + 3]``.
+
+        Notes
+        -----
+        The array supports the buffer protocol, so it can be wrapped in a
+        :obj:`memoryview` or a NumPy array (i.e. using
+        ``numpy.frombuffer(coordinates).reshape(-1, 3)``) without copying.
+        Changes to the buffer are written back to the network using
+        set_coordinate_buffer().
+
+        The nodes are listed in the iteration order of the network, which
+        stays the same as long as no nodes are added or removed.
+        """
+
+        nodes, coordinates = self.node.coordinates()
+        return coordinates, nodes
+
+    def node_rows(self):
+        """
+        Gets the row of every node inside of the coordinate buffer.
+
+        Returns
+        -------
+        node_rows : :obj:`dict`
+            Dictionary mapping every node to its row index.
+        """
+
+        return dict((node, i) for i, node in enumerate(self.node))
+
+    def set_coordinate_buffer(self, coordinates, nodes=None):
+        """
+        Sets the 'x', 'y', 'z' and 'geo' attributes of many nodes at once from
+        a buffer of interleaved coordinates.
+
+        Parameters
+        ----------
+        coordinates : sequence of float
+            The interleaved coordinates, three values per node. Anything that
+            supports indexing works, i.e. an :obj:`array.array`, a
+            :obj:`memoryview` or a flat NumPy array.
+
+        nodes : :obj:`list`, optional
+            The nodes by row. If not given, the coordinates are expected in
+            the row order of coordinate_buffer().
+
+            Defaults to ``None``.
+
+        Raises
+        ------
+        ValueError
+            If the number of coordinates does not match the number of nodes.
+        """
+
+        if nodes is None:
+            nodes = list(self.node)
+        if len(coordinates) != 3 * len(nodes):
+            errMsg = ("Expected {} coordinates for {} nodes, ".format(
+                                                            3 * len(nodes),
+                                                            len(nodes)) +
+                      "got {}!".format(len(coordinates)))
+            raise ValueError(errMsg)
+        self.node.set_coordinates(nodes, coordinates)
+
+    def edge_index_pairs(self, kind=None, nodes=None):
+        """
+        Gets the edges of the network as pairs of rows of the coordinate
+        buffer.
+
+        Parameters
+        ----------
+        kind : str, optional
+            If given, only edges of this kind ('contour', 'weft' or 'warp')
+            are exported, in the order of the corresponding edge property.
+            Otherwise all edges are exported.
+
+            Defaults to ``None``.
+
+        nodes : :obj:`list`, optional
+            The nodes by row. If not given, the rows of coordinate_buffer()
+            are used.
+
+            Defaults to ``None``.
+
+        Returns
+        -------
+        pairs : :obj:`array.array`
+            Array of typecode ``'i'`` holding the interleaved rows of the
+            source and target node of every edge, two values per edge.
+
+        Raises
+        ------
+        ValueError
+            If an unknown kind of edge is supplied.
+        """
+
+        if kind is None:
+            edges = self.edges_iter()
+        elif kind == "contour":
+            edges = self.contour_edges
+        elif kind == "weft":
+            edges = self.weft_edges
+        elif kind == "warp":
+            edges = self.warp_edges
+        else:
+            raise ValueError("Unknown kind of edge '{}'!".format(kind))
+
+        if nodes is None:
+            rows = self.node_rows()
+        else:
+            rows = dict((node, i) for i, node in enumerate(nodes))
+
+        pairs = array("i")
+        extend = pairs.extend
+        for edge in edges:
+            extend((rows[edge[0]], rows[edge[1]]))
+        return pairs
+
+    # NODE RELABELING ---------------------------------------------------------
+
+    def _relabel_nodes(self, mapping, seen):
+        """
+        Relabels the nodes of this network in place using the given mapping
+        and translates all node references inside of the 'segment' and
+        'sorted_neighbors' attributes. Attribute dictionaries whose
+        identifier (see :func:`attribute_id`) is already contained in seen
+        are not translated again.
+        """
+
+        # replace the nodes of all dictionaries
+        self.node._relabel(mapping)
+        self.adj._relabel(mapping)
+        if self.is_directed():
+            self.pred._relabel(mapping)
+
+        def translate_segment(data):
+            segment = data.get("segment")
+            if segment:
+                data["segment"] = (mapping.get(segment[0], segment[0]),
+                                   mapping.get(segment[1], segment[1]),
+                                   segment[2])
+
+        # translate the node references of all attribute dictionaries
+        for node, data in self.nodes_iter(data=True):
+            ident = attribute_id(data)
+            if ident in seen:
+                continue
+            seen.add(ident)
+            translate_segment(data)
+            sorted_neighbors = data.get("sorted_neighbors")
+            if sorted_neighbors:
+                data["sorted_neighbors"] = [mapping.get(n, n)
+                                            for n in sorted_neighbors]
+        for edge in self.edges_iter(data=True):
+            data = edge[-1]
+            if id(data) in seen:
+                continue
+            seen.add(id(data))
+            translate_segment(data)
+
+    def relabel_nodes_dense(self):
+        """
+        Relabels the nodes of the network in place to the consecutive
+        integers from ``0`` to ``N - 1``.
+
+        Returns
+        -------
+        mapping : :obj:`dict`
+            Dictionary mapping every former node to its new identifier.
+
+        Notes
+        -----
+        The new identifiers follow the sorted order of the former ones, so
+        every ordering of nodes by their identifier stays the same. The
+        iteration order of nodes and edges is not preserved, as it depends on
+        the hashes of the new identifiers under Python 2 and IronPython.
+
+        The node references inside of the 'segment' attributes of nodes and
+        edges and inside of the 'sorted_neighbors' attributes of nodes are
+        translated, too.
+        """
+
+        mapping = dict((node, i)
+                       for i, node in enumerate(sorted(self.nodes_iter())))
+        self._relabel_nodes(mapping, set())
+        return mapping
+
+    # CACHED AGGREGATES -------------------------------------------------------
+
+    def _cached_aggregate(self, key, version, compute):
+        """
+        Gets a derived aggregate of the network from the cache if it has been
+        computed for the given version. Otherwise computes it by calling
+        ``compute`` and stores the result in the cache.
+
+        Parameters
+        ----------
+        key : hashable
+            The key of the aggregate inside the cache.
+
+        version : int
+            The version of the network state the aggregate depends on.
+
+        compute : callable
+            Function computing the aggregate.
+
+        Returns
+        -------
+        aggregate : object
+            The (cached) value of the aggregate.
+
+        Notes
+        -----
+        The versions of the node map advance whenever nodes are added or
+        removed and whenever the 'position', 'num' or 'geo' attribute of a
+        node is written, directly or through update_node(). Changing a
+        'geo' object in place goes unnoticed and requires a call to
+        ``touch()`` on the node dictionary.
+        """
+
+        try:
+            cache = self._aggregate_cache
+        except AttributeError:
+            cache = {}
+            self._aggregate_cache = cache
+
+        entry = cache.get(key)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+
+        value = compute()
+        cache[key] = (version, value)
+        return value
+
+    def _position_contour(self, position):
+        """
+        Gets the cached Polyline of the contour at the given position.
+        """
+
+        def compute():
+            points = [self.node[n]["geo"]
+                      for n in self.node.positions.nodes(position)]
+            return RhinoPolyline(points)
+
+        return self._cached_aggregate(("contour", position),
+                                      self.node.position_version(position),
+                                      compute)
+
+    def _position_contour_length(self, position):
+        """
+        Gets the cached length of the contour at the given position.
+        """
+
+        def compute():
+            contour = self._position_contour(position).ToPolylineCurve()
+            length = contour.GetLength()
+            contour.Dispose()
+            return length
+
+        return self._cached_aggregate(("contour_length", position),
+                                      self.node.position_version(position),
+                                      compute)
+
     # PROPERTIES --------------------------------------------------------------
 
     def _get_total_positions(self):
@@ -505,8 +1248,12 @@ class KnitNetworkBase(nx.Graph):
         Gets the number of total positions (i.e. contours) inside the network.
         """
 
-        total = max([n[1]["position"] for n in self.nodes_iter(data=True)])+1
-        return total
+        def compute():
+            return max(self.node.positions.values()) + 1
+
+        return self._cached_aggregate("total_positions",
+                                      self.node.version,
+                                      compute)
 
     total_positions = property(
                             _get_total_positions,
@@ -537,15 +1284,18 @@ class KnitNetworkBase(nx.Graph):
         -------
         nodes : :obj:`list`
             The nodes sharing the supplied 'position' attribute.
-        """
 
-        nodes = [(n, d) for n, d in self.nodes_iter(data=True)
-                 if d["position"] == position]
+        Notes
+        -----
+        Nodes are looked up in the position index of the node map, which is
+        kept current on node insertion, removal and attribute writes. The
+        cost is therefore proportional to the number of returned nodes.
+        """
 
-        nodes.sort(key=lambda x: x[1]["num"])
+        nodes = self.node.positions.nodes(position)
 
-        if not data:
-            nodes = [n[0] for n in nodes]
+        if data:
+            nodes = [(n, self.node[n]) for n in nodes]
 
         return nodes
 
@@ -568,25 +1318,15 @@ class KnitNetworkBase(nx.Graph):
             All nodes grouped by their 'position' attribute
         """
 
-        allPositionNodes = sorted(
-                                [(n, d) for n, d in self.nodes_iter(data=True)
-                                 if d["position"] != None],
-                                key=lambda x: x[1]["position"])
-
-        posdict = OrderedDict()
-        for n in allPositionNodes:
-            if n[1]["position"] not in posdict:
-                posdict[n[1]["position"]] = [n]
-            else:
-                posdict[n[1]["position"]].append(n)
+        positions = self.node.positions
 
         anbp = []
-        for key in posdict:
-            posnodes = sorted(posdict[key], key=lambda x: x[1]["num"])
+        for key in positions.values():
+            posnodes = positions.nodes(key)
             if data:
-                anbp.append(posnodes)
+                anbp.append([(pn, self.node[pn]) for pn in posnodes])
             else:
-                anbp.append([pn[0] for pn in posnodes])
+                anbp.append(posnodes)
 
         return anbp
 
@@ -616,15 +1356,12 @@ class KnitNetworkBase(nx.Graph):
             attribute, ordered by their 'num' attribute.
         """
 
-        nodes = [(n, d) for n, d in self.nodes_iter(data=True)
-                 if d["segment"] == segment]
-
-        nodes.sort(key=lambda x: x[1]["num"])
+        nodes = self.node.segments.nodes(segment)
 
         if data:
-            return nodes
+            return [(n, self.node[n]) for n in nodes]
         else:
-            return [n[0] for n in nodes]
+            return nodes
 
     # LEAF NODES --------------------------------------------------------------
 
@@ -638,8 +1375,7 @@ class KnitNetworkBase(nx.Graph):
             List of all nodes for which the attribute 'leaf' is ``True``
         """
 
-        leaves = [(n, d) for n, d in self.nodes_iter(data=True)
-                  if d["leaf"] == True]
+        leaves = [(n, self.node[n]) for n in self.node.where("leaf", True)]
 
         return leaves
 
@@ -669,11 +1405,9 @@ class KnitNetworkBase(nx.Graph):
             which share the supplied value as their 'position' attribute
         """
 
-        leaves = [(n, d) for n, d
-                  in self.nodes_on_position(position, data=True)
-                  if d["leaf"]]
-        if not data:
-            leaves = [n[0] for n in leaves]
+        leaves = self.node.position_leaves.nodes(position)
+        if data:
+            leaves = [(n, self.node[n]) for n in leaves]
         return leaves
 
     def all_leaves_by_position(self, data=False):
@@ -695,25 +1429,15 @@ class KnitNetworkBase(nx.Graph):
             'position' attribute
         """
 
-        allPositionLeaves = sorted(
-                            [(n, d) for n, d in self.nodes_iter(data=True)
-                             if d["position"] != None and d["leaf"]],
-                            key=lambda x: x[1]["position"])
-
-        posdict = OrderedDict()
-        for n in allPositionLeaves:
-            if n[1]["position"] not in posdict:
-                posdict[n[1]["position"]] = [n]
-            else:
-                posdict[n[1]["position"]].append(n)
+        position_leaves = self.node.position_leaves
 
         albp = []
-        for key in posdict:
-            posleaves = sorted(posdict[key], key=lambda x: x[1]["num"])
+        for key in position_leaves.values():
+            posleaves = position_leaves.nodes(key)
             if data:
-                albp.append(posleaves)
+                albp.append([(pl, self.node[pl]) for pl in posleaves])
             else:
-                albp.append([pl[0] for pl in posleaves])
+                albp.append(posleaves)
 
         return albp
 
@@ -724,8 +1448,7 @@ class KnitNetworkBase(nx.Graph):
         Gets all 'end' nodes of the network.
         """
 
-        ends = [(n, d) for n, d in self.nodes_iter(data=True)
-                if d["end"]]
+        ends = [(n, self.node[n]) for n in self.node.where("end", True)]
 
         return ends
 
@@ -755,10 +1478,9 @@ class KnitNetworkBase(nx.Graph):
             which share the supplied value as their 'position' attribute
         """
 
-        ends = [(n, d) for n, d in self.nodes_on_position(position, data=True)
-                if d["end"]]
-        if not data:
-            return [n[0] for n in ends]
+        ends = self.node.position_ends.nodes(position)
+        if data:
+            return [(n, self.node[n]) for n in ends]
         return ends
 
     def all_ends_by_position(self, data=False):
@@ -780,28 +1502,146 @@ class KnitNetworkBase(nx.Graph):
             'position' attribute
         """
 
-        allPositionEnds = sorted(
-                            [(n, d) for n, d in self.nodes_iter(data=True)
-                             if d["position"] != None and d["end"]],
-                            key=lambda x: x[1]["position"])
-
-        posdict = OrderedDict()
-        for n in allPositionEnds:
-            if n[1]["position"] not in posdict:
-                posdict[n[1]["position"]] = [n]
-            else:
-                posdict[n[1]["position"]].append(n)
+        position_ends = self.node.position_ends
 
         aebp = []
-        for key in posdict:
-            posends = sorted(posdict[key], key=lambda x: x[1]["num"])
+        for key in position_ends.values():
+            posends = position_ends.nodes(key)
             if data:
-                aebp.append(posends)
+                aebp.append([(pe, self.node[pe]) for pe in posends])
             else:
-                aebp.append([pe[0] for pe in posends])
+                aebp.append(posends)
 
         return aebp
 
+    # NODE CLASSIFICATION -----------------------------------------------------
+
+    NODE_FLAGS = NODE_FLAGS
+
+    STITCH_CLASSES = STITCH_CLASSES
+
+    unpack_node_flags = staticmethod(unpack_node_flags)
+
+    def node_flags(self, node):
+        """
+        Gets the 'leaf', 'start', 'end', 'increase' and 'decrease' attributes
+        of a node, packed into a single integer.
+
+        Parameters
+        ----------
+        node : hashable
+            The unique identifier of the node, an int in most cases.
+
+        Returns
+        -------
+        flags : int
+            The packed flags of the node. Bit ``i`` is set if the attribute
+            ``NODE_FLAGS[i]`` of the node is ``True``.
+
+        Notes
+        -----
+        The packed flags are maintained by the node dictionary, so this is a
+        simple lookup. Use :meth:`unpack_node_flags` to decode them.
+        """
+
+        return self.node.node_flags(node)
+
+    def nodes_with_flags(self, flags, data=False):
+        """
+        Gets all nodes for which any of the given boolean attributes is
+        ``True``.
+
+        Parameters
+        ----------
+        flags : :obj:`list` of str
+            Names of node attributes out of ``NODE_FLAGS``.
+
+        data : bool, optional
+            If ``True``, will return 2-tuples of (node, data).
+
+            Defaults to ``False``.
+
+        Returns
+        -------
+        nodes : :obj:`list`
+            List of all nodes with at least one of the flags set, in the
+            order of the node dictionary.
+        """
+
+        nodes = self.node.flagged(flags_mask(flags))
+
+        if data:
+            return [(n, self.node[n]) for n in nodes]
+        else:
+            return nodes
+
+    def node_stitch_class(self, node):
+        """
+        Gets the stitch class of a node, derived from its 'leaf', 'start',
+        'end', 'increase' and 'decrease' attributes.
+
+        Parameters
+        ----------
+        node : hashable
+            The unique identifier of the node, an int in most cases.
+
+        Returns
+        -------
+        stitch_class : str
+            One of the names in ``STITCH_CLASSES``, i.e. ``"R"`` for a regular
+            node, ``"E"`` for an 'end' node or ``"SEL"`` for a node which is
+            'start', 'end' and 'leaf'.
+        """
+
+        return STITCH_CLASSES[self.node.stitch_class(node)]
+
+    def nodes_by_stitch_class(self, stitch_class, data=False):
+        """
+        Gets all nodes of the given stitch class.
+
+        Parameters
+        ----------
+        stitch_class : str
+            One of the names in ``STITCH_CLASSES``.
+
+        data : bool, optional
+            If ``True``, will return 2-tuples of (node, data).
+
+            Defaults to ``False``.
+
+        Returns
+        -------
+        nodes : :obj:`list`
+            List of all nodes of the stitch class.
+
+        Raises
+        ------
+        ValueError
+            If ``stitch_class`` is not a valid stitch class.
+        """
+
+        nodes = self.node.nodes_of_class(STITCH_CLASSES.index(stitch_class))
+
+        if data:
+            return [(n, self.node[n]) for n in nodes]
+        else:
+            return nodes
+
+    def stitch_class_histogram(self):
+        """
+        Counts the nodes of every stitch class.
+
+        Returns
+        -------
+        histogram : :obj:`dict`
+            Dictionary mapping every name in ``STITCH_CLASSES`` to the number
+            of nodes of that class.
+        """
+
+        histogram = self.node.class_histogram()
+
+        return dict(zip(STITCH_CLASSES, histogram))
+
     # POSITION CONTOUR METHODS ------------------------------------------------
 
     def geometry_at_position_contour(self, position, as_crv=False):
@@ -827,10 +1667,11 @@ class KnitNetworkBase(nx.Graph):
             The contour as a PolylineCurve if ``as_crv`` is ``True``.
         """
 
-        points = [n[1]["geo"] for n in self.nodes_on_position(position, True)]
-        Contour = RhinoPolyline(points)
+        Contour = self._position_contour(position)
         if as_crv:
             Contour = Contour.ToPolylineCurve()
+        else:
+            Contour = Contour.Duplicate()
         return Contour
 
     def longest_position_contour(self):
@@ -842,19 +1683,34 @@ class KnitNetworkBase(nx.Graph):
         contour_data : :obj:`tuple`
             3-tuple of the 'position' identifier, the contour geometry and its
             length.
-        """
 
-        longestLength = 0
+        Notes
+        -----
+        Contour polylines, their lengths and the result of the search are
+        cached and only recomputed for positions whose nodes have been
+        added, removed or had their 'position', 'num' or 'geo' attribute
+        written since the last call.
+        """
+
+        def compute():
+            longestLength = 0
+            longestPosition = None
+            for i in range(self.total_positions):
+                cl = self._position_contour_length(i)
+                if cl > longestLength:
+                    longestLength = cl
+                    longestPosition = i
+            return (longestPosition, longestLength)
+
+        longestPosition, longestLength = self._cached_aggregate(
+                                                    "longest_contour",
+                                                    self.node.version,
+                                                    compute)
+
         longestContour = None
-        longestPosition = None
-        for i in range(self.total_positions):
-            contour = self.geometry_at_position_contour(i, True)
-            cl = contour.GetLength()
-            if cl > longestLength:
-                longestLength = cl
-                longestContour = contour.Duplicate()
-                longestPosition = i
-            contour.Dispose()
+        if longestPosition is not None:
+            longestContour = self.geometry_at_position_contour(
+                                                    longestPosition, True)
         return (longestPosition, longestContour, longestLength)
 
     # EDGE CREATION METHODS ---------------------------------------------------
@@ -884,12 +1740,8 @@ class KnitNetworkBase(nx.Graph):
         fromNode = from_node[0]
         toNode = to_node[0]
 
-        # get geometry from nodes
-        fromGeo = from_node[1]["geo"]
-        toGeo = to_node[1]["geo"]
-
         # create edge geometry
-        edgeGeo = RhinoLine(fromGeo, toGeo)
+        edgeGeo = self._edge_line(from_node[1], to_node[1])
 
         # create edge attribute
         edgeAttrs = {"warp": False,
@@ -931,12 +1783,8 @@ class KnitNetworkBase(nx.Graph):
         fromNode = from_node[0]
         toNode = to_node[0]
 
-        # get geometry from nodes
-        fromGeo = from_node[1]["geo"]
-        toGeo = to_node[1]["geo"]
-
         # create edge geometry
-        edgeGeo = RhinoLine(fromGeo, toGeo)
+        edgeGeo = self._edge_line(from_node[1], to_node[1])
 
         # create edge attribute
         edgeAttrs = {"warp": False,
@@ -975,12 +1823,8 @@ class KnitNetworkBase(nx.Graph):
         fromNode = from_node[0]
         toNode = to_node[0]
 
-        # get geometry from nodes
-        fromGeo = from_node[1]["geo"]
-        toGeo = to_node[1]["geo"]
-
         # create edge geometry
-        edgeGeo = RhinoLine(fromGeo, toGeo)
+        edgeGeo = self._edge_line(from_node[1], to_node[1])
 
         # create edge attribute
         edgeAttrs = {"warp": True,
@@ -995,13 +1839,111 @@ class KnitNetworkBase(nx.Graph):
 
         return True
 
+    def _create_edges(self, edges, warp, weft, segment=None):
+        """
+        Creates many edges with the given 'warp' and 'weft' attributes from
+        an iterable of (u, v) or (u, v, segment) tuples. Returns the number
+        of edges that have been created.
+        """
+
+        node = self.node
+        adj = self.adj
+        pred = self.pred if self.is_directed() else None
+        multigraph = self.is_multigraph()
+        edgeLine = self._edge_line
+        count = 0
+        for edge in edges:
+            fromNode = edge[0]
+            toNode = edge[1]
+            if len(edge) > 2:
+                edgeSegment = edge[2]
+            else:
+                edgeSegment = segment
+
+            # create edge attribute
+            edgeAttrs = KnitEdgeData(warp=warp,
+                                     weft=weft,
+                                     segment=edgeSegment,
+                                     geo=edgeLine(node[fromNode],
+                                                  node[toNode]))
+
+            # edges that already exist get updated, just like by add_edge
+            if multigraph or toNode in adj[fromNode]:
+                self.add_edge(fromNode, toNode, attr_dict=edgeAttrs)
+            else:
+                adj._insert_edge(fromNode, toNode, edgeAttrs, pred)
+            count += 1
+
+        return count
+
+    def create_contour_edges(self, edges):
+        """
+        Creates many edges neither 'warp' nor 'weft' at once.
+
+        Parameters
+        ----------
+        edges : iterable of :obj:`tuple`
+            2-tuples of (source_node, target_node) identifiers of the edges.
+            Both nodes have to be part of the network already.
+
+        Returns
+        -------
+        count : int
+            The number of edges that have been created.
+        """
+
+        return self._create_edges(edges, False, False)
+
+    def create_weft_edges(self, edges, segment=None):
+        """
+        Creates many 'weft' edges at once.
+
+        Parameters
+        ----------
+        edges : iterable of :obj:`tuple`
+            2-tuples of (source_node, target_node) or 3-tuples of
+            (source_node, target_node, segment) identifiers of the edges.
+            Both nodes have to be part of the network already.
+
+        segment : :obj:`tuple`, optional
+            3-tuple that will be used to set the 'segment' attribute of all
+            edges given as 2-tuples.
+
+            Defaults to ``None``.
+
+        Returns
+        -------
+        count : int
+            The number of edges that have been created.
+        """
+
+        return self._create_edges(edges, False, True, segment)
+
+    def create_warp_edges(self, edges):
+        """
+        Creates many 'warp' edges at once.
+
+        Parameters
+        ----------
+        edges : iterable of :obj:`tuple`
+            2-tuples of (source_node, target_node) identifiers of the edges.
+            Both nodes have to be part of the network already.
+
+        Returns
+        -------
+        count : int
+            The number of edges that have been created.
+        """
+
+        return self._create_edges(edges, True, False)
+
     def create_segment_contour_edge(self, from_node, to_node,
                                     segment_value, segment_geo):
         """
         Creates a mapping edge between two 'end' nodes in the network. The
         geometry of this edge will be a polyline built from all the given
-        former 'weft' edges. returns True if the edge has been successfully
-        created.
+        former 'weft' edges or the given polyline. returns True if the edge
+        has been successfully created.
 
         Parameters
         ----------
@@ -1019,7 +1961,8 @@ class KnitNetworkBase(nx.Graph):
 
         segment_geo : :obj:`list` of :class:`Rhino.Geometry.Line`
             the geometry of all 'weft' edges that make this segment contour
-            edge
+            edge. Can also be a :class:`Rhino.Geometry.Polyline` running from
+            the source node to the target node, which is used as is.
 
         Returns
         -------
@@ -1032,18 +1975,23 @@ class KnitNetworkBase(nx.Graph):
         fromNode = from_node[0]
         toNode = to_node[0]
 
-        # join geo together
-        segment_geo = [RhinoLineCurve(ln) for ln in segment_geo]
-        edgeGeo = RhinoCurve.JoinCurves(segment_geo)
-        if len(edgeGeo) > 1:
-            errMsg = ("Segment geometry could not be joined into " +
-                      "one single curve for segment {}!".format(segment_value))
-            print(errMsg)
-            return False
-
-        edgeGeo = edgeGeo[0].ToPolyline()
-        if not edgeGeo[0] == from_node[1]["geo"]:
-            edgeGeo.Reverse()
+        if isinstance(segment_geo, RhinoPolyline):
+            # polylines are already assembled in the right direction
+            edgeGeo = segment_geo
+        else:
+            # join geo together
+            segment_geo = [RhinoLineCurve(ln) for ln in segment_geo]
+            edgeGeo = RhinoCurve.JoinCurves(segment_geo)
+            if len(edgeGeo) > 1:
+                errMsg = ("Segment geometry could not be joined into " +
+                          "one single curve for segment {}!".format(
+                                                            segment_value))
+                print(errMsg)
+                return False
+
+            edgeGeo = edgeGeo[0].ToPolyline()
+            if not edgeGeo[0] == from_node[1]["geo"]:
+                edgeGeo.Reverse()
 
         # create edge attribute
         edgeAttrs = {"warp": False,
@@ -1063,6 +2011,48 @@ class KnitNetworkBase(nx.Graph):
 
     # EDGE METHODS ------------------------------------------------------------
 
+    _lazy_edge_geometry = False
+
+    def _get_lazy_edge_geometry(self):
+        """
+        Gets whether the 'geo' attribute of new edges is created lazily.
+        """
+
+        return self._lazy_edge_geometry
+
+    def _set_lazy_edge_geometry(self, lazy):
+        """
+        Sets whether the 'geo' attribute of new edges is created lazily.
+
+        Notes
+        -----
+        If enabled, the edge creation methods store a placeholder instead of
+        a :class:`Rhino.Geometry.Line`. The line between the 'geo' attributes
+        of the two nodes is created on first access of the 'geo' attribute
+        of the edge and points from the source to the target node, just like
+        it would when created right away. Edges which get removed before
+        their geometry is read never create it at all.
+
+        Existing edges are not affected.
+        """
+
+        self._lazy_edge_geometry = bool(lazy)
+
+    lazy_edge_geometry = property(_get_lazy_edge_geometry,
+                                  _set_lazy_edge_geometry, None,
+                                  "If ``True``, the 'geo' attribute of new " +
+                                  "edges is created on first access.")
+
+    def _edge_line(self, from_data, to_data):
+        """
+        Creates the 'geo' attribute for an edge between two nodes, given the
+        attribute dictionaries of its source and target node.
+        """
+
+        if self._lazy_edge_geometry:
+            return LazyEdgeGeometry(from_data, to_data)
+        return RhinoLine(from_data["geo"], to_data["geo"])
+
     def edge_geometry_direction(self, u, v):
         """
         Returns a given edge in order with reference to the direction of the
@@ -1097,7 +2087,8 @@ class KnitNetworkBase(nx.Graph):
     def _get_contour_edges(self):
         """
         Get all contour edges of the network that are neither 'weft' nor
-        'warp'.
+        'warp'. Scans all edges of the network, use
+        :meth:`number_of_contour_edges` to count them.
         """
 
         contour_edges = [(f, t, d) for f, t, d in self.edges_iter(data=True)
@@ -1113,7 +2104,8 @@ class KnitNetworkBase(nx.Graph):
 
     def _get_weft_edges(self):
         """
-        Get all 'weft' edges of the network.
+        Get all 'weft' edges of the network. Scans all edges of the
+        network, use :meth:`number_of_weft_edges` to count them.
         """
 
         weft_edges = [(f, t, d) for f, t, d in self.edges_iter(data=True)
@@ -1128,7 +2120,8 @@ class KnitNetworkBase(nx.Graph):
 
     def _get_warp_edges(self):
         """
-        Get all 'warp' edges of the network.
+        Get all 'warp' edges of the network. Scans all edges of the
+        network, use :meth:`number_of_warp_edges` to count them.
         """
 
         warp_edges = [(f, t, d) for f, t, d in self.edges_iter(data=True)
@@ -1148,20 +2141,27 @@ class KnitNetworkBase(nx.Graph):
         attribute.
         """
 
-        segment_contour_edges = [(f, t, d) for f, t, d
-                                 in self.edges_iter(data=True)
-                                 if not d["weft"] and
-                                 not d["warp"]]
-        segment_contour_edges = [sce for sce in segment_contour_edges
-                                 if sce[2]["segment"]]
+        # take the edges from the segment index in the order of their
+        # 'segment' values. edges sharing the same value have to keep the
+        # order of the adjacency, so scan it if there are any
+        segment_index = self._get_edge_store().segment_contours
+        segments = segment_index.values()
+        if len(segments) < len(segment_index):
+            segment_contour_edges = [(f, t, d) for f, t, d
+                                     in self.edges_iter(data=True)
+                                     if not d["weft"] and not d["warp"] and
+                                     d["segment"]]
+            segment_contour_edges.sort(key=lambda x: x[2]["segment"])
+        else:
+            segment_contour_edges = []
+            for segment in segments:
+                f, t, k, d = segment_index.edges(segment)[0]
+                segment_contour_edges.append((f, t, d))
 
         for i, sce in enumerate(segment_contour_edges):
             if sce[0] > sce[1]:
                 segment_contour_edges[i] = (sce[1], sce[0], sce[2])
 
-        # sort them by their 'segment' attributes value
-        segment_contour_edges.sort(key=lambda x: x[2]["segment"])
-
         return segment_contour_edges
 
     segment_contour_edges = property(
@@ -1172,6 +2172,45 @@ class KnitNetworkBase(nx.Graph):
                         "nor 'weft' and which have a 'segment' attribute " +
                         "assigned to them.")
 
+    # EDGE COUNTS -------------------------------------------------------------
+
+    def number_of_contour_edges(self):
+        """
+        Returns the number of contour edges of the network that are neither
+        'weft' nor 'warp'.
+
+        Returns
+        -------
+        count : int
+            The number of contour edges.
+        """
+
+        return self._get_edge_store().count("contour")
+
+    def number_of_weft_edges(self):
+        """
+        Returns the number of 'weft' edges of the network.
+
+        Returns
+        -------
+        count : int
+            The number of edges marked 'weft'.
+        """
+
+        return self._get_edge_store().count("weft")
+
+    def number_of_warp_edges(self):
+        """
+        Returns the number of 'warp' edges of the network.
+
+        Returns
+        -------
+        count : int
+            The number of edges marked 'warp'.
+        """
+
+        return self._get_edge_store().count("warp")
+
     # NODE EDGE METHODS -------------------------------------------------------
 
     def node_weft_edges(self, node, data=False):
@@ -1196,6 +2235,11 @@ class KnitNetworkBase(nx.Graph):
             list will be either a 2-tuple of (u, v) identifiers or a 3-tuple
             of (u, v, d) where d is the attribute data of the edge, depending
             on the data parameter.
+
+        Notes
+        -----
+        Only the edges of the given node are scanned, so the cost is
+        proportional to its degree.
         """
 
         weft_edges = [(s, e, d) for s, e, d in
@@ -1228,6 +2272,11 @@ class KnitNetworkBase(nx.Graph):
             list will be either a 2-tuple of (u, v) identifiers or a 3-tuple
             of (u, v, d) where d is the attribute data of the edge, depending
             on the data parameter.
+
+        Notes
+        -----
+        Only the edges of the given node are scanned, so the cost is
+        proportional to its degree.
         """
 
         warp_edges = [(s, e, d) for s, e, d in
@@ -1262,6 +2311,11 @@ class KnitNetworkBase(nx.Graph):
             given node. Each item in the list will be either a 2-tuple of
             (u, v) identifiers or a 3-tuple of (u, v, d) where d is the
             attribute data of the edge, depending on the data parameter.
+
+        Notes
+        -----
+        Only the edges of the given node are scanned, so the cost is
+        proportional to its degree.
         """
 
         contour_edges = [(s, e, d) for s, e, d in
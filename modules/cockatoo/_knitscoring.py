@@ -0,0 +1,189 @@
+# PYTHON STANDARD LIBRARY IMPORTS ---------------------------------------------
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from math import acos
+from math import pi
+from math import sqrt
+
+# DUNDER ----------------------------------------------------------------------
+__all__ = [
+    "UNSET_ANGLE",
+    "direction",
+    "unitize",
+    "vector_angle",
+    "rank_candidates",
+    "least_angle_candidate"
+]
+
+# THIRD PARTY MODULE IMPORTS --------------------------------------------------
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# CONSTANTS -------------------------------------------------------------------
+
+UNSET_ANGLE = -1.23432101234321e+308
+"""
+float: Angle reported for zero length vectors, equal to the value returned by
+       ``Rhino.Geometry.Vector3d.VectorAngle`` in that case.
+"""
+
+_NUMPY_MIN_CANDIDATES = 32
+"""
+Minimum number of candidates for which scoring is done using NumPy. Smaller
+blocks are scored in pure Python, which is faster for only a handful of
+candidates.
+"""
+
+# VECTOR HELPERS --------------------------------------------------------------
+
+
+def unitize(vector):
+    """
+    Returns the unitized components of a vector as a 3-tuple. Zero length
+    vectors result in a zero vector.
+    """
+
+    x, y, z = vector.X, vector.Y, vector.Z
+    length = sqrt(x * x + y * y + z * z)
+    if not length:
+        return (0.0, 0.0, 0.0)
+    return (x / length, y / length, z / length)
+
+
+def direction(start, end):
+    """
+    Returns the unitized direction from one point to another as a 3-tuple.
+    Coincident points result in a zero vector.
+    """
+
+    x = end.X - start.X
+    y = end.Y - start.Y
+    z = end.Z - start.Z
+    length = sqrt(x * x + y * y + z * z)
+    if not length:
+        return (0.0, 0.0, 0.0)
+    return (x / length, y / length, z / length)
+
+
+def vector_angle(a, b):
+    """
+    Returns the angle in radians between two vectors given as 3-tuples.
+    Resembles ``Rhino.Geometry.Vector3d.VectorAngle`` measured around the
+    cross product of both vectors, as it is done by the connection heuristics
+    of KnitNetwork.
+    """
+
+    la = sqrt(a[0] * a[0] + a[1] * a[1] + a[2] * a[2])
+    lb = sqrt(b[0] * b[0] + b[1] * b[1] + b[2] * b[2])
+    if not la or not lb:
+        return UNSET_ANGLE
+    d = (a[0] * b[0] + a[1] * b[1] + a[2] * b[2]) / (la * lb)
+    return acos(max(-1.0, min(1.0, d)))
+
+# CANDIDATE SCORING -----------------------------------------------------------
+
+
+def _candidate_angles(origin, contour_dir, candidates):
+    return [vector_angle(contour_dir, direction(origin, c[1]["geo"]))
+            for c in candidates]
+
+
+def _candidate_angles_numpy(origin, contour_dir, candidates):
+    # same operations as _candidate_angles, applied to the whole block
+    geo = [c[1]["geo"] for c in candidates]
+    x = np.array([pt.X for pt in geo]) - origin.X
+    y = np.array([pt.Y for pt in geo]) - origin.Y
+    z = np.array([pt.Z for pt in geo]) - origin.Z
+    length = np.sqrt(x * x + y * y + z * z)
+    zero = length == 0
+    length[zero] = 1.0
+    x, y, z = x / length, y / length, z / length
+    cx, cy, cz = contour_dir
+    la = sqrt(cx * cx + cy * cy + cz * cz)
+    lb = np.sqrt(x * x + y * y + z * z)
+    if not la:
+        return np.full(len(candidates), UNSET_ANGLE)
+    lb[zero] = 1.0
+    d = (cx * x + cy * y + cz * z) / (la * lb)
+    angles = np.arccos(np.clip(d, -1.0, 1.0))
+    angles[zero] = UNSET_ANGLE
+    return angles
+
+
+def rank_candidates(origin, contour_dir, candidates, distances):
+    """
+    Ranks a block of candidate nodes for a connection from a point on a
+    contour by their distance and then by how perpendicular the connection
+    would be to the contour.
+
+    Parameters
+    ----------
+    origin : :obj:`Rhino.Geometry.Point3d`
+        The point of the node to connect from.
+
+    contour_dir : :obj:`tuple`
+        The unitized direction of the contour at the origin as 3-tuple.
+
+    candidates : :obj:`list` of :obj:`tuple`
+        The candidate nodes as 2-tuples of (node_identifier, node_data).
+
+    distances : :obj:`list` of float
+        The distances of the candidates to the origin.
+
+    Returns
+    -------
+    ranking : :obj:`tuple`
+        4-tuple of the distances, the perpendicularity deltas, the angles to
+        the contour direction and the candidates, all ordered by rank.
+
+    Notes
+    -----
+    Candidates of equal distance and delta keep their input order, which
+    reproduces sorting the zipped lists by ``itemgetter(0, 1)``. Blocks of
+    many candidates are scored using NumPy, if it is available.
+    """
+
+    count = min(len(candidates), len(distances))
+    candidates = candidates[:count]
+    distances = distances[:count]
+    halfpi = 0.5 * pi
+    if np is not None and count >= _NUMPY_MIN_CANDIDATES:
+        angles = _candidate_angles_numpy(origin, contour_dir, candidates)
+        deltas = np.abs(angles - halfpi)
+        # lexsort is stable and sorts by the last key first
+        order = np.lexsort((deltas, np.asarray(distances))).tolist()
+        angles = angles.tolist()
+        deltas = deltas.tolist()
+    else:
+        angles = _candidate_angles(origin, contour_dir, candidates)
+        deltas = [abs(a - halfpi) for a in angles]
+        order = sorted(range(count), key=lambda i: (distances[i], deltas[i]))
+    return (tuple(distances[i] for i in order),
+            tuple(deltas[i] for i in order),
+            tuple(angles[i] for i in order),
+            tuple(candidates[i] for i in order))
+
+
+def least_angle_candidate(origin, previous_dir, candidate_a, candidate_b):
+    """
+    Selects the one of two candidate nodes whose connection from the origin
+    changes the direction of the previous connection the least. Returns
+    ``candidate_b`` if both angles are equal.
+    """
+
+    previous_dir = unitize(previous_dir)
+    angleA = vector_angle(previous_dir,
+                          direction(origin, candidate_a[1]["geo"]))
+    angleB = vector_angle(previous_dir,
+                          direction(origin, candidate_b[1]["geo"]))
+    if angleA < angleB:
+        return candidate_a
+    return candidate_b
+
+
+# MAIN ------------------------------------------------------------------------
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,191 @@
+# PYTHON STANDARD LIBRARY IMPORTS ---------------------------------------------
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from heapq import heappush
+from heapq import heapreplace
+
+# DUNDER ----------------------------------------------------------------------
+__all__ = [
+    "NodeKDTree"
+]
+
+# SPATIAL INDEX OF NODES ------------------------------------------------------
+
+
+class NodeKDTree(object):
+    """
+    Static k-d tree over the 'geo' attributes of a list of nodes, used to
+    find the nearest candidates of a node on an adjacent contour without
+    measuring and sorting the distances to all of them.
+
+    Parameters
+    ----------
+    nodes : :obj:`list` of :obj:`tuple`
+        List of 2-tuples in the form of (node_identifier, node_data). The
+        tree refers to the nodes by their index inside of this list.
+
+    Notes
+    -----
+    The tree is only used to narrow down the candidates. Their final
+    distances are always measured using the Rhino geometry of the nodes and
+    ties are broken by the index of the node inside of the list, so the
+    result of a query is identical to stable sorting all eligible nodes by
+    distance and taking the first ``k`` of them.
+    """
+
+    __slots__ = ("nodes", "_xyz", "_root")
+
+    _LEAF_SIZE = 8
+
+    # relative tolerance for the squared distance bound of the candidates,
+    # guarding against rounding differences between the coordinates used
+    # by the tree and the distances measured by Rhino
+    _TOLERANCE = 1e-9
+
+    def __init__(self, nodes):
+        self.nodes = nodes
+        geo = [node[1]["geo"] for node in nodes]
+        self._xyz = [(pt.X, pt.Y, pt.Z) for pt in geo]
+        self._root = self._build(list(range(len(nodes))))
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def _build(self, indices):
+        # leaves are lists of indices, inner nodes are 4-tuples of the
+        # splitting axis, the splitting value and both subtrees
+        if len(indices) <= self._LEAF_SIZE:
+            return indices
+        xyz = self._xyz
+        spreads = []
+        for axis in range(3):
+            values = [xyz[i][axis] for i in indices]
+            spreads.append(max(values) - min(values))
+        axis = spreads.index(max(spreads))
+        indices.sort(key=lambda i: xyz[i][axis])
+        mid = len(indices) // 2
+        return (axis,
+                xyz[indices[mid]][axis],
+                self._build(indices[:mid]),
+                self._build(indices[mid:]))
+
+    def _squared_distances(self, point, indices, eligible):
+        xyz = self._xyz
+        px, py, pz = point
+        for i in indices:
+            if eligible is not None and not eligible(i):
+                continue
+            x, y, z = xyz[i]
+            yield ((x - px) * (x - px) + (y - py) * (y - py) +
+                   (z - pz) * (z - pz)), i
+
+    def _bound(self, point, k, eligible):
+        # find the squared distance of the k-th nearest eligible node
+        best = []
+        stack = [(self._root, 0.0)]
+        while stack:
+            tree, offset = stack.pop()
+            # skip subtrees which are farther away than the current bound
+            if len(best) == k and offset > -best[0]:
+                continue
+            if isinstance(tree, list):
+                for dist, i in self._squared_distances(point, tree, eligible):
+                    if len(best) < k:
+                        heappush(best, -dist)
+                    elif dist < -best[0]:
+                        heapreplace(best, -dist)
+                continue
+            axis, split, left, right = tree
+            diff = point[axis] - split
+            if diff < 0:
+                near, far = left, right
+            else:
+                near, far = right, left
+            stack.append((far, max(offset, diff * diff)))
+            stack.append((near, offset))
+        if len(best) < k:
+            return None
+        return -best[0]
+
+    def _within(self, point, bound, eligible):
+        # collect all eligible nodes inside of the squared distance bound
+        found = []
+        stack = [self._root]
+        while stack:
+            tree = stack.pop()
+            if isinstance(tree, list):
+                found.extend(i for dist, i
+                             in self._squared_distances(point, tree, eligible)
+                             if dist <= bound)
+                continue
+            axis, split, left, right = tree
+            diff = point[axis] - split
+            if diff <= 0 or diff * diff <= bound:
+                stack.append(left)
+            if diff >= 0 or diff * diff <= bound:
+                stack.append(right)
+        return found
+
+    def nearest(self, point, k=4, eligible=None, precise=False):
+        """
+        Finds the ``k`` nearest eligible nodes to a point.
+
+        Parameters
+        ----------
+        point : :obj:`Rhino.Geometry.Point3d`
+            The point to measure the distances from.
+
+        k : int, optional
+            The maximum number of nodes to return.
+
+            Defaults to ``4``.
+
+        eligible : callable, optional
+            Predicate receiving the index of a node inside of the list of
+            nodes. Only nodes for which it returns ``True`` are considered.
+
+            Defaults to ``None``.
+
+        precise : bool, optional
+            If ``True``, distances are measured using ``DistanceTo``,
+            otherwise ``DistanceToSquared`` is used.
+
+            Defaults to ``False``.
+
+        Returns
+        -------
+        result : :obj:`tuple`
+            2-tuple of the distances and the nodes, both ordered by distance.
+            Both are empty if there is no eligible node.
+        """
+
+        xyz = (point.X, point.Y, point.Z)
+        if isinstance(self._root, list):
+            # small trees consist of a single leaf, measure all nodes
+            bound = None
+        else:
+            bound = self._bound(xyz, k, eligible)
+        if bound is None:
+            candidates = [i for i in range(len(self))
+                          if eligible is None or eligible(i)]
+        else:
+            bound += bound * self._TOLERANCE + 1e-300
+            candidates = self._within(xyz, bound, eligible)
+        if not candidates:
+            return (), ()
+
+        nodes = self.nodes
+        if precise:
+            measure = point.DistanceTo
+        else:
+            measure = point.DistanceToSquared
+        result = sorted((measure(nodes[i][1]["geo"]), i) for i in candidates)
+        result = result[:k]
+        return (tuple(dist for dist, i in result),
+                tuple(nodes[i] for dist, i in result))
+
+
+# MAIN ------------------------------------------------------------------------
+if __name__ == '__main__':
+    pass
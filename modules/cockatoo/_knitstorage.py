@@ -0,0 +1,2760 @@
+# PYTHON STANDARD LIBRARY IMPORTS ---------------------------------------------
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from array import array
+from bisect import bisect_left
+from bisect import bisect_right
+from collections import Counter
+from itertools import compress
+from itertools import count
+from itertools import repeat
+from operator import and_
+from operator import eq
+from operator import is_not
+from operator import not_
+try:
+    from itertools import imap as map
+except ImportError:
+    pass
+
+# DUNDER ----------------------------------------------------------------------
+__all__ = [
+    "NODE_FLAGS",
+    "STITCH_CLASSES",
+    "pack_node_flags",
+    "unpack_node_flags",
+    "flags_mask",
+    "KnitEdgeData",
+    "KnitLazyEdgeData",
+    "LazyEdgeGeometry",
+    "NodeOrderIndex",
+    "NodeFlagIndex",
+    "KnitNodeData",
+    "KnitNodeMap",
+    "KnitNodeColumns",
+    "RowOrderIndex",
+    "KnitNodeRow",
+    "attribute_id",
+    "KnitColumnarNodeMap",
+    "EdgeGroupIndex",
+    "KnitEdgeStore",
+    "KnitKeyDict",
+    "KnitNeighborDict",
+    "KnitAdjacencyMap"
+]
+
+# LOCAL MODULE IMPORTS --------------------------------------------------------
+from cockatoo.environment import RHINOINSIDE
+
+# RHINO IMPORTS ---------------------------------------------------------------
+if RHINOINSIDE:
+    import rhinoinside
+    rhinoinside.load()
+    from Rhino.Geometry import Line as RhinoLine
+    from Rhino.Geometry import Point3d as RhinoPoint3d
+else:
+    from Rhino.Geometry import Line as RhinoLine
+    from Rhino.Geometry import Point3d as RhinoPoint3d
+
+# VERSIONING ------------------------------------------------------------------
+
+_VERSIONS = count(1)
+"""
+Global counter for version numbers of node maps. Version numbers are unique
+across all maps, so a cached value can never be mistaken for a valid one
+after a node dictionary has been replaced.
+"""
+
+_CONTOUR_KEYS = frozenset(("position", "num", "geo"))
+"""
+Node attributes which define the geometry of a position contour.
+"""
+
+# EDGE ATTRIBUTE DATA ---------------------------------------------------------
+
+_EDGE_INDEX_KEYS = frozenset(("weft", "warp", "segment"))
+"""
+Edge attributes which decide the kind of an edge and its membership in the
+segment index of an edge store.
+"""
+
+
+class KnitEdgeData(dict):
+    """
+    Attribute dictionary of a single edge of a KnitNetworkBase.
+
+    Behaves exactly like a regular :obj:`dict` but reports writes of the
+    'weft', 'warp' and 'segment' attributes to the edge stores it is
+    registered in, so that their counts and indexes stay up to date when
+    these attributes are set directly (i.e.
+    ``network.edge[u][v]["warp"] = True``). Writes of all other attributes
+    are not reported.
+
+    Notes
+    -----
+    An edge is registered in the store of the network it is first added to,
+    together with its (u, v, key) identifier inside of that network. Further
+    stores sharing the same dictionary (i.e. through ``subgraph()``) are kept
+    in a separate list, which is only created when needed.
+
+    If the 'geo' attribute is set to a :class:`LazyEdgeGeometry`, the
+    instance turns into a :class:`KnitLazyEdgeData`, which creates the
+    geometry on first access.
+    """
+
+    __slots__ = ("_store", "_u", "_v", "_key", "_shared")
+
+    def __init__(self, *args, **kwargs):
+        dict.__init__(self, *args, **kwargs)
+        self._store = None
+        self._u = None
+        self._v = None
+        self._key = None
+        self._shared = None
+        self._check_lazy()
+
+    def __reduce__(self):
+        return (dict, (self.copy(),))
+
+    def _check_lazy(self):
+        if isinstance(dict.get(self, "geo"), LazyEdgeGeometry):
+            self.__class__ = KnitLazyEdgeData
+        else:
+            self.__class__ = KnitEdgeData
+
+    def _owners(self):
+        """
+        Returns a list of (store, ident) 2-tuples of all edge stores the edge
+        is registered in.
+        """
+
+        owners = [(self._store, (self._u, self._v, self._key))]
+        if self._shared is not None:
+            owners.extend(self._shared)
+        return owners
+
+    def _before_change(self):
+        for store, ident in self._owners():
+            store._unindex(ident, self)
+
+    def _after_change(self):
+        for store, ident in self._owners():
+            store._index(ident, self)
+
+    def __setitem__(self, key, value):
+        if self._store is None or key not in _EDGE_INDEX_KEYS:
+            dict.__setitem__(self, key, value)
+        else:
+            self._before_change()
+            dict.__setitem__(self, key, value)
+            self._after_change()
+        if key == "geo":
+            self._check_lazy()
+
+    def __delitem__(self, key):
+        if self._store is None or key not in _EDGE_INDEX_KEYS:
+            dict.__delitem__(self, key)
+            return
+        self._before_change()
+        dict.__delitem__(self, key)
+        self._after_change()
+
+    def update(self, *args, **kwargs):
+        if self._store is None:
+            dict.update(self, *args, **kwargs)
+        else:
+            self._before_change()
+            dict.update(self, *args, **kwargs)
+            self._after_change()
+        self._check_lazy()
+
+    def setdefault(self, key, default=None):
+        if key in self:
+            return dict.__getitem__(self, key)
+        self[key] = default
+        return default
+
+    def pop(self, key, *args):
+        if (self._store is None or key not in _EDGE_INDEX_KEYS or
+                key not in self):
+            return dict.pop(self, key, *args)
+        self._before_change()
+        value = dict.pop(self, key)
+        self._after_change()
+        return value
+
+    def popitem(self):
+        if self._store is None:
+            return dict.popitem(self)
+        self._before_change()
+        item = dict.popitem(self)
+        self._after_change()
+        return item
+
+    def clear(self):
+        if self._store is None:
+            dict.clear(self)
+            return
+        self._before_change()
+        dict.clear(self)
+        self._after_change()
+
+
+class KnitLazyEdgeData(KnitEdgeData):
+    """
+    Attribute dictionary of a single edge whose 'geo' attribute has not been
+    created yet. Reading the 'geo' attribute in any way creates and stores
+    the geometry and turns the instance back into a :class:`KnitEdgeData`.
+    """
+
+    __slots__ = ()
+
+    def _resolve(self):
+        geo = dict.get(self, "geo")
+        if isinstance(geo, LazyEdgeGeometry):
+            geo = geo.resolve()
+            dict.__setitem__(self, "geo", geo)
+        self.__class__ = KnitEdgeData
+        return geo
+
+    def __getitem__(self, key):
+        if key == "geo":
+            return self._resolve()
+        return dict.__getitem__(self, key)
+
+    def get(self, key, default=None):
+        if key == "geo" and dict.__contains__(self, key):
+            return self._resolve()
+        return dict.get(self, key, default)
+
+    def setdefault(self, key, default=None):
+        self._resolve()
+        return KnitEdgeData.setdefault(self, key, default)
+
+    def pop(self, key, *args):
+        self._resolve()
+        return KnitEdgeData.pop(self, key, *args)
+
+    def popitem(self):
+        self._resolve()
+        return KnitEdgeData.popitem(self)
+
+    def items(self):
+        self._resolve()
+        return dict.items(self)
+
+    def values(self):
+        self._resolve()
+        return dict.values(self)
+
+    def copy(self):
+        self._resolve()
+        return dict.copy(self)
+
+    if hasattr(dict, "iteritems"):
+        def iteritems(self):
+            self._resolve()
+            return dict.iteritems(self)
+
+        def itervalues(self):
+            self._resolve()
+            return dict.itervalues(self)
+
+    def __eq__(self, other):
+        self._resolve()
+        return dict.__eq__(self, other)
+
+    def __ne__(self, other):
+        self._resolve()
+        return dict.__ne__(self, other)
+
+    __hash__ = None
+
+
+class LazyEdgeGeometry(object):
+    """
+    Placeholder for the 'geo' attribute of an edge, which gets replaced by a
+    :class:`Rhino.Geometry.Line` between the 'geo' attributes of the two
+    nodes of the edge on first access.
+
+    Parameters
+    ----------
+    source : :obj:`dict`
+        The attribute dictionary of the node the line starts at.
+
+    target : :obj:`dict`
+        The attribute dictionary of the node the line ends at.
+
+    Notes
+    -----
+    The line is created from the node attributes at the time of the first
+    access, not at the time the edge was created.
+    """
+
+    __slots__ = ("source", "target")
+
+    def __init__(self, source, target):
+        self.source = source
+        self.target = target
+
+    def resolve(self):
+        """
+        Creates the line between the two nodes.
+        """
+
+        return RhinoLine(self.source["geo"], self.target["geo"])
+
+    def __repr__(self):
+        return "LazyEdgeGeometry"
+
+# NODE CLASSIFICATION ---------------------------------------------------------
+
+NODE_FLAGS = ("leaf", "start", "end", "increase", "decrease")
+"""
+The boolean node attributes which are packed into a single integer per node,
+ordered by their bit (i.e. 'leaf' is bit 0, 'decrease' is bit 4).
+"""
+
+_FLAG_BITS = dict((f, 1 << i) for i, f in enumerate(NODE_FLAGS))
+
+STITCH_CLASSES = ("R", "E", "S", "Ei", "Ed", "L", "SL", "EL", "SEL", "i", "d")
+"""
+Names of the stitch classes of nodes, indexed by their class code. 'R' is a
+regular node, 'E' an end node, 'L' a leaf node, 'S' a start node, 'i' an
+increase and 'd' a decrease. Combined names (i.e. 'SEL') denote nodes with
+several of these flags.
+"""
+
+
+def pack_node_flags(data):
+    """
+    Packs the 'leaf', 'start', 'end', 'increase' and 'decrease' attributes of
+    a node into a single integer. Missing attributes count as ``False``.
+    """
+
+    flags = 0
+    for flag in NODE_FLAGS:
+        if data.get(flag, False):
+            flags |= _FLAG_BITS[flag]
+    return flags
+
+
+def unpack_node_flags(flags):
+    """
+    Unpacks an integer created by :func:`pack_node_flags` into a dictionary
+    of the five boolean node attributes.
+    """
+
+    return dict([(f, (flags & _FLAG_BITS[f]) != 0) for f in NODE_FLAGS])
+
+
+def flags_mask(flags):
+    """
+    Returns the packed flags integer with the bits of the given flag
+    attribute names set.
+    """
+
+    mask = 0
+    for flag in flags:
+        mask |= _FLAG_BITS[flag]
+    return mask
+
+
+def _classify(flags):
+    """
+    Returns the code of the stitch class for a packed flags integer.
+    """
+
+    data = unpack_node_flags(flags)
+    # END BUT NOT LEAF
+    if data["end"] and not data["leaf"]:
+        if data["increase"]:
+            name = "Ei"
+        elif data["decrease"]:
+            name = "Ed"
+        elif data["start"]:
+            name = "S"
+        else:
+            name = "E"
+    # END AND LEAF
+    elif data["end"]:
+        name = "SEL" if data["start"] else "EL"
+    # LEAF BUT NOT END
+    elif data["leaf"]:
+        name = "SL" if data["start"] else "L"
+    # NO END NO LEAF
+    elif data["increase"] and not data["decrease"]:
+        name = "i"
+    elif data["decrease"] and not data["increase"]:
+        name = "d"
+    else:
+        name = "R"
+    return STITCH_CLASSES.index(name)
+
+
+_FLAG_CLASSES = tuple([_classify(f) for f in range(1 << len(NODE_FLAGS))])
+"""
+Lookup table of stitch class codes, indexed by packed flags integers.
+"""
+
+# NODE INDEXES ----------------------------------------------------------------
+
+
+class NodeOrderIndex(object):
+    """
+    Index of nodes grouped by the value of a key attribute and ordered by the
+    value of their 'num' attribute. Can optionally be restricted to nodes for
+    which a flag attribute (i.e. 'leaf' or 'end') is set.
+
+    Parameters
+    ----------
+    key : str
+        The attribute whose value the nodes get grouped by.
+
+    flag : str, optional
+        If given, only nodes for which this attribute evaluates to ``True``
+        are part of the index.
+
+        Defaults to ``None``.
+
+    skip_none : bool, optional
+        If ``True``, nodes whose key attribute is ``None`` are not part of
+        the index.
+
+        Defaults to ``False``.
+
+    Notes
+    -----
+    Nodes with equal 'num' values keep the order in which they were added to
+    the index, which reproduces the stable sort over the node dictionary that
+    was used before the index existed. Nodes without a 'num' value come
+    first, just like ``None`` sorts first under Python 2.
+
+    Every group holds a list of the nodes without 'num' value and two
+    parallel lists of the 'num' values and nodes of all other nodes, so the
+    index needs no objects per node.
+
+    The ``version`` attribute holds the version of the node map the index
+    has last been brought up to date with.
+    """
+
+    __slots__ = ("key", "flag", "skip_none", "watched", "version", "_groups")
+
+    def __init__(self, key, flag=None, skip_none=False):
+        self.key = key
+        self.flag = flag
+        self.skip_none = skip_none
+        self.watched = frozenset([a for a in (key, "num", flag) if a])
+        self.version = None
+        self._groups = {}
+
+    def _is_member(self, data):
+        if self.key not in data:
+            return False
+        if self.skip_none and data[self.key] is None:
+            return False
+        if self.flag is not None and not data.get(self.flag, False):
+            return False
+        return True
+
+    def clear(self):
+        self._groups = {}
+        self.version = None
+
+    def insert(self, node, data):
+        """
+        Inserts a node into the index if it qualifies as a member.
+        """
+
+        if not self._is_member(data):
+            return
+        value = data[self.key]
+        group = self._groups.get(value)
+        if group is None:
+            group = ([], [], [])
+            self._groups[value] = group
+        num = data.get("num")
+        if num is None:
+            group[0].append(node)
+            return
+        i = bisect_right(group[1], num)
+        group[1].insert(i, num)
+        group[2].insert(i, node)
+
+    def remove(self, node, data):
+        """
+        Removes a node from the index, based on its current attribute values.
+        """
+
+        if not self._is_member(data):
+            return
+        value = data[self.key]
+        group = self._groups.get(value)
+        if group is None:
+            return
+        num = data.get("num")
+        if num is None:
+            if node not in group[0]:
+                return
+            group[0].remove(node)
+        else:
+            nums, nodes = group[1], group[2]
+            i = bisect_left(nums, num)
+            n = len(nums)
+            while i < n and nums[i] == num:
+                if nodes[i] == node:
+                    break
+                i += 1
+            else:
+                return
+            del nums[i]
+            del nodes[i]
+        if not group[0] and not group[2]:
+            del self._groups[value]
+
+    def extend(self, items):
+        """
+        Inserts all qualifying nodes of an iterable of (node, data) tuples,
+        just like calling insert() for each of them in turn.
+        """
+
+        insert = self.insert
+        for node, data in items:
+            insert(node, data)
+
+    def rebuild(self, items):
+        """
+        Rebuilds the whole index from an iterable of (node, data) tuples.
+        """
+
+        key = self.key
+        groups = {}
+        for node, data in items:
+            if not self._is_member(data):
+                continue
+            value = data[key]
+            group = groups.get(value)
+            if group is None:
+                group = ([], [], [])
+                groups[value] = group
+            num = data.get("num")
+            if num is None:
+                group[0].append(node)
+            else:
+                group[1].append(num)
+                group[2].append(node)
+        for nones, nums, nodes in groups.values():
+            # sorting the positions keeps equal 'num' values in the order of
+            # the items
+            order = sorted(range(len(nums)), key=nums.__getitem__)
+            nums[:] = [nums[i] for i in order]
+            nodes[:] = [nodes[i] for i in order]
+        self._groups = groups
+
+    def nodes(self, value):
+        """
+        Returns a new list of all nodes in the group of the given value,
+        ordered by their 'num' attribute.
+        """
+
+        group = self._groups.get(value)
+        if group is None:
+            return []
+        return group[0] + group[2]
+
+    def values(self, skip_none=True):
+        """
+        Returns the sorted values of all non-empty groups.
+        """
+
+        values = [v for v in self._groups if not (skip_none and v is None)]
+        values.sort()
+        return values
+
+    def count(self, value):
+        """
+        Returns the number of nodes in the group of the given value.
+        """
+
+        group = self._groups.get(value)
+        if group is None:
+            return 0
+        return len(group[0]) + len(group[2])
+
+
+class NodeFlagIndex(object):
+    """
+    Index of the packed 'leaf', 'start', 'end', 'increase' and 'decrease'
+    flags of every node, together with the number of nodes for every
+    combination of flags.
+
+    Notes
+    -----
+    The ``version`` attribute holds the version of the node map the index
+    has last been brought up to date with.
+    """
+
+    __slots__ = ("watched", "version", "codes", "_counts")
+
+    def __init__(self):
+        self.watched = frozenset(NODE_FLAGS)
+        self.version = None
+        self.codes = {}
+        self._counts = [0] * len(_FLAG_CLASSES)
+
+    def clear(self):
+        self.codes = {}
+        self._counts = [0] * len(_FLAG_CLASSES)
+        self.version = None
+
+    def insert(self, node, data):
+        flags = pack_node_flags(data)
+        self.codes[node] = flags
+        self._counts[flags] += 1
+
+    def remove(self, node, data):
+        flags = self.codes.pop(node, None)
+        if flags is not None:
+            self._counts[flags] -= 1
+
+    def extend(self, items):
+        for node, data in items:
+            self.insert(node, data)
+
+    def rebuild(self, items):
+        self.codes = {}
+        self._counts = [0] * len(_FLAG_CLASSES)
+        self.extend(items)
+
+    def counts(self):
+        """
+        Returns a list of the number of nodes for every packed flags integer.
+        """
+
+        return list(self._counts)
+
+# NODE ATTRIBUTE DATA ---------------------------------------------------------
+
+_NODE_INDEX_KEYS = frozenset(("position", "num", "segment") +
+                             NODE_FLAGS) | _CONTOUR_KEYS
+"""
+Node attributes which are part of the indexes of a node map or define the
+geometry of a position contour.
+"""
+
+
+class KnitNodeData(dict):
+    """
+    Attribute dictionary of a single node of a KnitNetworkBase.
+
+    Behaves exactly like a regular :obj:`dict` but reports writes of the
+    'position', 'num', 'segment' and 'geo' attributes and of the boolean
+    flags to the node maps it is stored in, so that their indexes and
+    versions stay up to date when these attributes are set directly (i.e.
+    ``network.node[n]["position"] = 3``). Writes of all other attributes
+    are not reported.
+
+    Notes
+    -----
+    A node is registered in the map of the network it is first added to,
+    together with its identifier inside of that map. Further maps sharing
+    the same dictionary (i.e. the mapping network) are kept in a separate
+    list, which is only created when needed.
+    """
+
+    __slots__ = ("_map", "_node", "_shared")
+
+    def __init__(self, *args, **kwargs):
+        dict.__init__(self, *args, **kwargs)
+        self._map = None
+        self._node = None
+        self._shared = None
+
+    def __reduce__(self):
+        return (self.__class__, (dict(self),))
+
+    def _owners(self):
+        """
+        Returns a list of (map, node) 2-tuples of all node maps the
+        dictionary is registered in.
+        """
+
+        owners = [(self._map, self._node)]
+        if self._shared is not None:
+            owners.extend(self._shared)
+        return owners
+
+    def _register(self, nodemap, node):
+        if self._map is None:
+            self._map = nodemap
+            self._node = node
+        elif self._map is nodemap:
+            self._node = node
+        elif self._shared is None:
+            self._shared = [(nodemap, node)]
+        else:
+            for i, (owner, n) in enumerate(self._shared):
+                if owner is nodemap:
+                    self._shared[i] = (nodemap, node)
+                    return
+            self._shared.append((nodemap, node))
+
+    def _release(self, nodemap):
+        shared = self._shared
+        if self._map is nodemap:
+            if shared is None:
+                self._map = self._node = None
+            else:
+                self._map, self._node = shared.pop(0)
+                if not shared:
+                    self._shared = None
+        elif shared is not None:
+            for i, (owner, n) in enumerate(shared):
+                if owner is nodemap:
+                    del shared[i]
+                    break
+            if not shared:
+                self._shared = None
+
+    def _write(self, keys, change, *args):
+        """
+        Applies a change to the attributes with the given names (all if
+        ``None``) by calling ``change`` with the given arguments, notifying
+        all owning maps if any of the attributes is indexed.
+        """
+
+        if self._map is None or (keys is not None and
+                                 _NODE_INDEX_KEYS.isdisjoint(keys)):
+            return change(*args)
+        return self._notify(self._owners(), keys, change, args)
+
+    def _notify(self, owners, keys, change, args):
+        if not owners:
+            return change(*args)
+        nodemap, node = owners[0]
+        return nodemap._change(node, self, keys, self._notify, owners[1:],
+                               keys, change, args)
+
+    def __setitem__(self, key, value):
+        self._write((key,), dict.__setitem__, self, key, value)
+
+    def __delitem__(self, key):
+        self._write((key,), dict.__delitem__, self, key)
+
+    def update(self, *args, **kwargs):
+        if self._map is None:
+            dict.update(self, *args, **kwargs)
+            return
+        attrs = dict(*args, **kwargs)
+        self._write(list(attrs.keys()), dict.update, self, attrs)
+
+    def setdefault(self, key, default=None):
+        if key in self:
+            return dict.__getitem__(self, key)
+        self[key] = default
+        return default
+
+    def pop(self, key, *args):
+        if key not in self:
+            return dict.pop(self, key, *args)
+        return self._write((key,), dict.pop, self, key)
+
+    def popitem(self):
+        return self._write(None, dict.popitem, self)
+
+    def clear(self):
+        self._write(None, dict.clear, self)
+
+# NODE MAP --------------------------------------------------------------------
+
+
+class KnitNodeMap(dict):
+    """
+    Node dictionary of a KnitNetworkBase, mapping nodes to their attribute
+    dictionaries and providing a set of node indexes.
+
+    Parameters
+    ----------
+    data : :obj:`dict`, optional
+        Mapping of nodes to attribute dictionaries to initialize the map with.
+
+    Notes
+    -----
+    NetworkX only ever adds and removes nodes through item assignment, item
+    deletion and ``clear()``. These are intercepted here, for all network
+    types (Graph, DiGraph, MultiGraph) and for every way nodes are added or
+    removed. The attribute dictionaries are stored as
+    :class:`KnitNodeData`, which reports writes of indexed attributes to
+    every map it is stored in, also when they are written directly.
+
+    Every index is built on its first use and remembers the version of the
+    map it is valid for. Insertions, removals and attribute writes keep
+    valid indexes up to date, all others get rebuilt on their next use.
+
+    Every mutation also advances the version of the map, and the version of
+    the position contours touched by it. Cached aggregates compare these
+    versions to decide if they are still valid.
+    """
+
+    def __init__(self, data=None):
+        dict.__init__(self)
+        self.created = next(_VERSIONS)
+        self.version = self.created
+        self.position_versions = {}
+        self._create_indexes()
+        if data:
+            self._bulk_load(data.items())
+
+    def _create_indexes(self):
+        self._positions = NodeOrderIndex("position")
+        self._position_leaves = NodeOrderIndex("position", "leaf")
+        self._position_ends = NodeOrderIndex("position", "end")
+        self._segments = NodeOrderIndex("segment", skip_none=True)
+        self._classes = NodeFlagIndex()
+        self.indexes = (self._positions,
+                        self._position_leaves,
+                        self._position_ends,
+                        self._segments,
+                        self._classes)
+
+    def _position_of(self, data):
+        """
+        Returns the 'position' attribute of the given attribute data.
+        """
+
+        return data.get("position")
+
+    def _adopt(self, node, data):
+        """
+        Returns the attribute data under which a node gets stored.
+        """
+
+        if not isinstance(data, KnitNodeData):
+            data = KnitNodeData(data)
+        data._register(self, node)
+        return data
+
+    def _release(self, node, data):
+        """
+        Called for the attribute data of a node which has been removed.
+        """
+
+        data._release(self)
+
+    def _rename(self, node, data):
+        """
+        Returns the attribute data of a node which has been relabeled to the
+        given node.
+        """
+
+        data._register(self, node)
+        return data
+
+    def _bulk_load(self, items):
+        for node, attrs in items:
+            dict.__setitem__(self, node, self._adopt(node, attrs))
+        self.touch()
+
+    def _insert_many(self, items):
+        """
+        Inserts an iterable of (node, data) tuples of nodes which are not yet
+        part of the map, updating the indexes once for all of them.
+        """
+
+        valid = self._valid_indexes()
+        added = []
+        for node, attrs in items:
+            attrs = self._adopt(node, attrs)
+            dict.__setitem__(self, node, attrs)
+            added.append((node, attrs))
+        if not added:
+            return
+        for index in valid:
+            index.extend(added)
+        version = next(_VERSIONS)
+        self.version = version
+        for node, attrs in added:
+            self.position_versions[self._position_of(attrs)] = version
+        self._validate(valid)
+
+    def _relabel(self, mapping):
+        """
+        Replaces every node of the map by the node it is mapped to, keeping
+        the attribute data.
+        """
+
+        items = [(mapping[node], data) for node, data in dict.items(self)]
+        dict.clear(self)
+        for node, data in items:
+            dict.__setitem__(self, node, self._rename(node, data))
+        self.touch()
+
+    # VERSIONING --------------------------------------------------------------
+
+    def _advance(self, data=None, keys=None):
+        """
+        Advances the version of the map and, if the attributes with the given
+        names (all if ``None``) can change the geometry of a position
+        contour, the version of the contour of the given attribute data.
+        """
+
+        version = next(_VERSIONS)
+        self.version = version
+        if data is not None and (keys is None or
+                                 not _CONTOUR_KEYS.isdisjoint(keys)):
+            self.position_versions[self._position_of(data)] = version
+
+    def position_version(self, position):
+        """
+        Returns the version of the contour at the given position.
+        """
+
+        return self.position_versions.get(position, self.created)
+
+    def touch(self):
+        """
+        Marks all indexes and all cached aggregates of the map as outdated,
+        so that they get rebuilt on their next use.
+        """
+
+        self.created = next(_VERSIONS)
+        self.version = self.created
+        self.position_versions = {}
+
+    # INDEX MAINTENANCE -------------------------------------------------------
+
+    def _valid_indexes(self):
+        version = self.version
+        return [index for index in self.indexes if index.version == version]
+
+    def _validate(self, indexes):
+        version = self.version
+        for index in indexes:
+            index.version = version
+
+    def _index(self, index):
+        """
+        Returns the given index after rebuilding it if it is outdated.
+        """
+
+        if index.version != self.version:
+            index.rebuild(dict.items(self))
+            index.version = self.version
+        return index
+
+    def _change(self, node, data, keys, change, *args):
+        """
+        Applies a change to the attributes with the given names (all if
+        ``None``) of a node by calling ``change`` with the given arguments,
+        keeping all valid indexes valid.
+        """
+
+        valid = self._valid_indexes()
+        affected = [index for index in valid
+                    if keys is None or not index.watched.isdisjoint(keys)]
+        for index in affected:
+            index.remove(node, data)
+        self._advance(data, keys)
+        result = change(*args)
+        self._advance(data, keys)
+        for index in affected:
+            index.insert(node, data)
+        self._validate(valid)
+        return result
+
+    def _attach(self, node, data):
+        valid = self._valid_indexes()
+        data = self._adopt(node, data)
+        dict.__setitem__(self, node, data)
+        self._advance(data)
+        for index in valid:
+            index.insert(node, data)
+        self._validate(valid)
+
+    def _detach(self, node, data):
+        valid = self._valid_indexes()
+        for index in valid:
+            index.remove(node, data)
+        self._release(node, data)
+        self._advance(data)
+        self._validate(valid)
+
+    def _get_positions(self):
+        return self._index(self._positions)
+
+    positions = property(_get_positions, None, None,
+                         "Index of all nodes by their 'position' attribute.")
+
+    def _get_position_leaves(self):
+        return self._index(self._position_leaves)
+
+    position_leaves = property(_get_position_leaves, None, None,
+                               "Index of all 'leaf' nodes by their " +
+                               "'position' attribute.")
+
+    def _get_position_ends(self):
+        return self._index(self._position_ends)
+
+    position_ends = property(_get_position_ends, None, None,
+                             "Index of all 'end' nodes by their " +
+                             "'position' attribute.")
+
+    def _get_segments(self):
+        return self._index(self._segments)
+
+    segments = property(_get_segments, None, None,
+                        "Index of all nodes by their 'segment' attribute.")
+
+    def _get_classes(self):
+        return self._index(self._classes)
+
+    classes = property(_get_classes, None, None,
+                       "Index of the packed flags of all nodes.")
+
+    # ATTRIBUTE WRITES --------------------------------------------------------
+
+    def update_node(self, node, attrs):
+        """
+        Updates the attributes of a node from a mapping, keeping the indexes
+        and versions of the map up to date.
+        """
+
+        dict.__getitem__(self, node).update(attrs)
+
+    def __reduce__(self):
+        return (self.__class__, (dict(dict.items(self)),))
+
+    # DICT INTERFACE ----------------------------------------------------------
+
+    def __setitem__(self, node, data):
+        old = dict.get(self, node)
+        if old is not None:
+            if old is data:
+                return
+            dict.__delitem__(self, node)
+            self._detach(node, old)
+        self._attach(node, data)
+
+    def __delitem__(self, node):
+        data = dict.__getitem__(self, node)
+        dict.__delitem__(self, node)
+        self._detach(node, data)
+
+    def pop(self, node, *args):
+        if node not in self:
+            return dict.pop(self, node, *args)
+        data = dict.__getitem__(self, node)
+        del self[node]
+        return data
+
+    def popitem(self):
+        node, data = dict.popitem(self)
+        self._detach(node, data)
+        return (node, data)
+
+    def setdefault(self, node, default=None):
+        if node not in self:
+            self[node] = default if default is not None else {}
+        return dict.__getitem__(self, node)
+
+    def update(self, *args, **kwargs):
+        # read other maps through their keys, as a columnar node map stores
+        # rows instead of attribute data internally
+        if args and hasattr(args[0], "keys"):
+            other = args[0]
+            args = ([(n, other[n]) for n in other.keys()],) + args[1:]
+        for node, data in dict(*args, **kwargs).items():
+            self[node] = data
+
+    def clear(self):
+        for node, data in dict.items(self):
+            self._release(node, data)
+        dict.clear(self)
+        for index in self.indexes:
+            index.clear()
+        self.touch()
+
+    # COORDINATES -------------------------------------------------------------
+
+    def coordinates(self):
+        """
+        Returns a list of all nodes in the order of the map together with an
+        array of their interleaved 'x', 'y' and 'z' attributes.
+        """
+
+        coordinates = array("d")
+        extend = coordinates.extend
+        for data in dict.values(self):
+            extend((data["x"], data["y"], data["z"]))
+        return list(dict.keys(self)), coordinates
+
+    def set_coordinates(self, nodes, coordinates):
+        """
+        Sets the 'x', 'y', 'z' and 'geo' attributes of the given nodes from a
+        sequence of interleaved coordinates.
+        """
+
+        # the attribute data reports the new 'geo' attribute to all maps
+        get = dict.__getitem__
+        for i, node in enumerate(nodes):
+            x = float(coordinates[3 * i])
+            y = float(coordinates[3 * i + 1])
+            z = float(coordinates[3 * i + 2])
+            get(self, node).update(x=x, y=y, z=z, geo=RhinoPoint3d(x, y, z))
+
+    # FILTERS -----------------------------------------------------------------
+
+    def where(self, key, value):
+        """
+        Returns a list of all nodes whose attribute ``key`` equals ``value``,
+        in the order of the map. Nodes without the attribute are skipped.
+        """
+
+        return [n for n, d in dict.items(self) if key in d and d[key] == value]
+
+    # CLASSIFICATION ----------------------------------------------------------
+
+    def node_flags(self, node):
+        """
+        Returns the packed flags integer of a node.
+        """
+
+        return self.classes.codes[node]
+
+    def flag_counts(self):
+        """
+        Returns a list of the number of nodes for every packed flags integer.
+        """
+
+        return self.classes.counts()
+
+    def stitch_class(self, node):
+        """
+        Returns the stitch class code of a node.
+        """
+
+        return _FLAG_CLASSES[self.node_flags(node)]
+
+    def flagged(self, mask):
+        """
+        Returns a list of all nodes for which any of the bits of the given
+        packed flags mask is set, in the order of the map.
+        """
+
+        codes = self.classes.codes
+        return [n for n in dict.keys(self) if codes[n] & mask]
+
+    def nodes_of_class(self, code):
+        """
+        Returns a list of all nodes of the given stitch class code, in the
+        order of the map.
+        """
+
+        table = _FLAG_CLASSES
+        codes = self.classes.codes
+        return [n for n in dict.keys(self) if table[codes[n]] == code]
+
+    def class_histogram(self):
+        """
+        Returns a list of the number of nodes for every stitch class code.
+        """
+
+        histogram = [0] * len(STITCH_CLASSES)
+        for flags, num in enumerate(self.flag_counts()):
+            histogram[_FLAG_CLASSES[flags]] += num
+        return histogram
+
+# COLUMNAR NODE STORAGE -------------------------------------------------------
+
+_COLUMN_KEYS = ("x", "y", "z", "position", "num", "leaf", "start", "end",
+                "segment", "increase", "decrease", "geo", "color")
+"""
+The node attributes set by KnitNetworkBase.node_from_point3d(), which are
+stored in columns by :class:`KnitNodeColumns`.
+"""
+
+_KEY_BITS = dict((k, 1 << i) for i, k in enumerate(_COLUMN_KEYS))
+_ALL_KEY_BITS = (1 << len(_COLUMN_KEYS)) - 1
+
+_COORDINATE_KEYS = frozenset(("x", "y", "z"))
+
+_COORDINATE_BITS = _KEY_BITS["x"] | _KEY_BITS["y"] | _KEY_BITS["z"]
+
+_DERIVED_GEO_BITS = _COORDINATE_BITS | _KEY_BITS["geo"]
+
+_INT_NONE = -2147483648
+_INT_MAX = 2147483647
+
+_DEFAULTS = {"x": 0.0, "y": 0.0, "z": 0.0}
+
+
+class _NoNode(object):
+    """
+    Marker for rows of a :class:`KnitNodeColumns` instance which are not
+    part of their node map.
+    """
+
+    __slots__ = ()
+
+    def __reduce__(self):
+        return "_NO_NODE"
+
+    def __repr__(self):
+        return "_NO_NODE"
+
+
+_NO_NODE = _NoNode()
+
+
+class KnitNodeColumns(object):
+    """
+    Struct-of-arrays storage for the attributes of the nodes of a
+    :class:`KnitColumnarNodeMap`. Every node occupies one row.
+
+    Parameters
+    ----------
+    home : :class:`KnitColumnarNodeMap`, optional
+        The node map the rows belong to.
+
+        Defaults to ``None``.
+
+    Notes
+    -----
+    Coordinates are stored in arrays of doubles, 'position' and 'num' in
+    arrays of 32-bit integers and the boolean node flags are packed into a
+    single byte per node. 'segment' and 'color' are kept in object columns
+    and 'geo' is derived from the coordinates, unless it has been set to
+    something else than the Point3d of the 'x', 'y' and 'z' attributes.
+
+    Values which don't fit their column (i.e. a 'position' which is not an
+    integer) are kept in a sparse overflow dictionary, as are all
+    attributes which are not part of the columns. Reading an attribute
+    therefore always returns exactly the value which has been written.
+
+    Rows are only ever appended, so that detached row proxies stay valid.
+    Rows of removed nodes remain as holes until the columns get rebuilt,
+    i.e. by copying the network.
+    """
+
+    def __init__(self, home=None):
+        self.home = home
+        self.nodes = []
+        self.x = array("d")
+        self.y = array("d")
+        self.z = array("d")
+        self.position = array("i")
+        self.num = array("i")
+        self.flags = array("B")
+        self.missing = array("H")
+        self.segment = []
+        self.color = []
+        self.overflow = {}
+        self.extra = {}
+        self._bind()
+
+    def _bind(self):
+        self._readers = {"x": self.x.__getitem__,
+                         "y": self.y.__getitem__,
+                         "z": self.z.__getitem__,
+                         "position": self._read_position,
+                         "num": self._read_num,
+                         "segment": self.segment.__getitem__,
+                         "geo": self._read_geo,
+                         "color": self.color.__getitem__}
+        self._writers = {"x": self._write_x,
+                         "y": self._write_y,
+                         "z": self._write_z,
+                         "position": self._write_position,
+                         "num": self._write_num,
+                         "segment": self._write_segment,
+                         "geo": self._write_geo,
+                         "color": self._write_color}
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_readers"]
+        del state["_writers"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._bind()
+
+    def __len__(self):
+        return len(self.nodes)
+
+    # COLUMN ACCESS -----------------------------------------------------------
+
+    def _read_position(self, row):
+        value = self.position[row]
+        if value == _INT_NONE:
+            return None
+        return value
+
+    def _read_num(self, row):
+        value = self.num[row]
+        if value == _INT_NONE:
+            return None
+        return value
+
+    def _read_geo(self, row):
+        return RhinoPoint3d(self.x[row], self.y[row], self.z[row])
+
+    @staticmethod
+    def _write_float(column, row, value):
+        if type(value) is float:
+            column[row] = value
+            return True
+        column[row] = 0.0
+        return False
+
+    @staticmethod
+    def _write_int(column, row, value):
+        if value is None:
+            column[row] = _INT_NONE
+            return True
+        if type(value) is int and _INT_NONE < value <= _INT_MAX:
+            column[row] = value
+            return True
+        column[row] = _INT_NONE
+        return False
+
+    def _write_x(self, row, value):
+        return self._write_float(self.x, row, value)
+
+    def _write_y(self, row, value):
+        return self._write_float(self.y, row, value)
+
+    def _write_z(self, row, value):
+        return self._write_float(self.z, row, value)
+
+    def _write_position(self, row, value):
+        return self._write_int(self.position, row, value)
+
+    def _write_num(self, row, value):
+        return self._write_int(self.num, row, value)
+
+    def _write_flag(self, row, bit, value):
+        if value is True:
+            self.flags[row] |= bit
+            return True
+        self.flags[row] &= ~bit
+        return value is False
+
+    def _write_segment(self, row, value):
+        self.segment[row] = value
+        return True
+
+    def _write_color(self, row, value):
+        self.color[row] = value
+        return True
+
+    def _write_geo(self, row, value):
+        # the 'geo' attribute is only derived from the coordinates if it
+        # equals the point they describe
+        if type(value) is not RhinoPoint3d:
+            return False
+        if self.missing[row] & 7:
+            return False
+        overflow = self.overflow
+        for key in ("x", "y", "z"):
+            if row in overflow.get(key, ()):
+                return False
+        return (value.X == self.x[row] and
+                value.Y == self.y[row] and
+                value.Z == self.z[row])
+
+    def _is_derived_geo(self, row):
+        if self.missing[row] & _KEY_BITS["geo"]:
+            return False
+        return row not in self.overflow.get("geo", ())
+
+    def _pin_geo(self, row):
+        # store a derived 'geo' attribute explicitly before the coordinates
+        # it is derived from change
+        if self._is_derived_geo(row):
+            self.overflow.setdefault("geo", {})[row] = self._read_geo(row)
+
+    def move(self, row, x, y, z):
+        """
+        Sets the coordinates of a row whose 'geo' attribute is derived from
+        them, which keeps it derived. Returns ``False`` without changing the
+        row if the 'geo' attribute is not derived.
+        """
+
+        if self.missing[row] & _DERIVED_GEO_BITS:
+            return False
+        overflow = self.overflow
+        if overflow:
+            for key in ("x", "y", "z", "geo"):
+                if row in overflow.get(key, ()):
+                    return False
+        self.x[row] = x
+        self.y[row] = y
+        self.z[row] = z
+        return True
+
+    # ROW ACCESS --------------------------------------------------------------
+
+    def get(self, row, key):
+        """
+        Returns the value of an attribute of a row. Raises a KeyError if the
+        row has no such attribute.
+        """
+
+        bit = _KEY_BITS.get(key)
+        if bit is None:
+            extra = self.extra.get(row)
+            if extra is None:
+                raise KeyError(key)
+            return extra[key]
+        if self.missing[row] & bit:
+            raise KeyError(key)
+        if self.overflow:
+            values = self.overflow.get(key)
+            if values and row in values:
+                return values[row]
+        flag = _FLAG_BITS.get(key)
+        if flag is not None:
+            return (self.flags[row] & flag) != 0
+        return self._readers[key](row)
+
+    def has(self, row, key):
+        """
+        Checks if a row has an attribute.
+        """
+
+        bit = _KEY_BITS.get(key)
+        if bit is None:
+            extra = self.extra.get(row)
+            return extra is not None and key in extra
+        return not self.missing[row] & bit
+
+    def value(self, row, key, default=None):
+        """
+        Returns the value of an attribute of a row, or the given default if
+        the row has no such attribute.
+        """
+
+        if not self.has(row, key):
+            return default
+        return self.get(row, key)
+
+    def set(self, row, key, value):
+        """
+        Sets the value of an attribute of a row.
+        """
+
+        bit = _KEY_BITS.get(key)
+        if bit is None:
+            extra = self.extra.get(row)
+            if extra is None:
+                self.extra[row] = {key: value}
+            else:
+                extra[key] = value
+            return
+        if key in _COORDINATE_KEYS:
+            self._pin_geo(row)
+        flag = _FLAG_BITS.get(key)
+        if flag is not None:
+            fits = self._write_flag(row, flag, value)
+        else:
+            fits = self._writers[key](row, value)
+        self.missing[row] &= ~bit
+        if fits:
+            values = self.overflow.get(key)
+            if values:
+                values.pop(row, None)
+                if not values:
+                    del self.overflow[key]
+        else:
+            self.overflow.setdefault(key, {})[row] = value
+
+    def delete(self, row, key):
+        """
+        Deletes an attribute of a row. Raises a KeyError if the row has no
+        such attribute.
+        """
+
+        bit = _KEY_BITS.get(key)
+        if bit is None:
+            extra = self.extra.get(row)
+            if extra is None:
+                raise KeyError(key)
+            del extra[key]
+            if not extra:
+                del self.extra[row]
+            return
+        if self.missing[row] & bit:
+            raise KeyError(key)
+        if key in _COORDINATE_KEYS:
+            self._pin_geo(row)
+        flag = _FLAG_BITS.get(key)
+        if flag is not None:
+            self._write_flag(row, flag, False)
+        else:
+            self._writers[key](row, _DEFAULTS.get(key))
+        self.missing[row] |= bit
+        values = self.overflow.get(key)
+        if values:
+            values.pop(row, None)
+            if not values:
+                del self.overflow[key]
+
+    def keys(self, row):
+        """
+        Returns a list of the attributes of a row.
+        """
+
+        missing = self.missing[row]
+        keys = [k for k in _COLUMN_KEYS if not missing & _KEY_BITS[k]]
+        extra = self.extra.get(row)
+        if extra:
+            keys.extend(extra.keys())
+        return keys
+
+    def to_dict(self, row):
+        """
+        Returns the attributes of a row as a new :obj:`dict`.
+        """
+
+        return dict([(k, self.get(row, k)) for k in self.keys(row)])
+
+    # ROW ALLOCATION ----------------------------------------------------------
+
+    def append(self, data=None):
+        """
+        Appends a new row, loads it with the attributes of the given mapping
+        and returns its index.
+        """
+
+        row = len(self.nodes)
+        self.nodes.append(_NO_NODE)
+        self.x.append(0.0)
+        self.y.append(0.0)
+        self.z.append(0.0)
+        self.position.append(_INT_NONE)
+        self.num.append(_INT_NONE)
+        self.flags.append(0)
+        self.missing.append(_ALL_KEY_BITS)
+        self.segment.append(None)
+        self.color.append(None)
+        if data:
+            self.load(row, data)
+        return row
+
+    def reset(self, row, data=None):
+        """
+        Removes all attributes of a row and loads it with the attributes of
+        the given mapping.
+        """
+
+        for key in self.keys(row):
+            self.delete(row, key)
+        if data:
+            self.load(row, data)
+        return row
+
+    def load(self, row, data):
+        """
+        Sets the attributes of a row from a mapping.
+        """
+
+        # coordinates get written before 'geo', so that it can be derived
+        for key in _COLUMN_KEYS:
+            if key in data:
+                self.set(row, key, data[key])
+        for key in data.keys():
+            if key not in _KEY_BITS:
+                self.set(row, key, data[key])
+
+    # FILTERS -----------------------------------------------------------------
+
+    def _column_matches(self, key, value):
+        n = len(self.nodes)
+        flag = _FLAG_BITS.get(key)
+        if flag is not None:
+            if value == True:
+                return compress(range(n), map(and_, self.flags,
+                                              repeat(flag)))
+            elif value == False:
+                return compress(range(n), map(not_, map(and_, self.flags,
+                                                        repeat(flag))))
+            return ()
+        if key == "position" or key == "num":
+            column = getattr(self, key)
+            if value is None:
+                return compress(range(n), map(eq, column,
+                                              repeat(_INT_NONE)))
+            elif value == _INT_NONE:
+                return ()
+            return compress(range(n), map(eq, column, repeat(value)))
+        if key == "geo":
+            bit = _KEY_BITS["geo"]
+            get = self.get
+            return [r for r in range(n) if not self.missing[r] & bit and
+                    get(r, "geo") == value]
+        return compress(range(n), map(eq, getattr(self, key),
+                                      repeat(value)))
+
+    def rows_where(self, key, value):
+        """
+        Returns an ordered list of the rows of all nodes of the map whose
+        attribute ``key`` equals ``value``.
+        """
+
+        nodes = self.nodes
+        bit = _KEY_BITS.get(key)
+        if bit is None:
+            rows = [r for r, extra in self.extra.items()
+                    if key in extra and extra[key] == value and
+                    nodes[r] is not _NO_NODE]
+            rows.sort()
+            return rows
+        missing = self.missing
+        values = self.overflow.get(key, {})
+        rows = [r for r in self._column_matches(key, value)
+                if not missing[r] & bit and
+                nodes[r] is not _NO_NODE and
+                r not in values]
+        extra = [r for r, v in values.items()
+                 if v == value and nodes[r] is not _NO_NODE]
+        if extra:
+            rows.extend(extra)
+            rows.sort()
+        return rows
+
+    def flag_code(self, row):
+        """
+        Returns the packed flags integer of a row.
+        """
+
+        flags = self.flags[row]
+        if self.overflow:
+            for flag in NODE_FLAGS:
+                values = self.overflow.get(flag)
+                if values and values.get(row, False):
+                    flags |= _FLAG_BITS[flag]
+        return flags
+
+    def packed_flags(self):
+        """
+        Returns a new array of the packed flags integers of all rows.
+        """
+
+        packed = array("B", self.flags)
+        for flag in NODE_FLAGS:
+            values = self.overflow.get(flag)
+            if values:
+                bit = _FLAG_BITS[flag]
+                for row, value in values.items():
+                    if value:
+                        packed[row] |= bit
+        return packed
+
+
+class RowOrderIndex(NodeOrderIndex):
+    """
+    Variant of :class:`NodeOrderIndex` for a :class:`KnitColumnarNodeMap`,
+    which stores the rows of the nodes in arrays instead of the nodes and
+    reads all attribute values from the columns.
+
+    Parameters
+    ----------
+    columns : :class:`KnitNodeColumns`
+        The columns holding the attributes of the rows.
+
+    key : str
+        The attribute whose value the rows get grouped by.
+
+    flag : str, optional
+        If given, only rows for which this attribute evaluates to ``True``
+        are part of the index.
+
+        Defaults to ``None``.
+
+    skip_none : bool, optional
+        If ``True``, rows whose key attribute is ``None`` are not part of
+        the index.
+
+        Defaults to ``False``.
+
+    Notes
+    -----
+    Every group holds an array of the rows without 'num' value and an array
+    of all other rows ordered by their 'num' value. All methods take rows
+    instead of attribute data.
+    """
+
+    __slots__ = ("columns",)
+
+    def __init__(self, columns, key, flag=None, skip_none=False):
+        NodeOrderIndex.__init__(self, key, flag, skip_none)
+        self.columns = columns
+
+    def _is_member(self, row):
+        columns = self.columns
+        if not columns.has(row, self.key):
+            return False
+        if self.skip_none and columns.get(row, self.key) is None:
+            return False
+        if self.flag is not None and not columns.value(row, self.flag):
+            return False
+        return True
+
+    def insert(self, node, row):
+        """
+        Inserts the row of a node into the index, based on its current
+        attribute values.
+        """
+
+        if not self._is_member(row):
+            return
+        columns = self.columns
+        value = columns.get(row, self.key)
+        group = self._groups.get(value)
+        if group is None:
+            group = (array("i"), array("i"))
+            self._groups[value] = group
+        num = columns.value(row, "num")
+        if num is None:
+            group[0].append(row)
+            return
+        # insert after all rows with an equal 'num' value
+        rows = group[1]
+        lo = 0
+        hi = len(rows)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if num < columns.value(rows[mid], "num"):
+                hi = mid
+            else:
+                lo = mid + 1
+        rows.insert(lo, row)
+
+    def remove(self, node, row):
+        """
+        Removes the row of a node from the index, based on its current
+        attribute values.
+        """
+
+        if not self._is_member(row):
+            return
+        value = self.columns.get(row, self.key)
+        group = self._groups.get(value)
+        if group is None:
+            return
+        for rows in group:
+            if row in rows:
+                rows.remove(row)
+                break
+        if not group[0] and not group[1]:
+            del self._groups[value]
+
+    def rebuild(self, items):
+        """
+        Rebuilds the whole index from an iterable of (node, row) tuples.
+        """
+
+        columns = self.columns
+        key = self.key
+        groups = {}
+        for node, row in items:
+            if not self._is_member(row):
+                continue
+            value = columns.get(row, key)
+            group = groups.get(value)
+            if group is None:
+                group = ([], [])
+                groups[value] = group
+            if columns.value(row, "num") is None:
+                group[0].append(row)
+            else:
+                group[1].append(row)
+        for value, (nones, rows) in groups.items():
+            # the sort is stable, so rows with equal 'num' values keep the
+            # order of the items
+            rows.sort(key=lambda r: columns.get(r, "num"))
+            groups[value] = (array("i", nones), array("i", rows))
+        self._groups = groups
+
+    def nodes(self, value):
+        """
+        Returns a new list of all nodes in the group of the given value,
+        ordered by their 'num' attribute.
+        """
+
+        group = self._groups.get(value)
+        if group is None:
+            return []
+        nodes = self.columns.nodes
+        return [nodes[r] for r in group[0]] + [nodes[r] for r in group[1]]
+
+    def count(self, value):
+        """
+        Returns the number of nodes in the group of the given value.
+        """
+
+        group = self._groups.get(value)
+        if group is None:
+            return 0
+        return len(group[0]) + len(group[1])
+
+
+class KnitNodeRow(object):
+    """
+    Attribute dictionary of a single node whose attributes are stored in the
+    rows of a :class:`KnitNodeColumns` instance.
+
+    Supports the same mapping interface as a :obj:`dict`, so that
+    ``network.node[n]["x"]`` works regardless of the storage.
+
+    Parameters
+    ----------
+    columns : :class:`KnitNodeColumns`
+        The columns holding the attributes.
+
+    row : int
+        The row of the node inside of the columns.
+
+    Notes
+    -----
+    Writes are reported to the node map of the columns, as long as the row
+    belongs to one of its nodes.
+    """
+
+    __slots__ = ("_columns", "_row")
+
+    __hash__ = None
+
+    def __init__(self, columns, row):
+        self._columns = columns
+        self._row = row
+
+    def _write(self, key, write, *args):
+        columns = self._columns
+        row = self._row
+        node = columns.nodes[row]
+        if node is _NO_NODE:
+            return write(*args)
+        keys = None if key is None else (key,)
+        return columns.home._change(node, row, keys, write, *args)
+
+    # MAPPING INTERFACE -------------------------------------------------------
+
+    def __getitem__(self, key):
+        return self._columns.get(self._row, key)
+
+    def __setitem__(self, key, value):
+        self._write(key, self._columns.set, self._row, key, value)
+
+    def __delitem__(self, key):
+        self._write(key, self._columns.delete, self._row, key)
+
+    def __contains__(self, key):
+        return self._columns.has(self._row, key)
+
+    has_key = __contains__
+
+    def __iter__(self):
+        return iter(self._columns.keys(self._row))
+
+    def __len__(self):
+        return len(self._columns.keys(self._row))
+
+    def __eq__(self, other):
+        if isinstance(other, KnitNodeRow):
+            other = other.copy()
+        return self.copy() == other
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return repr(self.copy())
+
+    def get(self, key, default=None):
+        try:
+            return self._columns.get(self._row, key)
+        except KeyError:
+            return default
+
+    def keys(self):
+        return self._columns.keys(self._row)
+
+    def values(self):
+        get = self._columns.get
+        row = self._row
+        return [get(row, k) for k in self._columns.keys(row)]
+
+    def items(self):
+        get = self._columns.get
+        row = self._row
+        return [(k, get(row, k)) for k in self._columns.keys(row)]
+
+    def copy(self):
+        return self._columns.to_dict(self._row)
+
+    def update(self, *args, **kwargs):
+        values = dict(*args, **kwargs)
+        if not values:
+            return
+        self._write(None, self._columns.load, self._row, values)
+
+    def setdefault(self, key, default=None):
+        if key in self:
+            return self[key]
+        self[key] = default
+        return default
+
+    def pop(self, key, *args):
+        if key not in self:
+            if args:
+                return args[0]
+            raise KeyError(key)
+        value = self[key]
+        del self[key]
+        return value
+
+    def popitem(self):
+        keys = self.keys()
+        if not keys:
+            raise KeyError("popitem(): dictionary is empty")
+        key = keys[-1]
+        return (key, self.pop(key))
+
+    def clear(self):
+        self._write(None, self._columns.reset, self._row)
+
+
+def attribute_id(data):
+    """
+    Returns an identifier of the attribute data of a node or edge, which
+    stays the same for all :class:`KnitNodeRow` proxies of the same row.
+    """
+
+    if isinstance(data, KnitNodeRow):
+        return (id(data._columns), data._row)
+    return id(data)
+
+
+class KnitColumnarNodeMap(KnitNodeMap):
+    """
+    Node dictionary of a KnitNetworkBase which stores the node attributes
+    in a :class:`KnitNodeColumns` instance.
+
+    Parameters
+    ----------
+    data : :obj:`dict`, optional
+        Mapping of nodes to attribute dictionaries to initialize the map with.
+
+    Notes
+    -----
+    Internally, every node is mapped to its row inside of the columns. A
+    :class:`KnitNodeRow` proxy is only created when the attributes of a
+    node are accessed, i.e. by ``network.node[n]`` or by iterating over the
+    items of the map. Proxies are views of the row of a node, so all
+    proxies of the same node see the same attributes.
+
+    All attribute data is copied into the columns on insertion. Attribute
+    data which was shared with another network before is therefore no
+    longer shared. Proxies of this map are shared with other networks
+    without copying.
+
+    The indexes of the map store rows in arrays instead of nodes, so that
+    neither the map nor its indexes hold any objects per node.
+
+    The rows of the nodes are kept in the iteration order of the map, which
+    makes it possible to answer attribute filters directly from the
+    columns.
+    """
+
+    def __init__(self, data=None):
+        self.columns = KnitNodeColumns(self)
+        KnitNodeMap.__init__(self, data)
+
+    def _create_indexes(self):
+        columns = self.columns
+        self._positions = RowOrderIndex(columns, "position")
+        self._position_leaves = RowOrderIndex(columns, "position", "leaf")
+        self._position_ends = RowOrderIndex(columns, "position", "end")
+        self._segments = RowOrderIndex(columns, "segment", skip_none=True)
+        self._classes = None
+        self.indexes = (self._positions,
+                        self._position_leaves,
+                        self._position_ends,
+                        self._segments)
+
+    def _position_of(self, row):
+        return self.columns.value(row, "position")
+
+    def _adopt(self, node, data):
+        """
+        Copies the given attribute data into a new last row and returns the
+        row.
+        """
+
+        if isinstance(data, KnitNodeRow):
+            data = data.copy()
+        row = self.columns.append(data)
+        self.columns.nodes[row] = node
+        # integer nodes usually equal their row, in which case the node
+        # object itself is stored instead of a new integer
+        if type(node) is int and node == row:
+            return node
+        return row
+
+    def _release(self, node, row):
+        self.columns.nodes[row] = _NO_NODE
+
+    def _rename(self, node, row):
+        return row
+
+    def _relabel(self, mapping):
+        KnitNodeMap._relabel(self, mapping)
+        nodes = self.columns.nodes
+        for node, row in dict.items(self):
+            nodes[row] = node
+
+    # ATTRIBUTE WRITES --------------------------------------------------------
+
+    def update_node(self, node, attrs):
+        """
+        Updates the attributes of a node from a mapping, keeping the indexes
+        and versions of the map up to date.
+        """
+
+        row = dict.__getitem__(self, node)
+        self._change(node, row, list(attrs.keys()), self.columns.load, row,
+                     attrs)
+
+    # DICT INTERFACE ----------------------------------------------------------
+
+    def __getitem__(self, node):
+        return KnitNodeRow(self.columns, dict.__getitem__(self, node))
+
+    def __iter__(self):
+        # under Python 3, overriding iteration makes dict() and dict.update()
+        # read the map through __getitem__ instead of copying the rows
+        return dict.__iter__(self)
+
+    def get(self, node, default=None):
+        row = dict.get(self, node)
+        if row is None:
+            return default
+        return KnitNodeRow(self.columns, row)
+
+    def items(self):
+        columns = self.columns
+        return [(node, KnitNodeRow(columns, row))
+                for node, row in dict.items(self)]
+
+    def values(self):
+        columns = self.columns
+        return [KnitNodeRow(columns, row) for row in dict.values(self)]
+
+    if hasattr(dict, "iteritems"):
+        def iteritems(self):
+            columns = self.columns
+            return ((node, KnitNodeRow(columns, row))
+                    for node, row in dict.iteritems(self))
+
+        def itervalues(self):
+            columns = self.columns
+            return (KnitNodeRow(columns, row)
+                    for row in dict.itervalues(self))
+
+    def copy(self):
+        return dict(self.items())
+
+    def __setitem__(self, node, data):
+        row = dict.get(self, node)
+        if row is None:
+            KnitNodeMap.__setitem__(self, node, data)
+            return
+        columns = self.columns
+        if isinstance(data, KnitNodeRow):
+            if data._columns is columns and data._row == row:
+                return
+            data = data.copy()
+        # the new attributes replace the old ones in the row of the node,
+        # which keeps the rows in the order of the map
+        self._change(node, row, None, columns.reset, row, data)
+
+    def pop(self, node, *args):
+        if node not in self:
+            return dict.pop(self, node, *args)
+        data = self[node]
+        del self[node]
+        return data
+
+    def popitem(self):
+        node, row = dict.popitem(self)
+        self._detach(node, row)
+        return (node, KnitNodeRow(self.columns, row))
+
+    def setdefault(self, node, default=None):
+        if node not in self:
+            self[node] = default if default is not None else {}
+        return self[node]
+
+    def clear(self):
+        KnitNodeMap.clear(self)
+        self.columns = KnitNodeColumns(self)
+        self._create_indexes()
+
+    def __eq__(self, other):
+        return dict(self.items()) == other
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+    def __reduce__(self):
+        data = dict([(node, d.copy()) for node, d in self.items()])
+        return (self.__class__, (data,))
+
+    # COORDINATES -------------------------------------------------------------
+
+    def coordinates(self):
+        """
+        Returns a list of all nodes in the order of the map together with an
+        array of their interleaved 'x', 'y' and 'z' attributes.
+        """
+
+        columns = self.columns
+        n = len(columns)
+        if (n != len(self) or
+                any(map(and_, columns.missing, repeat(_COORDINATE_BITS))) or
+                any(k in columns.overflow for k in ("x", "y", "z"))):
+            coordinates = array("d")
+            extend = coordinates.extend
+            get = columns.get
+            for row in dict.values(self):
+                extend((get(row, "x"), get(row, "y"), get(row, "z")))
+            return list(dict.keys(self)), coordinates
+        # the rows are in the order of the map and without gaps, so the
+        # columns can be interleaved directly
+        coordinates = array("d", [0.0]) * (3 * n)
+        coordinates[0::3] = columns.x
+        coordinates[1::3] = columns.y
+        coordinates[2::3] = columns.z
+        return list(columns.nodes), coordinates
+
+    def set_coordinates(self, nodes, coordinates):
+        """
+        Sets the 'x', 'y', 'z' and 'geo' attributes of the given nodes from a
+        sequence of interleaved coordinates.
+        """
+
+        columns = self.columns
+        move = columns.move
+        load = columns.load
+        value = columns.value
+        valid = self._valid_indexes()
+        version = next(_VERSIONS)
+        self.version = version
+        position_versions = self.position_versions
+        get = dict.__getitem__
+        for i, node in enumerate(nodes):
+            row = get(self, node)
+            x = float(coordinates[3 * i])
+            y = float(coordinates[3 * i + 1])
+            z = float(coordinates[3 * i + 2])
+            # rows with an independent 'geo' attribute get it replaced
+            if not move(row, x, y, z):
+                load(row, {"x": x, "y": y, "z": z,
+                           "geo": RhinoPoint3d(x, y, z)})
+            position_versions[value(row, "position")] = version
+        self._validate(valid)
+
+    # FILTERS -----------------------------------------------------------------
+
+    def where(self, key, value):
+        """
+        Returns a list of all nodes whose attribute ``key`` equals ``value``,
+        in the order of the map. Nodes without the attribute are skipped.
+
+        Evaluated on the columns instead of the attribute proxies.
+        """
+
+        nodes = self.columns.nodes
+        return [nodes[r] for r in self.columns.rows_where(key, value)]
+
+    # CLASSIFICATION ----------------------------------------------------------
+
+    def node_flags(self, node):
+        """
+        Returns the packed flags integer of a node.
+        """
+
+        return self.columns.flag_code(dict.__getitem__(self, node))
+
+    def flag_counts(self):
+        """
+        Returns a list of the number of nodes for every packed flags integer.
+        """
+
+        columns = self.columns
+        live = compress(columns.packed_flags(),
+                        map(is_not, columns.nodes, repeat(_NO_NODE)))
+        counts = [0] * len(_FLAG_CLASSES)
+        for flags, num in Counter(live).items():
+            counts[flags] = num
+        return counts
+
+    def flagged(self, mask):
+        """
+        Returns a list of all nodes for which any of the bits of the given
+        packed flags mask is set, in the order of the map.
+        """
+
+        columns = self.columns
+        nodes = columns.nodes
+        hits = map(and_, columns.packed_flags(), repeat(mask))
+        rows = compress(range(len(nodes)), hits)
+        return [nodes[r] for r in rows if nodes[r] is not _NO_NODE]
+
+    def nodes_of_class(self, code):
+        """
+        Returns a list of all nodes of the given stitch class code, in the
+        order of the map.
+        """
+
+        columns = self.columns
+        nodes = columns.nodes
+        classes = map(_FLAG_CLASSES.__getitem__, columns.packed_flags())
+        rows = compress(range(len(nodes)), map(eq, classes, repeat(code)))
+        return [nodes[r] for r in rows if nodes[r] is not _NO_NODE]
+
+# EDGE INDEXES ----------------------------------------------------------------
+
+
+def _is_segment_contour(data):
+    """
+    Checks if edge data belongs to an edge marked neither 'weft' nor 'warp'
+    with a 'segment' attribute assigned to it.
+    """
+
+    return (not data.get("weft", False) and
+            not data.get("warp", False) and
+            bool(data.get("segment", None)))
+
+
+def _edge_kind(data):
+    """
+    Classifies edge data as 'weft', 'warp', 'contour' (marked neither 'weft'
+    nor 'warp') or 'both' (marked 'weft' and 'warp').
+    """
+
+    if data.get("weft", False):
+        if data.get("warp", False):
+            return "both"
+        return "weft"
+    elif data.get("warp", False):
+        return "warp"
+    return "contour"
+
+
+class EdgeGroupIndex(object):
+    """
+    Index of edges grouped by a value derived from their attribute data.
+
+    Parameters
+    ----------
+    group_by : callable
+        Function returning the group value for the attribute data of an edge.
+
+    member : callable
+        Function deciding if an edge is part of the index, based on its
+        attribute data.
+
+    Notes
+    -----
+    Edges are identified by the (u, v, key) 3-tuples under which they were
+    registered. The order of the edges inside of a group is arbitrary.
+    """
+
+    __slots__ = ("group_by", "member", "_groups", "_size")
+
+    def __init__(self, group_by, member):
+        self.group_by = group_by
+        self.member = member
+        self._groups = {}
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def clear(self):
+        self._groups = {}
+        self._size = 0
+
+    def insert(self, ident, data):
+        if not self.member(data):
+            return
+        value = self.group_by(data)
+        group = self._groups.get(value)
+        if group is None:
+            self._groups[value] = {ident: data}
+        elif ident not in group:
+            group[ident] = data
+        else:
+            return
+        self._size += 1
+
+    def remove(self, ident, data):
+        if not self.member(data):
+            return
+        value = self.group_by(data)
+        group = self._groups.get(value)
+        if group is None or group.pop(ident, None) is None:
+            return
+        self._size -= 1
+        if not group:
+            del self._groups[value]
+
+    def edges(self, value):
+        """
+        Returns a list of (u, v, key, data) 4-tuples of all edges in the group
+        of the given value.
+        """
+
+        group = self._groups.get(value)
+        if group is None:
+            return []
+        return [(i[0], i[1], i[2], d) for i, d in group.items()]
+
+    def values(self):
+        """
+        Returns the sorted values of all non-empty groups.
+        """
+
+        values = list(self._groups.keys())
+        values.sort()
+        return values
+
+    def count(self, value):
+        group = self._groups.get(value)
+        if group is None:
+            return 0
+        return len(group)
+
+# EDGE STORE ------------------------------------------------------------------
+
+
+class KnitEdgeStore(object):
+    """
+    Edge counts and indexes of a KnitNetworkBase. Edge attribute dictionaries
+    are converted to :class:`KnitEdgeData` instances on insertion and
+    registered under a (u, v, key) identifier, where key is ``None`` for
+    non-multigraphs.
+
+    Parameters
+    ----------
+    multigraph : bool, optional
+        If ``True``, adjacency values are treated as key dictionaries of a
+        MultiGraph.
+
+        Defaults to ``False``.
+
+    directed : bool, optional
+        If ``True``, the store belongs to a directed network.
+
+        Defaults to ``False``.
+
+    Notes
+    -----
+    The store keeps the number of edges of every kind and an index of the
+    segment contour edges by their 'segment' attribute, but no listing of
+    the edges themselves. Edges of a kind are listed by filtering the
+    adjacency instead, so they come in the order of NetworkX'
+    ``edges_iter``. Under Python 2 and IronPython this order follows the
+    hashes of the nodes, not the order of insertion.
+    """
+
+    def __init__(self, multigraph=False, directed=False):
+        self.multigraph = multigraph
+        self.directed = directed
+        self.kinds = {"contour": 0, "weft": 0, "warp": 0, "both": 0}
+        self.segment_contours = EdgeGroupIndex(lambda d: d["segment"],
+                                               _is_segment_contour)
+        self._converted = (None, None)
+
+    # INDEX MAINTENANCE -------------------------------------------------------
+
+    def _unindex(self, ident, data):
+        self.kinds[_edge_kind(data)] -= 1
+        self.segment_contours.remove(ident, data)
+
+    def _index(self, ident, data):
+        self.kinds[_edge_kind(data)] += 1
+        self.segment_contours.insert(ident, data)
+
+    def count(self, kind):
+        """
+        Returns the number of registered edges of a kind ('contour', 'weft',
+        'warp' or 'both').
+        """
+
+        return self.kinds.get(kind, 0)
+
+    # REGISTRATION ------------------------------------------------------------
+
+    def convert(self, data, factory=KnitEdgeData):
+        """
+        Converts a container to the given factory type. Converting the same
+        plain container twice in a row returns the same result, which keeps
+        the data shared between the two adjacency entries of an edge.
+        """
+
+        if isinstance(data, factory):
+            if factory is not KnitKeyDict or data._store is self:
+                return data
+        if self._converted[0] is data:
+            return self._converted[1]
+        if factory is KnitKeyDict:
+            converted = KnitKeyDict(self)
+            for key, edata in data.items():
+                dict.__setitem__(converted, key, self.convert(edata))
+        else:
+            converted = factory(data)
+        self._converted = (data, converted)
+        return converted
+
+    def register(self, u, v, key, data):
+        """
+        Registers the attribute data of an edge, if it is not yet registered.
+        """
+
+        ident = (u, v, key)
+        if data._store is None:
+            data._store = self
+            data._u = u
+            data._v = v
+            data._key = key
+        elif data._store is self:
+            return
+        elif data._shared is None:
+            data._shared = [(self, ident)]
+        else:
+            for store, sident in data._shared:
+                if store is self:
+                    return
+            data._shared.append((self, ident))
+        self._index(ident, data)
+
+    def release(self, data):
+        """
+        Releases the attribute data of an edge, if it is registered.
+        """
+
+        shared = data._shared
+        if data._store is self:
+            ident = (data._u, data._v, data._key)
+            if shared is None:
+                data._store = None
+                data._u = data._v = data._key = None
+            else:
+                data._store, (data._u, data._v, data._key) = shared.pop(0)
+                if not shared:
+                    data._shared = None
+        elif shared is not None:
+            for i, (store, ident) in enumerate(shared):
+                if store is self:
+                    break
+            else:
+                return
+            del shared[i]
+            if not shared:
+                data._shared = None
+        else:
+            return
+        self._unindex(ident, data)
+
+    def register_slot(self, u, v, value):
+        if self.multigraph:
+            if value._u is None:
+                value._u = u
+                value._v = v
+            for key, data in value.items():
+                self.register(value._u, value._v, key, data)
+        else:
+            self.register(u, v, None, value)
+
+    def release_slot(self, value):
+        if self.multigraph:
+            for data in value.values():
+                self.release(data)
+        else:
+            self.release(value)
+
+    def clear(self):
+        """
+        Resets all counts and indexes. Registered edges have to be released
+        by their adjacency beforehand.
+        """
+
+        for kind in self.kinds:
+            self.kinds[kind] = 0
+        self.segment_contours.clear()
+        self._converted = (None, None)
+
+# ADJACENCY CONTAINERS --------------------------------------------------------
+
+
+class KnitKeyDict(dict):
+    """
+    Key dictionary of a MultiGraph edge, mapping edge keys to their
+    :class:`KnitEdgeData` attribute dictionaries.
+    """
+
+    __slots__ = ("_store", "_u", "_v")
+
+    def __init__(self, store):
+        dict.__init__(self)
+        self._store = store
+        self._u = None
+        self._v = None
+
+    def __setitem__(self, key, data):
+        store = self._store
+        data = store.convert(data)
+        old = dict.get(self, key)
+        if old is not None and old is not data:
+            store.release(old)
+        dict.__setitem__(self, key, data)
+        if self._u is not None:
+            store.register(self._u, self._v, key, data)
+
+    def __delitem__(self, key):
+        data = dict.__getitem__(self, key)
+        dict.__delitem__(self, key)
+        self._store.release(data)
+
+    def pop(self, key, *args):
+        if key not in self:
+            return dict.pop(self, key, *args)
+        data = dict.__getitem__(self, key)
+        del self[key]
+        return data
+
+    def popitem(self):
+        key, data = dict.popitem(self)
+        self._store.release(data)
+        return (key, data)
+
+    def clear(self):
+        for data in dict.values(self):
+            self._store.release(data)
+        dict.clear(self)
+
+
+class KnitNeighborDict(dict):
+    """
+    Neighbor dictionary of a single node, mapping neighbors to the attribute
+    data (or key dictionaries for MultiGraphs) of the connecting edges.
+
+    Parameters
+    ----------
+    store : :class:`KnitEdgeStore`
+        The edge store of the network.
+
+    node : hashable
+        The node this neighbor dictionary belongs to.
+
+    register : bool
+        If ``False``, edges are only converted but not registered (used for
+        the predecessor dictionaries of a DiGraph).
+    """
+
+    __slots__ = ("_store", "_node", "_register")
+
+    def __init__(self, store, node, register=True):
+        dict.__init__(self)
+        self._store = store
+        self._node = node
+        self._register = register
+
+    def __setitem__(self, nbr, value):
+        store = self._store
+        if store.multigraph:
+            value = store.convert(value, KnitKeyDict)
+        else:
+            value = store.convert(value)
+        old = dict.get(self, nbr)
+        if self._register and old is not None and old is not value:
+            store.release_slot(old)
+        dict.__setitem__(self, nbr, value)
+        if self._register:
+            store.register_slot(self._node, nbr, value)
+
+    def __delitem__(self, nbr):
+        value = dict.__getitem__(self, nbr)
+        dict.__delitem__(self, nbr)
+        if self._register:
+            self._store.release_slot(value)
+
+    def pop(self, nbr, *args):
+        if nbr not in self:
+            return dict.pop(self, nbr, *args)
+        value = dict.__getitem__(self, nbr)
+        del self[nbr]
+        return value
+
+    def popitem(self):
+        nbr, value = dict.popitem(self)
+        if self._register:
+            self._store.release_slot(value)
+        return (nbr, value)
+
+    def clear(self):
+        if self._register:
+            for value in dict.values(self):
+                self._store.release_slot(value)
+        dict.clear(self)
+
+
+class KnitAdjacencyMap(dict):
+    """
+    Adjacency dictionary of a KnitNetworkBase, mapping nodes to their
+    :class:`KnitNeighborDict` neighbor dictionaries.
+
+    Parameters
+    ----------
+    store : :class:`KnitEdgeStore`
+        The edge store of the network.
+
+    register : bool, optional
+        If ``False``, edges are only converted but not registered (used for
+        the predecessor dictionary of a DiGraph).
+
+        Defaults to ``True``.
+
+    data : :obj:`dict`, optional
+        Adjacency dictionary to initialize the map with.
+
+    Notes
+    -----
+    Just like the node dictionary, the adjacency is only ever modified by
+    NetworkX through item assignment, item deletion and ``clear()`` on the
+    outer and inner dictionaries, which makes it possible to keep the edge
+    store in sync for Graphs, DiGraphs and MultiGraphs alike.
+    """
+
+    def __init__(self, store, register=True, data=None):
+        dict.__init__(self)
+        self._store = store
+        self._register = register
+        if data:
+            for node, nbrs in data.items():
+                self[node] = nbrs
+
+    def __setitem__(self, node, nbrs):
+        old = dict.get(self, node)
+        if old is not None:
+            if old is nbrs:
+                return
+            old.clear()
+        nbrdict = KnitNeighborDict(self._store, node, self._register)
+        dict.__setitem__(self, node, nbrdict)
+        for nbr, value in nbrs.items():
+            nbrdict[nbr] = value
+
+    def _relabel(self, mapping):
+        """
+        Replaces every node of the map and of its neighbor dictionaries by
+        the node it is mapped to, keeping the edge data.
+        """
+
+        store = self._store
+        register = self._register
+        items = [(mapping[node], [(mapping[nbr], value)
+                                  for nbr, value in dict.items(nbrs)])
+                 for node, nbrs in dict.items(self)]
+        if register:
+            self._release()
+            store.clear()
+            if store.multigraph:
+                for node, nbrs in items:
+                    for nbr, value in nbrs:
+                        value._u = value._v = None
+        dict.clear(self)
+        for node, nbrs in items:
+            dict.__setitem__(self, node, KnitNeighborDict(store, node,
+                                                          register))
+        for node, nbrs in items:
+            nbrdict = dict.__getitem__(self, node)
+            for nbr, value in nbrs:
+                dict.__setitem__(nbrdict, nbr, value)
+                if register:
+                    store.register_slot(node, nbr, value)
+
+    def _insert_nodes(self, nodes):
+        """
+        Adds empty neighbor dictionaries for an iterable of nodes which are
+        not yet part of the map.
+        """
+
+        store = self._store
+        register = self._register
+        for node in nodes:
+            dict.__setitem__(self, node, KnitNeighborDict(store, node,
+                                                          register))
+
+    def _insert_edge(self, u, v, data, pred=None):
+        """
+        Inserts the :class:`KnitEdgeData` of an edge between two nodes of a
+        non-multigraph network which are not connected yet. The reverse
+        entry is stored in the given predecessor map, or in this map if none
+        is given.
+        """
+
+        if pred is None:
+            pred = self
+        dict.__setitem__(dict.__getitem__(self, u), v, data)
+        dict.__setitem__(dict.__getitem__(pred, v), u, data)
+        self._store.register(u, v, None, data)
+
+    def __delitem__(self, node):
+        nbrs = dict.__getitem__(self, node)
+        dict.__delitem__(self, node)
+        if self._register:
+            for value in dict.values(nbrs):
+                self._store.release_slot(value)
+
+    def pop(self, node, *args):
+        if node not in self:
+            return dict.pop(self, node, *args)
+        nbrs = dict.__getitem__(self, node)
+        del self[node]
+        return nbrs
+
+    def popitem(self):
+        node, nbrs = dict.popitem(self)
+        if self._register:
+            for value in dict.values(nbrs):
+                self._store.release_slot(value)
+        return (node, nbrs)
+
+    def _release(self):
+        """
+        Releases the attribute data of all edges in the map from the edge
+        store.
+        """
+
+        if not self._register:
+            return
+        release_slot = self._store.release_slot
+        for nbrs in dict.values(self):
+            for value in dict.values(nbrs):
+                release_slot(value)
+
+    def clear(self):
+        if self._register:
+            self._release()
+            self._store.clear()
+        dict.clear(self)
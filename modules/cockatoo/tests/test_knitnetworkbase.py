@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+from nose.tools import *
+import copy
+
+from Rhino.Geometry import Point3d
+
+from cockatoo import KnitNetwork
+
+
+def build_network(columnar=False, lazy=False):
+    network = KnitNetwork()
+    network.columnar = columnar
+    network.lazy_edge_geometry = lazy
+    for i in range(4):
+        network.node_from_point3d(i, Point3d(i, 0, 0), position=0, num=i)
+    network.create_weft_edge((0, network.node[0]), (1, network.node[1]))
+    network.create_weft_edge((2, network.node[2]), (3, network.node[3]))
+    return network
+
+
+class TestKnitNetworkCopy:
+
+    modes = ({}, {"columnar": True}, {"lazy": True},
+             {"columnar": True, "lazy": True})
+
+    def check_copy(self, network, H):
+        assert_equal(type(H), type(network))
+        assert_equal(H.columnar, network.columnar)
+        assert_equal(H.lazy_edge_geometry, network.lazy_edge_geometry)
+        assert_equal(sorted(H.nodes()), [0, 1, 2, 3])
+        assert_equal(H.number_of_weft_edges(), 2)
+        assert_equal([e[:2] for e in H.weft_edges], [(0, 1), (2, 3)])
+        assert_equal(H.node_weft_edges(1), [(1, 0)])
+        # the copy is independent of the original
+        H.update_node(0, position=1)
+        H.create_warp_edge((1, H.node[1]), (2, H.node[2]))
+        assert_equal(H.nodes_on_position(0), [1, 2, 3])
+        assert_equal(H.number_of_warp_edges(), 1)
+        assert_equal(network.nodes_on_position(0), [0, 1, 2, 3])
+        assert_equal(network.number_of_warp_edges(), 0)
+        assert_equal(network.edge[0][1]["weft"], True)
+
+    def test_copy(self):
+        for mode in self.modes:
+            network = build_network(**mode)
+            self.check_copy(network, network.copy())
+
+    def test_deepcopy(self):
+        for mode in self.modes:
+            network = build_network(**mode)
+            self.check_copy(network, copy.deepcopy(network))
+
+    def test_to_directed(self):
+        for mode in self.modes:
+            network = build_network(**mode)
+            H = network.to_directed()
+            assert_equal(sorted(H.edges()), [(0, 1), (1, 0), (2, 3), (3, 2)])
+            assert_equal(H.node[0]["position"], 0)
+            for u, v, d in H.edges_iter(data=True):
+                assert_equal(type(d), dict)
+                assert_true(d["weft"])
+            assert_true(H.edge[0][1] is not H.edge[1][0])
+
+
+class TestKnitNetworkNodeIndexes:
+
+    def test_direct_writes(self):
+        for columnar in (False, True):
+            network = build_network(columnar=columnar)
+            assert_equal(network.nodes_on_position(0), [0, 1, 2, 3])
+            network.node[0]["position"] = 1
+            network.node[3]["num"] = -1
+            network.node[2].update(end=True, leaf=True)
+            assert_equal(network.nodes_on_position(0), [3, 1, 2])
+            assert_equal(network.nodes_on_position(1), [0])
+            assert_equal(network.ends_on_position(0), [2])
+            assert_equal(network.leaves_on_position(0), [2])
+            del network.node[2]["end"]
+            assert_equal(network.ends_on_position(0), [])
+
+    def test_shared_writes(self):
+        network = build_network()
+        H = network.subgraph([0, 1, 2])
+        assert_true(H.node[0] is network.node[0])
+        assert_equal(H.nodes_on_position(0), [0, 1, 2])
+        network.node[1]["position"] = 2
+        assert_equal(H.nodes_on_position(0), [0, 2])
+        assert_equal(H.nodes_on_position(2), [1])
+        assert_equal(network.nodes_on_position(2), [1])
+        H.remove_node(1)
+        network.node[1]["position"] = 0
+        assert_equal(network.nodes_on_position(0), [0, 1, 2, 3])
+        assert_equal(H.nodes_on_position(0), [0, 2])
+
+
+class TestKnitNetworkAggregates:
+
+    def test_direct_writes(self):
+        for columnar in (False, True):
+            network = build_network(columnar=columnar)
+            network.node_from_point3d(4, Point3d(0, 1, 0), position=1, num=0)
+            network.node_from_point3d(5, Point3d(9, 1, 0), position=1, num=1)
+            assert_equal(network.total_positions, 2)
+            assert_equal(network.longest_position_contour()[0], 1)
+            assert_equal(network.longest_position_contour()[2], 9.0)
+            network.node[3].update(x=20.0, geo=Point3d(20, 0, 0))
+            assert_equal(network.longest_position_contour()[0], 0)
+            assert_equal(network.longest_position_contour()[2], 20.0)
+            network.node[5]["position"] = 2
+            assert_equal(network.total_positions, 3)
+            coordinates, nodes = network.coordinate_buffer()
+            network.set_coordinate_buffer([2 * c for c in coordinates], nodes)
+            assert_equal(network.longest_position_contour()[2], 40.0)
@@ -9,7 +9,9 @@
     map_values_as_colors
     tween_planes
     is_ccw_xy
+    order_by_angle_xy
     resolve_order_by_backtracking
+    parallel_map
 """
 
 # PYTHON STANDARD LIBRARY IMPORTS ---------------------------------------------
@@ -18,9 +20,11 @@ from __future__ import division
 from __future__ import print_function
 from collections import deque
 from itertools import tee
+from math import atan2
 from math import cos
 from math import pi
 from math import sqrt
+import threading
 
 # DUNDER ----------------------------------------------------------------------
 __all__ = [
@@ -29,10 +33,18 @@ __all__ = [
     "map_values_as_colors",
     "tween_planes",
     "is_ccw_xy",
+    "order_by_angle_xy",
     "resolve_order_by_backtracking",
-    "pairwise"
+    "pairwise",
+    "parallel_map"
 ]
 
+# THIRD PARTY MODULE IMPORTS --------------------------------------------------
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 # LOCAL MODULE IMPORTS --------------------------------------------------------
 from cockatoo.environment import RHINOINSIDE
 from cockatoo.exception import SystemNotPresentError
@@ -498,6 +510,124 @@ def is_ccw_xy(a, b, c, colinear=False):
         return ab_x * ac_y - ab_y * ac_x >= 0
     return ab_x * ac_y - ab_y * ac_x > 0
 
+
+_ANGLE_TIE_TOLERANCE = 1e-9
+"""
+Relative tolerance below which two directions are considered to be the same
+when ordering points by their angles.
+"""
+
+_NUMPY_MIN_POINTS = 64
+"""
+Minimum total number of points for which angles are computed using NumPy.
+"""
+
+
+def _order_by_angle_xy(a, points):
+    # order by decreasing angle, adding zero turns -0.0 into 0.0 so that
+    # directions along the negative x-axis always have an angle of pi
+    ax, ay = a[0], a[1]
+    vectors = [((p[0] - ax) + 0.0, (p[1] - ay) + 0.0) for p in points]
+    if len(vectors) < 2:
+        return list(range(len(vectors)))
+    keyed = sorted([(-atan2(v[1], v[0]), i) for i, v in enumerate(vectors)])
+    order = [i for angle, i in keyed]
+
+    # check all pairs of cyclically adjacent directions for ties
+    tolerance = _ANGLE_TIE_TOLERANCE * _ANGLE_TIE_TOLERANCE
+    px, py = vectors[order[-1]]
+    for i in order:
+        qx, qy = vectors[i]
+        if qx == 0 and qy == 0:
+            return None
+        dot = px * qx + py * qy
+        if dot > 0:
+            cross = px * qy - py * qx
+            if (cross * cross <=
+                    tolerance * (px * px + py * py) * (qx * qx + qy * qy)):
+                return None
+        px, py = qx, qy
+    return order
+
+
+def _order_by_angle_xy_numpy(origins, point_sets):
+    # same operations as _order_by_angle_xy, applied to all sets at once
+    counts = np.array([len(points) for points in point_sets], dtype=int)
+    total = int(counts.sum())
+    sets = np.repeat(np.arange(len(point_sets)), counts)
+    xy = np.array([(p[0], p[1]) for points in point_sets for p in points],
+                  dtype=float).reshape(total, 2)
+    oxy = np.array([(o[0], o[1]) for o in origins],
+                   dtype=float).reshape(len(origins), 2)[sets]
+    dx = (xy[:, 0] - oxy[:, 0]) + 0.0
+    dy = (xy[:, 1] - oxy[:, 1]) + 0.0
+    # lexsort is stable and sorts by the last key first
+    order = np.lexsort((-np.arctan2(dy, dx), sets))
+    qx = dx[order]
+    qy = dy[order]
+
+    # the cyclic predecessor of every direction inside of its set
+    starts = np.cumsum(counts) - counts
+    previous = np.arange(total) - 1
+    nonempty = counts > 0
+    previous[starts[nonempty]] = (starts + counts - 1)[nonempty]
+    px = qx[previous]
+    py = qy[previous]
+    cross = px * qy - py * qx
+    dot = px * qx + py * qy
+    tolerance = _ANGLE_TIE_TOLERANCE * _ANGLE_TIE_TOLERANCE
+    bound = tolerance * (px * px + py * py) * (qx * qx + qy * qy)
+    ties = (((dot > 0) & (cross * cross <= bound)) |
+            ((qx == 0) & (qy == 0))) & (counts > 1)[sets]
+    tied = set(np.unique(sets[ties]).tolist())
+
+    local = (order - np.repeat(starts, counts)).tolist()
+    orders = []
+    for i, (start, count) in enumerate(zip(starts.tolist(),
+                                           counts.tolist())):
+        if i in tied:
+            orders.append(None)
+        else:
+            orders.append(local[start:start + count])
+    return orders
+
+
+def order_by_angle_xy(origins, point_sets):
+    """
+    Orders sets of points around their origins by the decreasing angles of
+    the directions from the origins to the points in the XY plane, which is
+    the clockwise order starting at the negative X axis.
+
+    Parameters
+    ----------
+    origins : sequence of sequence of float
+        XY(Z) coordinates of the origin of every set of points.
+    point_sets : sequence of sequence of sequence of float
+        The sets of XY(Z) coordinates of the points to order.
+
+    Returns
+    -------
+    orders : :obj:`list`
+        One list of the indices of the points in clockwise order for every
+        set of points. ``None`` for every set where the order is ambiguous
+        because two points lie in the same direction from the origin or a
+        point coincides with the origin.
+
+    Notes
+    -----
+    The cyclic order is identical to the one found by inserting the points
+    one by one using :func:`is_ccw_xy`, as it is done by
+    :meth:`KnitDiNetwork.find_cycles`. The angles of all sets are computed at
+    once using NumPy, if it is available.
+    """
+
+    if np is not None:
+        total = sum(len(points) for points in point_sets)
+        if total >= _NUMPY_MIN_POINTS:
+            return _order_by_angle_xy_numpy(origins, point_sets)
+    return [_order_by_angle_xy(a, points)
+            for a, points in zip(origins, point_sets)]
+
 # PYTHON HELPERS AND UTILITIES ------------------------------------------------
 
 
@@ -537,3 +667,91 @@ def pairwise(iterable):
     a, b = tee(iterable)
     next(b, None)
     return zip(a, b)
+
+
+def _cpu_count():
+    try:
+        from multiprocessing import cpu_count
+        return cpu_count()
+    except (ImportError, NotImplementedError):
+        pass
+    try:
+        from System import Environment
+        return Environment.ProcessorCount
+    except ImportError:
+        return 1
+
+
+def parallel_map(function, iterable, workers=None):
+    """
+    Applies a function to every item of an iterable using a pool of threads
+    and returns the results in the order of the items.
+
+    Parameters
+    ----------
+    function : callable
+        The function to apply to every item. It should only read shared
+        data, as it gets called concurrently.
+
+    iterable : iterable
+        An iterable sequence of items.
+
+    workers : int, optional
+        The number of threads to use. If ``1`` or less, or if there are less
+        than two items, the function is applied serially.
+
+        Defaults to ``None``, which uses the number of processors.
+
+    Returns
+    -------
+    results : :obj:`list`
+        The results of applying the function, in the order of the items.
+
+    Raises
+    ------
+    Exception
+        The first exception raised by any of the calls of the function.
+
+    Notes
+    -----
+    Threads run truly parallel under IronPython, which has no global
+    interpreter lock. Under CPython the function only runs concurrently
+    while it releases the lock.
+    """
+
+    items = list(iterable)
+    if workers is None:
+        workers = _cpu_count()
+    workers = min(workers, len(items))
+    if workers < 2:
+        return [function(item) for item in items]
+
+    results = [None] * len(items)
+    errors = []
+    indices = iter(range(len(items)))
+    lock = threading.Lock()
+
+    def work():
+        while True:
+            with lock:
+                if errors:
+                    return
+                i = next(indices, None)
+            if i is None:
+                return
+            try:
+                results[i] = function(items[i])
+            except Exception as e:
+                with lock:
+                    errors.append(e)
+                return
+
+    threads = [threading.Thread(target=work) for w in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    if errors:
+        raise errors[0]
+    return results
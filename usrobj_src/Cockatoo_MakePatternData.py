@@ -131,6 +131,29 @@ class MakePatternData(component):
             
             # CONVERT PATTERN DATA TO PIXELS -----------------------------------
             try:
+                # build a table of pixel colors for every combination of the
+                # packed node flags as (color, blend color, regular)
+                pixel_table = []
+                for flags in range(2 ** len(DualNetwork.NODE_FLAGS)):
+                    f = DualNetwork.unpack_node_flags(flags)
+                    # END NODE PIXEL COLOR
+                    if f["end"]:
+                        if f["increase"]:
+                            pixel_table.append((IncreaseColor, EndColor, False))
+                        elif f["decrease"]:
+                            pixel_table.append((DecreaseColor, EndColor, False))
+                        else:
+                            pixel_table.append((EndColor, EndColor, False))
+                    # INCREASE NODE PIXEL COLOR
+                    elif f["increase"]:
+                        pixel_table.append((IncreaseColor, IncreaseColor, False))
+                    # DECREASE NODE PIXEL COLOR
+                    elif f["decrease"]:
+                        pixel_table.append((DecreaseColor, DecreaseColor, False))
+                    # REGULAR NODE PIXEL COLOR
+                    else:
+                        pixel_table.append((StitchColor, StitchColor, True))
+                
                 PixelData = []
                 for i, row in enumerate(PatternData):
                     pixel_row = []
@@ -140,80 +163,28 @@ class MakePatternData(component):
                             pixel_row.append(FillerColor)
                             continue
                         
-                        # get node data and color
-                        node_data = DualNetwork.node[node]
-                        node_col = node_data["color"]
-                        
-                        # END NODE PIXEL COLOR ---------------------------------
-                        if node_data["end"]:
-                            if node_col and ColorMode == 1:
-                                syscol = System.Drawing.Color.FromArgb(
-                                                            *node_col)
-                                pixel_row.append(syscol)
-                            elif node_col and ColorMode == 2:
-                                rgbcol = (EndColor.R,
-                                          EndColor.G,
-                                          EndColor.B)
-                                blend = cockatoo.utilities.blend_colors(
-                                                    rgbcol,
-                                                    node_col)
-                                sysblend = System.Drawing.Color.FromArgb(
-                                                            *blend)
-                                pixel_row.append(sysblend)
-                            else:
-                                if node_data["increase"]:
-                                    pixel_row.append(IncreaseColor)
-                                elif node_data["decrease"]:
-                                    pixel_row.append(DecreaseColor)
-                                else:
-                                    pixel_row.append(EndColor)
+                        # get node color and pixel colors of the node flags
+                        node_col = DualNetwork.node[node]["color"]
+                        pixcol, blendcol, regular = pixel_table[
+                                                DualNetwork.node_flags(node)]
                         
-                        # INCREASE NODE PIXEL COLOR ----------------------------
-                        elif node_data["increase"]:
-                            if node_col and ColorMode == 1:
-                                syscol = System.Drawing.Color.FromArgb(
+                        # regular nodes always use their own color
+                        if node_col and (regular or ColorMode == 1):
+                            syscol = System.Drawing.Color.FromArgb(
                                                             *node_col)
-                                pixel_row.append(syscol)
-                            elif node_col and ColorMode == 2:
-                                rgbcol = (IncreaseColor.R,
-                                          IncreaseColor.G,
-                                          IncreaseColor.B)
-                                blend = cockatoo.utilities.blend_colors(
-                                                    rgbcol,
-                                                    node_col)
-                                sysblend = System.Drawing.Color.FromArgb(
-                                                            *blend)
-                                pixel_row.append(sysblend)
-                            else:
-                                pixel_row.append(IncreaseColor)
-                        
-                        # DECREASE NODE PIXEL COLOR ----------------------------
-                        elif node_data["decrease"]:
-                            if node_col and ColorMode == 1:
-                                syscol = System.Drawing.Color.FromArgb(
-                                                            *node_col)
-                                pixel_row.append(syscol)
-                            elif node_col and ColorMode == 2:
-                                rgbcol = (DecreaseColor.R,
-                                          DecreaseColor.G,
-                                          DecreaseColor.B)
-                                blend = cockatoo.utilities.blend_colors(
-                                                    rgbcol,
-                                                    node_col)
-                                sysblend = System.Drawing.Color.FromArgb(
-                                                            *blend)
-                                pixel_row.append(sysblend)
-                            else:
-                                pixel_row.append(DecreaseColor)
-                        
-                        # REGULAR NODE PIXEL COLOR -----------------------------
+                            pixel_row.append(syscol)
+                        elif node_col and ColorMode == 2:
+                            rgbcol = (blendcol.R,
+                                      blendcol.G,
+                                      blendcol.B)
+                            blend = cockatoo.utilities.blend_colors(
+                                                rgbcol,
+                                                node_col)
+                            sysblend = System.Drawing.Color.FromArgb(
+                                                        *blend)
+                            pixel_row.append(sysblend)
                         else:
-                            if node_col:
-                                syscol = System.Drawing.Color.FromArgb(
-                                                                *node_col)
-                                pixel_row.append(syscol)
-                            else:
-                                pixel_row.append(StitchColor)
+                            pixel_row.append(pixcol)
                     
                     # append row to pixel data
                     PixelData.append(pixel_row)
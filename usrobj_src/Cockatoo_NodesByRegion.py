@@ -103,28 +103,14 @@ class NodesByRegion(component):
             network_nodes = KnitNetwork.nodes(data=True)
             
             if UseReference:
-                try:
-                    reference_geometry = KnitNetwork.graph["reference_geometry"]
-                except KeyError:
-                    reference_geometry = None
-                
-                if not reference_geometry:
-                    cbp = None
-                    nrm = None
+                # get the (cached) normals of all nodes on the reference
+                # geometry
+                cbp, nrm = KnitNetwork.reference_projection()
+                if not nrm:
                     errMsg = "KnitNetwork has no reference geometry " + \
                              "attached! Fallback to RegionPlane."
                     rml = self.RuntimeMessageLevel.Warning
                     self.AddRuntimeMessage(rml, errMsg)
-                elif isinstance(reference_geometry, Rhino.Geometry.Mesh):
-                    cbp = {network_nodes[k][0]: reference_geometry.ClosestMeshPoint(
-                           network_nodes[k][1]["geo"], 0) for k in range(len(network_nodes))}
-                    nrm = {k: reference_geometry.NormalAt(cbp[k]) \
-                           for k in cbp.keys()}
-                elif isinstance(reference_geometry, Rhino.Geometry.NurbsSurface):
-                    cbp = {network_nodes[k][0]: reference_geometry.ClosestPoint(
-                           network_nodes[k][1]["geo"], 0) for k in network_nodes}
-                    nrm = {k: reference_geometry.NormalAt(cbp[k][0], cbp[k][1]) \
-                           for k in cbp.keys()}
             else:
                 cbp = None
                 nrm = None
@@ -218,63 +218,30 @@ class VisualisePatternData(component):
             System.Windows.Forms.MessageBox.Show(str(e),
                                                  "Error while drawing preview!")
     
-    def node_color(self, data):
+    def node_color(self, stitch_class, data):
         """
-        checks the node and returns the appropriate drawing color
+        returns the appropriate drawing color for the stitch class of a node
         """
         
-        # define colours for nodes and node texts
-        colStart = System.Drawing.Color.Green
-        colStartLeaf = System.Drawing.Color.SeaGreen
-        colStartLeafEnd = System.Drawing.Color.Orange
-        colStartEnd = System.Drawing.Color.DarkGreen
-        colEnd = System.Drawing.Color.Blue
-        colLeaf = System.Drawing.Color.Cyan
-        colEndLeaf = System.Drawing.Color.Magenta
-        colRegular = System.Drawing.Color.Black
-        colIncreaseEnd = System.Drawing.Color.Purple
-        colDecreaseEnd = System.Drawing.Color.DarkViolet
-        colIncrease = System.Drawing.Color.Red
-        colDecrease = System.Drawing.Color.DarkRed
+        # define colours for the stitch classes of nodes
+        class_colors = {"R": System.Drawing.Color.Black,
+                        "E": System.Drawing.Color.Blue,
+                        "S": System.Drawing.Color.DarkGreen,
+                        "Ei": System.Drawing.Color.Purple,
+                        "Ed": System.Drawing.Color.DarkViolet,
+                        "L": System.Drawing.Color.Cyan,
+                        "SL": System.Drawing.Color.SeaGreen,
+                        "EL": System.Drawing.Color.Magenta,
+                        "SEL": System.Drawing.Color.Orange,
+                        "i": System.Drawing.Color.Red,
+                        "d": System.Drawing.Color.DarkRed}
         
-        # END BUT NOT LEAF
-        if data["end"] and not data["leaf"]:
-            if not data["increase"] and not data["decrease"]:
-                if data["start"]:
-                    nodecol = colStartEnd
-                else:
-                    nodecol = colEnd
-            elif data["increase"] and not data["decrease"]:
-                nodecol = colIncreaseEnd
-            elif not data["increase"] and data["decrease"]:
-                nodecol = colDecreaseEnd
-        # END AND LEAF
-        elif data["end"] and data["leaf"]:
-            if data["start"]:
-                nodecol = colStartLeafEnd
-            else:
-                nodecol = colEndLeaf
-        # NO END BUT LEAF
-        elif not data["end"] and data["leaf"]:
-            if data["start"]:
-                nodecol = colStartLeaf
-            else:
-                nodecol = colLeaf
-        # NO END NO LEAF
-        elif not data["end"] and not data["leaf"]:
-            if data["increase"] and not data["decrease"]:
-                nodecol = colIncrease
-            elif not data["increase"] and data["decrease"]:
-                nodecol = colDecrease
-            else:
-                if data["color"]:
-                    nodecol = System.Drawing.Color.FromArgb(
-                                                *data["color"])
-                else:
-                    nodecol = colRegular
+        # regular nodes use their 'color' attribute if it is set
+        if stitch_class == "R" and data["color"]:
+            return System.Drawing.Color.FromArgb(*data["color"])
         
         # return the color
-        return nodecol
+        return class_colors[stitch_class]
     
     def RunScript(self, KnitNetworkDual, PatternData, Plane, NodeRadius, NodeDisplay, PaddingX, PaddingY, DirectionalDisplay, DrawData):
         
@@ -354,10 +321,8 @@ class VisualisePatternData(component):
                         grid[i].append(pt)
                         
                         # set the node coordinates of the flat network
-                        FlatDual.node[value]["geo"] = pt
-                        FlatDual.node[value]["x"] = pt.X
-                        FlatDual.node[value]["y"] = pt.Y
-                        FlatDual.node[value]["z"] = pt.Z
+                        FlatDual.update_node(value, geo=pt, x=pt.X,
+                                             y=pt.Y, z=pt.Z)
                         
                         # create the display geometry
                         if NodeDisplay == 0:
@@ -376,7 +341,9 @@ class VisualisePatternData(component):
                         
                         # get the node data from the dual
                         node_data = FlatDual.node[value]
-                        node_color = self.node_color(node_data)
+                        node_color = self.node_color(
+                                        FlatDual.node_stitch_class(value),
+                                        node_data)
                         node_drawing_list.append((graphnode, node_color))
                         
                         if DrawData: